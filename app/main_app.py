@@ -8,12 +8,14 @@ from tkinterdnd2 import TkinterDnD, DND_FILES
 
 from config.settings import (
     ICON_PATH, BG_COLOR, PANEL_BG,
-    APP_TITLE, HEADER_TEXT, PROGRESS_LENGTH,
+    APP_TITLE, HEADER_TEXT, PROGRESS_LENGTH, STARTUP_WARMUP_DELAY_MS, STEP1_PREWORK_ON_DROP,
 )
 from utils.UI_helpers import (
     blink_widget
 )
 from process.process_manager import ProcessManager
+from process.prework import Prework
+from utils.warmup import start_warmup
 
 class ShutsuzuuApp(TkinterDnD.Tk):
     def __init__(self):
@@ -45,16 +47,22 @@ class ShutsuzuuApp(TkinterDnD.Tk):
         # --- 以前の状態を初期化する ---
         self.info = None
         self.excel_full_path = ""
+        self.excel_batch_paths = []  # 複数の部品表をドロップした場合（一括処理）
+        self.pending_jobs = []       # 一括処理で未処理の (Excelパス, ステップ1結果)
         self.folder_full_path = ""
         self.input_mode = "excel"  # "excel" または "folder"
         self.is_running = False
 
         # --- UI を作成する前にプロセス マネージャーを初期化する ---
         self.process_manager = ProcessManager(self)
+        self.prework = Prework()  # ドロップ時に始めるステップ1の準備（部品表の読み込み・品番検索）
 
         # UIを作成する
         self._build_ui()
 
+        # ウィンドウ表示後に、印刷・PDF変換用の重いモジュールをバックグラウンドで読み込む
+        self.after(STARTUP_WARMUP_DELAY_MS, start_warmup)
+
     def _build_ui(self):
         # ヘッダー
         header = tk.Label(self, text=HEADER_TEXT, font=("Arial", 24, "bold"), fg="#004080", bg=BG_COLOR)
@@ -71,6 +79,11 @@ class ShutsuzuuApp(TkinterDnD.Tk):
         tk.Radiobutton(mode_frame, text="ICDフォルダ", variable=self.mode_var, value="folder", 
                       command=self.on_mode_changed, font=("Arial", 10), bg=BG_COLOR).pack(side=tk.LEFT, padx=5)
 
+        # 前回見つからなかった品番（未検出キャッシュ）も検索し直す
+        self.recheck_misses_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(mode_frame, text="未検出も再検索", variable=self.recheck_misses_var,
+                       font=("Arial", 10), bg=BG_COLOR).pack(side=tk.LEFT, padx=15)
+
         # 入力フレーム用のコンテナ（固定位置）
         self.input_container = tk.Frame(self, bg=BG_COLOR)
         self.input_container.pack(pady=10, padx=20, fill="x")
@@ -157,6 +170,7 @@ class ShutsuzuuApp(TkinterDnD.Tk):
     def on_mode_changed(self):
         """入力モードが変更されたとき"""
         mode = self.mode_var.get()
+        self.prework.cancel()
         if mode == "excel":
             self.folder_frame.pack_forget()
             self.excel_frame.pack(fill="x")
@@ -168,14 +182,22 @@ class ShutsuzuuApp(TkinterDnD.Tk):
             self.folder_frame.pack(fill="x")
             self.input_mode = "folder"
             self.excel_full_path = ""
+            self.excel_batch_paths = []
             self.excel_entry.delete(0, tk.END)
 
     def on_drop_excel(self, event):
-        file_path = event.data.strip("{}")
-        if file_path.lower().endswith((".xlsx", ".xls")):
+        file_paths = [p for p in self.tk.splitlist(event.data) if p]
+        if file_paths and all(p.lower().endswith((".xlsx", ".xls")) for p in file_paths):
+            file_path = file_paths[0]
             self.excel_entry.delete(0, tk.END)
-            self.excel_entry.insert(0, os.path.basename(file_path))
+            if len(file_paths) > 1:
+                self.excel_entry.insert(0, f"{os.path.basename(file_path)} 他 {len(file_paths) - 1} 件")
+            else:
+                self.excel_entry.insert(0, os.path.basename(file_path))
             self.excel_full_path = file_path
+            self.excel_batch_paths = file_paths if len(file_paths) > 1 else []
+            if STEP1_PREWORK_ON_DROP:
+                self.prework.start(excel_path=file_path, batch_paths=self.excel_batch_paths)
             blink_widget(self.excel_entry)
             self.print_done_btn.config(state=tk.DISABLED)
             self.status_label.config(text="Excelファイルを確認しました。開始ボタンを押してください。", fg="blue")
@@ -188,6 +210,8 @@ class ShutsuzuuApp(TkinterDnD.Tk):
             self.folder_entry.delete(0, tk.END)
             self.folder_entry.insert(0, os.path.basename(folder_path))
             self.folder_full_path = folder_path
+            if STEP1_PREWORK_ON_DROP:
+                self.prework.start(icd_folder_path=folder_path)
             blink_widget(self.folder_entry)
             self.print_done_btn.config(state=tk.DISABLED)
             self.status_label.config(text="ICDフォルダを確認しました。開始ボタンを押してください。", fg="blue")
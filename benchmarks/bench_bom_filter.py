@@ -0,0 +1,121 @@
+# benchmarks/bench_bom_filter.py
+"""
+部品表フィルタリングの速度比較（合成した部品表で計測）。
+- pandas: 従来の DataFrame によるフィルタリング（pandas がある場合のみ）
+- lists: 条件ごとにリストを走査する方式
+- filter_bom: 1回の走査で保留・追加・対象をまとめて振り分け
+
+使い方（リポジトリのルートで実行）:
+    python benchmarks/bench_bom_filter.py
+    python benchmarks/bench_bom_filter.py --rows 50000 --rounds 10 --addition
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.bom_reader import filter_bom  # noqa: E402
+
+
+def _make_rows(count, addition=False, seed=0):
+    """iter_bom_rows と同じ形式の (K, AB, AD) 行を生成"""
+    rnd = random.Random(seed)
+    statuses = [None] * 90 + ["保留"] * 5 + [" 保留 "] * 2 + ["済"] * 3
+    if addition:
+        statuses += ["追加"] * 5
+    rows = []
+    for i in range(count):
+        r = rnd.random()
+        if r < 0.02:
+            k = None
+        elif r < 0.03:
+            k = 0
+        elif r < 0.10:
+            k = 100000 + i
+        else:
+            k = f"A{i:06d}-{rnd.randint(1000, 9999)}-{i % 50:03d}"
+        ab = rnd.choice([1, 2, 3, 1, 0, None, "1式"])
+        rows.append((k, ab, rnd.choice(statuses)))
+    return rows
+
+
+def _filter_pandas(rows, pd):
+    df = pd.DataFrame(rows, columns=["K", "AB", "AD"])
+    df["AD"] = df["AD"].astype(str).str.strip()
+    hold = df[df["AD"] == "保留"]["K"].dropna().astype(str).str.strip().tolist()
+    addition = df[df["AD"] == "追加"]["K"].dropna().astype(str).str.strip().tolist()
+    if not df[df["AD"] == "追加"].empty:
+        filtered = df[(df["AD"] == "追加") & (df["K"].notna()) & (df["K"] != 0)]
+    else:
+        filtered = df[
+            (df["K"].notna()) & (df["K"] != 0) &
+            (df["AD"] != "保留") &
+            (df["AB"].notna()) & (df["AB"] != "") & (df["AB"].astype(str) != "0")
+        ]
+    return [str(k).strip() for k in filtered["K"]], hold, addition
+
+
+def _filter_lists(rows):
+    rows = [(k, ab, str(ad).strip() if ad is not None else "") for k, ab, ad in rows]
+    hold = [str(k).strip() for k, _, ad in rows if ad == "保留" and k is not None]
+    addition = [str(k).strip() for k, _, ad in rows if ad == "追加" and k is not None]
+    if any(ad == "追加" for _, _, ad in rows):
+        filtered = [k for k, _, ad in rows if ad == "追加" and k is not None and k != 0]
+    else:
+        filtered = [
+            k for k, ab, ad in rows
+            if k is not None and k != 0 and ad != "保留"
+            and ab is not None and ab != "" and str(ab) != "0"
+        ]
+    return [str(k).strip() for k in filtered], hold, addition
+
+
+def _best(func, rounds):
+    best = None
+    result = None
+    for _ in range(rounds):
+        started = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="部品表フィルタリングの速度比較")
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--addition", action="store_true", help="「追加」の行を含める")
+    args = parser.parse_args()
+
+    rows = _make_rows(args.rows, addition=args.addition)
+    candidates = [
+        ("lists", lambda: _filter_lists(rows)),
+        ("filter_bom", lambda: filter_bom(rows)),
+    ]
+    try:
+        import pandas as pd
+        candidates.insert(0, ("pandas", lambda: _filter_pandas(rows, pd)))
+    except ImportError:
+        print("ℹ pandas がないため、pandas の計測は省略します。")
+
+    print(f"行数: {args.rows}, ラウンド数: {args.rounds}")
+    print(f"{'method':<12}{'best[ms]':>10}{'rows/ms':>10}{'parts':>8}{'hold':>6}{'add':>6}")
+    expected = None
+    for name, func in candidates:
+        elapsed, (parts, hold, addition) = _best(func, args.rounds)
+        if name != "pandas":
+            # 数値の AB=0 は pandas（float 列で "0.0" になる）と結果が異なるため、リスト方式同士で比較
+            if expected is None:
+                expected = (parts, hold, addition)
+            elif expected != (parts, hold, addition):
+                print(f"❌ {name} の結果が一致しません")
+        print(f"{name:<12}{elapsed * 1000:>10.2f}{args.rows / (elapsed * 1000):>10.1f}"
+              f"{len(parts):>8}{len(hold):>6}{len(addition):>6}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+# benchmarks/bench_fast_copy.py
+"""
+fast_copy と shutil.copy / shutil.copy2 の速度比較。
+
+使い方（リポジトリのルートで実行）:
+    python benchmarks/bench_fast_copy.py                 # 一時ファイルを生成して比較
+    python benchmarks/bench_fast_copy.py Y:\\標準機\\xxx  # 既存フォルダ内のファイルで比較
+    python benchmarks/bench_fast_copy.py --rounds 5
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.fast_copy import fast_copy  # noqa: E402
+
+
+def _make_sample_files(folder, small_count=200, small_size=256 * 1024, large_count=4, large_size=32 * 1024 * 1024):
+    """ICD 図面程度の小さいファイルと、大きいファイルを生成"""
+    paths = []
+    for i in range(small_count):
+        path = os.path.join(folder, f"small_{i:04d}.icd")
+        with open(path, "wb") as f:
+            f.write(os.urandom(small_size))
+        paths.append(path)
+    for i in range(large_count):
+        path = os.path.join(folder, f"large_{i}.bin")
+        with open(path, "wb") as f:
+            f.write(os.urandom(large_size))
+        paths.append(path)
+    return paths
+
+
+def _list_files(folder):
+    with os.scandir(folder) as it:
+        return [e.path for e in it if e.is_file()]
+
+
+def _run(name, copy_func, sources, dst_root):
+    dst_dir = tempfile.mkdtemp(prefix=f"{name}_", dir=dst_root)
+    total = 0
+    methods = {}
+    started = time.perf_counter()
+    for src in sources:
+        dst = os.path.join(dst_dir, os.path.basename(src))
+        result = copy_func(src, dst)
+        total += os.path.getsize(dst)
+        if isinstance(result, dict):
+            methods[result["method"]] = methods.get(result["method"], 0) + 1
+    elapsed = time.perf_counter() - started
+    shutil.rmtree(dst_dir, ignore_errors=True)
+    return elapsed, total, methods
+
+
+def main():
+    parser = argparse.ArgumentParser(description="fast_copy vs shutil のコピー速度比較")
+    parser.add_argument("source", nargs="?", help="コピー元フォルダ（省略時は一時ファイルを生成）")
+    parser.add_argument("--dest", help="コピー先の親フォルダ（省略時は一時フォルダ）")
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix="bench_fast_copy_")
+    try:
+        if args.source:
+            sources = _list_files(args.source)
+        else:
+            src_dir = os.path.join(work_dir, "src")
+            os.makedirs(src_dir)
+            sources = _make_sample_files(src_dir)
+        dst_root = args.dest or work_dir
+
+        candidates = [
+            ("shutil.copy", shutil.copy),
+            ("shutil.copy2", shutil.copy2),
+            ("fast_copy", fast_copy),
+            ("fast_copy(meta)", lambda s, d: fast_copy(s, d, preserve_metadata=True)),
+        ]
+
+        print(f"ファイル数: {len(sources)}, ラウンド数: {args.rounds}")
+        print(f"{'method':<18}{'best[s]':>10}{'MB/s':>10}{'files/s':>10}  backend")
+        for name, func in candidates:
+            best = None
+            methods = {}
+            for _ in range(args.rounds):
+                elapsed, total, methods = _run(name.replace("(", "_").replace(")", ""), func, sources, dst_root)
+                if best is None or elapsed < best[0]:
+                    best = (elapsed, total)
+            elapsed, total = best
+            mb_per_sec = total / (1024 * 1024) / elapsed if elapsed else 0.0
+            files_per_sec = len(sources) / elapsed if elapsed else 0.0
+            backend = ", ".join(f"{k}={v}" for k, v in methods.items()) or "-"
+            print(f"{name:<18}{elapsed:>10.3f}{mb_per_sec:>10.1f}{files_per_sec:>10.1f}  {backend}")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+# benchmarks/bench_startup.py
+"""
+起動時間の計測（新しいプロセスで毎回計測）。
+- 最初のウィンドウ表示までの時間: プロセス起動 → ShutsuzuuApp 作成 → 最初の描画（update）
+- モジュールごとの読み込み時間: python -X importtime で app.main_app を読み込んだ結果（累積時間の大きい順）
+- 重いモジュール（pandas / cv2 / numpy / mss / pyautogui / pynput / win32com など）が起動時に読み込まれていないかの確認
+
+使い方（リポジトリのルートで実行）:
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --rounds 5 --top 30
+    python benchmarks/bench_startup.py --strict   # 重いモジュールが起動時に読み込まれた場合は終了コード 1
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 起動時に読み込まれてはいけないモジュール（ウィンドウ表示後のバックグラウンド読み込み・使用時に読み込む）
+HEAVY_MODULES = (
+    "pandas", "numpy", "cv2", "mss", "pyautogui", "pynput", "pyperclip", "pygetwindow", "win32com",
+)
+
+_FIRST_WINDOW = """
+import sys, time
+started = float(sys.argv[1])
+from app.main_app import ShutsuzuuApp
+imported = time.time()
+app = ShutsuzuuApp()
+app.update()
+shown = time.time()
+app.destroy()
+print(f"{imported - started:.6f} {shown - started:.6f}")
+"""
+
+
+def _run(args):
+    return subprocess.run([sys.executable] + args, cwd=ROOT, capture_output=True, text=True, encoding="utf-8",
+                          errors="replace")
+
+
+def measure_first_window(rounds):
+    """[(import 完了までの秒数, 最初の描画までの秒数), ...]。ウィンドウを作成できない環境ではエラー文字列。"""
+    results = []
+    for _ in range(rounds):
+        proc = _run(["-c", _FIRST_WINDOW, repr(time.time())])
+        if proc.returncode != 0:
+            return (proc.stderr.strip().splitlines() or ["不明なエラー"])[-1]
+        imported, shown = (float(v) for v in proc.stdout.split()[-2:])
+        results.append((imported, shown))
+    return results
+
+
+def measure_imports():
+    """python -X importtime の結果: ([(累積マイクロ秒, 自身のマイクロ秒, モジュール名), ...], 読み込めたかどうか)"""
+    proc = _run(["-X", "importtime", "-c", "import app.main_app"])
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, cumulative_us, name = (part.strip() for part in line[len("import time:"):].split("|", 2))
+        if not self_us.isdigit():
+            continue  # 見出し行
+        rows.append((int(cumulative_us), int(self_us), name))
+    if proc.returncode != 0:
+        print(f"⚠ app.main_app を読み込めません: {(proc.stderr.strip().splitlines() or [''])[-1]}")
+    return rows, proc.returncode == 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="起動時間の計測")
+    parser.add_argument("--rounds", type=int, default=3, help="ウィンドウ表示の計測回数")
+    parser.add_argument("--top", type=int, default=20, help="表示するモジュール数（累積時間の大きい順）")
+    parser.add_argument("--strict", action="store_true", help="重いモジュールが起動時に読み込まれた場合は失敗")
+    args = parser.parse_args()
+
+    print(f"Python {sys.version.split()[0]}")
+
+    # 最初のウィンドウ表示まで
+    results = measure_first_window(args.rounds)
+    if isinstance(results, str):
+        print(f"⚠ ウィンドウ表示を計測できません（ディスプレイ・依存モジュールを確認してください）: {results}")
+    else:
+        imported = [r[0] for r in results]
+        shown = [r[1] for r in results]
+        print(f"📊 import 完了まで: 中央値 {statistics.median(imported):.3f} 秒, 最小 {min(imported):.3f} 秒")
+        print(f"📊 最初のウィンドウ表示まで: 中央値 {statistics.median(shown):.3f} 秒, 最小 {min(shown):.3f} 秒"
+              f"（{len(shown)} 回）")
+
+    # モジュールごとの読み込み時間
+    rows, complete = measure_imports()
+    if rows:
+        print(f"\n読み込み時間（累積の大きい順、上位 {args.top}）:")
+        print(f"{'累積 ms':>9} {'自身 ms':>9}  モジュール")
+        for cumulative_us, self_us, name in sorted(rows, reverse=True)[:args.top]:
+            print(f"{cumulative_us / 1000:9.1f} {self_us / 1000:9.1f}  {name}")
+
+    loaded_heavy = sorted({name for _, _, name in rows if name in HEAVY_MODULES})
+    if loaded_heavy:
+        print(f"\n❌ 起動時に重いモジュールが読み込まれています: {', '.join(loaded_heavy)}")
+        if args.strict:
+            sys.exit(1)
+    elif complete:
+        print("\n✅ 起動時に重いモジュールは読み込まれていません")
+
+
+if __name__ == "__main__":
+    main()
@@ -40,3 +40,85 @@ HEADER_TEXT = "出図ツール"
 
 # Progress bar default length
 PROGRESS_LENGTH = 600
+
+
+# ===================== 検索・キャッシュ設定 =====================
+# 図面サーバーのルート
+SENYOUKI_DIR = "Y:\\専用機"
+HYOUJUNKI_DIR = "Y:\\標準機\\"
+
+
+def _get_cache_dir():
+    """
+    キャッシュ（インデックスなど）を保存するローカルディレクトリを返します。
+    - Windows: %LOCALAPPDATA%\\ShutsuzuTool
+    - その他: ~/.shutsuzu_tool
+    """
+    local_appdata = os.environ.get("LOCALAPPDATA")
+    if local_appdata:
+        return os.path.join(local_appdata, "ShutsuzuTool")
+    return os.path.join(os.path.expanduser("~"), ".shutsuzu_tool")
+
+CACHE_DIR = _get_cache_dir()
+
+# 品番 → ICDパス インデックス（SQLite）
+ICD_INDEX_PATH = os.path.join(CACHE_DIR, "icd_index.sqlite3")
+# 同じプロジェクトフォルダを再チェックする間隔（秒）
+ICD_INDEX_REFRESH_INTERVAL = 300
+
+# 品番検索の並列数（ファイルサーバーへの同時アクセス数）
+RESOLVE_WORKERS = 8
+# 並列数の上限（ファイルサーバーの過負荷を防ぐ）
+RESOLVE_MAX_WORKERS = 16
+
+# 未検出品番のキャッシュ（SQLite）
+MISS_CACHE_PATH = os.path.join(CACHE_DIR, "miss_cache.sqlite3")
+# 未検出結果の有効期間（秒）
+MISS_CACHE_TTL = 12 * 60 * 60
+
+# ステップ1: コピーの並列数と、検索→コピー間のキューの長さ
+COPY_WORKERS = 4
+COPY_QUEUE_SIZE = 32
+# コピー時の読み書きバッファサイズ（バイト）
+COPY_BUFFER_SIZE = 1024 * 1024
+
+# よく使う ICD ファイルのローカルミラー（コピー元パス + サイズ + 更新日時 で識別）
+ICD_MIRROR_ENABLED = True
+ICD_MIRROR_DIR = os.path.join(CACHE_DIR, "icd_mirror")
+# ミラーの容量上限（バイト）。超えた場合は最後に使われた日時が古いものから削除
+ICD_MIRROR_MAX_BYTES = 2 * 1024 * 1024 * 1024
+
+# 解析済み部品表（品番リスト・保留・追加）のキャッシュ（SQLite、ファイル内容のハッシュで識別）
+BOM_CACHE_PATH = os.path.join(CACHE_DIR, "bom_cache.sqlite3")
+# 保存する部品表の最大数。超えた場合は最後に使われた日時が古いものから削除
+BOM_CACHE_MAX_ENTRIES = 200
+
+# 処理記録（品番・コピー元・サイズ・チェックサム・各ステップの状態）の保存先。
+# 出力フォルダは納品物のため、ローカルに出力フォルダのパスごとに保存する
+MANIFEST_DIR = os.path.join(CACHE_DIR, "manifests")
+
+# コピー速度の記録（ステップ1の所要時間の見積もりに使用）
+COPY_HISTORY_PATH = os.path.join(CACHE_DIR, "copy_history.json")
+# 記録するコピー回数（新しいものから）
+COPY_HISTORY_SIZE = 20
+# 記録がない場合に仮定する共有フォルダからのコピー速度（MB/s）
+COPY_DEFAULT_MB_PER_SEC = 20.0
+# 開始時、出力フォルダ選択の前にステップ1の事前確認（検索・コピー量・所要時間の見積もり）を表示
+STEP1_PLAN_PREVIEW = True
+
+# 起動後、印刷・PDF変換用のモジュール（pyautogui / cv2 など）をバックグラウンドで読み込むまでの待ち時間（ミリ秒）
+STARTUP_WARMUP_DELAY_MS = 500
+
+# ファイルをドロップした時点で、ステップ1の事前確認（部品表の読み込み・品番検索）をバックグラウンドで開始
+STEP1_PREWORK_ON_DROP = True
+# ドロップ時の事前確認の結果を開始時に使う有効期間（秒）。これより古い結果は検索し直す
+STEP1_PREWORK_MAX_AGE = 10 * 60
+
+# 貼り付け（Ctrl+V）後、出力フォルダのファイルがそろって書き込みが止まるまで待つ設定
+PASTE_WAIT_TIMEOUT = 180       # 最大待ち時間（秒）
+PASTE_POLL_INTERVAL = 0.25     # フォルダを確認する間隔（秒）
+PASTE_SETTLE_SECONDS = 0.75    # サイズ・更新日時が変わらない状態がこの秒数続いたら完了
+PASTE_IDLE_TIMEOUT = 10        # 期待するファイルがそろわないまま、この秒数変化がなければ待つのをやめる
+
+# 変換後のPDFの検証（ヘッダー・%%EOF・startxref・ページ数）の並列数
+PDF_VALIDATE_WORKERS = 4
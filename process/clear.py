@@ -2,7 +2,9 @@
 import os
 import shutil
 import subprocess
+from utils.folder_snapshot import FolderSnapshot
 from utils.refresh_explore import refresh_explorer
+from utils.run_manifest import RunManifest, STAGE_CLEANUP
 
 def force_delete(file_path):
     """
@@ -17,7 +19,26 @@ def force_delete(file_path):
         return False
 
 
-def step4_cleanup(folder_path):
+def _walk_files(folder_path, snapshot):
+    """
+    (フォルダ, ファイル名一覧) を os.walk と同じ順番で返します。
+    出力フォルダ直下は snapshot（FolderSnapshot）の一覧を使い、サブフォルダだけを読み込みます。
+    """
+    yield folder_path, snapshot.names()
+    for name in snapshot.names(include_dirs=True):
+        if snapshot.is_dir(name):
+            for root, _, files in os.walk(snapshot.path(name)):
+                yield root, files
+
+
+def step4_cleanup(folder_path, snapshot=None):
+    """
+    ステップ4 (XDWモード用クリーンアップ):
+    - .xdw・Excel 以外のファイルを削除（"xdw file" フォルダは対象外）
+    - 空のフォルダを削除
+    snapshot: 出力フォルダの FolderSnapshot（任意）。ある場合は直下の一覧にそれを使い、削除を反映します
+    結果（削除数）は処理記録がある場合に保存します。
+    """
     try:
         if not os.path.exists(folder_path):
             print(f"❌ フォルダが存在しません: {folder_path}")
@@ -26,9 +47,10 @@ def step4_cleanup(folder_path):
         # ★ 残す拡張子（小文字で統一）
         keep_exts = {'.xdw', '.xls', '.xlsx', '.xlsm'}
         deleted_files = []
+        snapshot = snapshot or FolderSnapshot.scan(folder_path)
 
         # 1. Xóa file không thuộc keep_exits
-        for root, dirs, files in os.walk(folder_path):
+        for root, files in _walk_files(folder_path, snapshot):
             if "xdw file" in root:
                 continue
 
@@ -38,6 +60,8 @@ def step4_cleanup(folder_path):
                     file_path = os.path.join(root, file)
                     if force_delete(file_path):
                         deleted_files.append(file)
+                        if root == folder_path:
+                            snapshot.remove(file)
 
         # 2. Xóa thư mục rỗng (trừ "xdw file")
         for root, dirs, files in os.walk(folder_path):
@@ -47,6 +71,8 @@ def step4_cleanup(folder_path):
                     if not os.listdir(dir_path):
                         try:
                             shutil.rmtree(dir_path)
+                            if root == folder_path:
+                                snapshot.remove(d)
                         except Exception as e:
                             print(f"⚠ 空フォルダ削除失敗: {dir_path} | エラー: {e}")
 
@@ -66,6 +92,14 @@ def step4_cleanup(folder_path):
         else:
             print("ℹ 削除対象ファイルはありません。")
 
+        manifest = RunManifest.load(folder_path)
+        if manifest is not None:
+            try:
+                manifest.set_stage(STAGE_CLEANUP, deleted=len(deleted_files))
+                manifest.save()
+            except OSError as e:
+                print(f"⚠ 処理記録を保存できません: {e}")
+
         return True
 
     except Exception as e:
@@ -1,6 +1,8 @@
 import os
 import shutil
 import subprocess
+from utils.folder_snapshot import FolderSnapshot
+from utils.run_manifest import RunManifest, STAGE_CLEANUP
 
 
 def _force_delete_file(file_path):
@@ -28,12 +30,14 @@ def _force_delete_file(file_path):
         return False
 
 
-def step4_cleanup_pdf(output_dir):
+def step4_cleanup_pdf(output_dir, snapshot=None):
     """
     ステップ4 (PDFモード用クリーンアップ):
     - 出力フォルダ内のすべてのファイルを確認
     - PDF ファイルと Excel ファイルのみを保持
-    - その他のファイル（ICD, config.txt など）を削除
+    - その他のファイル（ICD・印刷の残り・.xdw・一時ファイルなど）を削除
+    snapshot: 出力フォルダの FolderSnapshot（任意）。ある場合はフォルダを読み込まずにその一覧を使い、削除を反映します
+    結果（削除数・失敗数）は処理記録がある場合に保存します。
     """
     try:
         if not os.path.isdir(output_dir):
@@ -44,28 +48,33 @@ def step4_cleanup_pdf(output_dir):
         deleted_files = []
         failed_files = []
         
+        manifest = RunManifest.load(output_dir)
+
         print(f"\n📂 クリーンアップ対象フォルダ: {output_dir}")
         print(f"📋 フォルダ内のファイル一覧:")
+        snapshot = snapshot or FolderSnapshot.scan(output_dir)
+        filenames = snapshot.names(include_dirs=True)
         
-        for filename in os.listdir(output_dir):
+        for filename in filenames:
             file_path = os.path.join(output_dir, filename)
             print(f"   - {filename}")
             
             # ディレクトリはスキップ
-            if os.path.isdir(file_path):
+            if snapshot.is_dir(filename):
                 print(f"      ℹ️ スキップ（フォルダです）")
                 continue
             
-            # PDF ファイルまたは Excel ファイルは保持
+            # PDF ファイル・Excel ファイルは保持
             if filename.lower().endswith(('.pdf', '.xlsx', '.xls')):
                 kept_files.append(filename)
                 print(f"      ✅ 保持: {filename}")
             else:
-                # その他のファイル（ICD, config.txt, 他）は削除
+                # その他のファイル（ICD, 他）は削除
                 print(f"      🗑️ 削除試行中...")
                 success = _force_delete_file(file_path)
                 if success:
                     deleted_files.append(filename)
+                    snapshot.remove(filename)
                 else:
                     print(f"      ❌ 削除失敗（諦めました）: {filename}")
                     failed_files.append((filename, "Force delete also failed"))
@@ -84,6 +93,10 @@ def step4_cleanup_pdf(output_dir):
             print(f"\n⚠️ 削除失敗したファイル:")
             for fname, error in failed_files:
                 print(f"   - {fname}: {error}")
+
+        if manifest is not None:
+            manifest.set_stage(STAGE_CLEANUP, deleted=len(deleted_files), failed=len(failed_files))
+            manifest.save()
         
         return True
 
@@ -1,18 +1,31 @@
 from tkinter import filedialog, messagebox
 import os
-import shutil
-import pandas as pd
 import re
-from utils.searchTools import search_number, search_gradually
+import threading
+import time
+from config.settings import ICD_MIRROR_ENABLED
+from utils.bom_cache import get_bom_cache
+from utils.bom_reader import filter_bom, iter_bom_rows
+from utils.copy_engine import CopyEngine, summarize_timings
+from utils.copy_history import record_copy_session
+from utils.fast_copy import fast_copy
+from utils.icd_mirror import get_icd_mirror
+from utils.part_resolver import resolve_parts
+from utils.run_manifest import RunManifest, STAGE_COPY
 
-def step1_create_and_copy(excel_path=None, icd_folder_path=None):
+def step1_create_and_copy(excel_path=None, icd_folder_path=None, resolve_workers=None, progress_callback=None,
+                          plan=None, use_miss_cache=True):
     """
     ステップ1:
     - Excelモード: Excelファイルから列Kを読み込みICDファイルをコピー
     - フォルダモード: 指定フォルダ内のすべての.icdファイルを直接コピー
     - ユーザーに出力フォルダを選択させる。
     - ICDフォルダから一致する.icdファイルをコピー。
-    - config.txtを保存。
+    - 処理記録を保存。
+    resolve_workers: 品番検索の並列数（None の場合は RESOLVE_WORKERS）
+    progress_callback: 進捗通知 (text, progress) を受け取る関数（任意、別スレッドから呼ばれます）
+    plan: 同じ部品表の事前確認の結果（process.plan.plan_step1、任意）。ある場合は品番の検索を省略
+    use_miss_cache: False の場合は未検出キャッシュを使わずに検索（前回見つからなかった品番も再検索）
     戻り値:
         成功時: {output_folder, excel_name_clean, copied_count}
         エラー時: {"error": "エラーメッセージ"}
@@ -20,9 +33,9 @@ def step1_create_and_copy(excel_path=None, icd_folder_path=None):
     try:
         # モード判定
         if excel_path and not icd_folder_path:
-            return _step1_excel_mode(excel_path)
+            return _step1_excel_mode(excel_path, resolve_workers, progress_callback, plan, use_miss_cache)
         elif icd_folder_path and not excel_path:
-            return _step1_folder_mode(icd_folder_path)
+            return _step1_folder_mode(icd_folder_path, progress_callback)
         else:
             return {"error": "ExcelファイルまたはICDフォルダのいずれかを選択してください。"}
 
@@ -30,7 +43,7 @@ def step1_create_and_copy(excel_path=None, icd_folder_path=None):
         return {"error": f"エラーが発生しました: {str(e)}"}
 
 
-def _step1_excel_mode(excel_path):
+def _step1_excel_mode(excel_path, resolve_workers=None, progress_callback=None, plan=None, use_miss_cache=True):
     """
     Excelモード処理
     """
@@ -46,64 +59,49 @@ def _step1_excel_mode(excel_path):
             return {"error": "出力フォルダが選択されませんでした。"}
 
         # Excel名からクリーンな名前を生成
-        excel_name_clean = excel_name.split("-", 1)[1]
-        excel_name_clean = re.sub(r"\(.*?\)", "", excel_name_clean).strip()
+        excel_name_clean = _clean_excel_name(excel_name)
 
         # サブフォルダ作成
         target_folder = os.path.join(output_folder, excel_name_clean)
         target_folder = os.path.normpath(target_folder)
         
-        if os.path.exists(target_folder):
+        # 同じ部品表の処理記録があるフォルダは、前回の続きから再開する
+        journal, verified = _open_journal(target_folder, excel_path, "excel", excel_name_clean)
+        if journal is None:
             return {"error": f"フォルダ '{excel_name_clean}' は既に存在します。別のExcelファイルを選択してください。"}
-        os.makedirs(target_folder)
-
-        # Excel列K読み込み
-        df = pd.read_excel(excel_path, usecols="K,AB,AD", skiprows=7, header=None)
-        df.columns = ["K", "AB", "AD"]
-        df["AD"] = df["AD"].astype(str).str.strip()
+        if verified is None:
+            return journal.step1_info()
 
-        # フィルタリング前に保持と追加を確認する
-        skipped_due_to_hold = df[df["AD"] == "保留"]["K"].dropna().astype(str).str.strip().tolist()
-        added_due_to_addition = df[df["AD"] == "追加"]["K"].dropna().astype(str).str.strip().tolist()
-
-        # 「追加」の有無を確認する
-        has_addition = not df[df["AD"] == "追加"].empty
-        
-        if has_addition:
-            filtered_df = df[(df["AD"] == "追加") & (df["K"].notna()) & (df["K"] != 0)]
-        else:
-            filtered_df = df[
-                (df["K"].notna()) & (df["K"] != 0) &
-                (df["AD"] != "保留") &
-                (df["AB"].notna()) & (df["AB"] != "") & (df["AB"].astype(str) != "0")
-            ]
+        # 部品表から品番・保留・追加を取得（内容が同じ部品表はキャッシュから）
+        part_numbers, skipped_due_to_hold, added_due_to_addition = _load_bom(excel_path)
 
-        if filtered_df.empty:
+        if not part_numbers:
             messagebox.showwarning("データなし","Excelファイルに有効な部品番号がありません。")
             return None
         
-        # ICDファイルコピー
-        copied_files = []
-        not_found = []
-        for _, row in filtered_df.iterrows():
-            part_number = str(row["K"]).strip()
-            status_ad = row["AD"]
-            found_file = search_number(part_number)  # 専用機
-            if not found_file:
-                found_file = search_gradually('Y:\\標準機\\', part_number)  # 標準機
-            if found_file:
-                shutil.copy(found_file, target_folder)
-                copied_files.append(found_file)
-            else:
-                not_found.append(part_number)
+        # 事前確認で検索済みの場合は、その結果を使用
+        preresolved = None
+        if plan and plan.get("source") == excel_path and plan.get("part_numbers") == part_numbers:
+            preresolved = (plan["resolved"], plan["cached_misses"])
 
-        # config.txt保存
-        with open(os.path.join(target_folder, "config.txt"), "w", encoding="utf-8") as f:
-            for file in copied_files:
-                f.write(file + "\n")
+        # ICDファイル検索（専用機 → 標準機、並列）とコピーを同時に実行（検証済みのコピーは省略）
+        copied_files, not_found, cached_misses, copy_timings, copy_stats, part_records = _resolve_and_copy(
+            part_numbers, target_folder, resolve_workers, progress_callback, journal=journal, verified=verified,
+            preresolved=preresolved, use_miss_cache=use_miss_cache,
+        )
+        record_copy_session(copy_stats)
+
+        # 処理記録保存
+        journal.data["skipped_due_to_hold"] = skipped_due_to_hold
+        journal.data["added_due_to_addition"] = added_due_to_addition
+        _write_manifest(journal, part_records)
 
         print(f"Copied {len(copied_files)} files to {target_folder}")
-        
+        _print_copy_stats(copy_stats)
+
+        if cached_misses:
+            print(f"ℹ 未検出キャッシュにより検索を省略した部品番号: {len(cached_misses)} 件")
+
         if skipped_due_to_hold:
             print("❌ 保留のためコピーしなかった部品番号:")
             for part in skipped_due_to_hold:
@@ -119,16 +117,254 @@ def _step1_excel_mode(excel_path):
             "excel_name_clean": excel_name_clean,
             "copied_count": len(copied_files),
             "not_found": not_found,
+            "cached_misses": cached_misses,
             "icd_list": copied_files,
             "skipped_due_to_hold": skipped_due_to_hold,
-            "added_due_to_addition": added_due_to_addition
+            "added_due_to_addition": added_due_to_addition,
+            "copy_timings": copy_timings,
+            "copy_stats": copy_stats
         }
 
     except Exception as e:
         return {"error": f"Excelモード処理エラー: {str(e)}"}
 
 
-def _step1_folder_mode(icd_folder_path):
+def _clean_excel_name(excel_name):
+    """"LS-xxxx(yy)" → "xxxx"（出力サブフォルダ名）"""
+    excel_name_clean = excel_name.split("-", 1)[1]
+    return re.sub(r"\(.*?\)", "", excel_name_clean).strip()
+
+
+def _parse_bom(excel_path):
+    """部品表（列K・AB・AD、8行目から）を読み込み、(品番リスト, 保留の品番, 追加の品番) を返します。"""
+    return filter_bom(iter_bom_rows(excel_path, columns=("K", "AB", "AD"), first_row=8))
+
+
+def _load_bom(excel_path):
+    """
+    _parse_bom の結果をファイル内容のハッシュでキャッシュします。
+    内容が変わっていない部品表は Excel を解析しません。
+    """
+    cache = key = None
+    try:
+        cache = get_bom_cache()
+        key = cache.key_for(excel_path)
+        cached = cache.get(key)
+        if cached is not None:
+            print(f"ℹ 部品表キャッシュを使用: {os.path.basename(excel_path)}")
+            return cached["part_numbers"], cached["skipped_due_to_hold"], cached["added_due_to_addition"]
+    except Exception as e:
+        print(f"⚠ 部品表キャッシュを使用できません: {e}")
+        cache = None
+
+    part_numbers, skipped_due_to_hold, added_due_to_addition = _parse_bom(excel_path)
+
+    if cache is not None:
+        try:
+            cache.put(key, {
+                "part_numbers": part_numbers,
+                "skipped_due_to_hold": skipped_due_to_hold,
+                "added_due_to_addition": added_due_to_addition,
+            })
+        except Exception as e:
+            print(f"⚠ 部品表キャッシュを保存できません: {e}")
+    return part_numbers, skipped_due_to_hold, added_due_to_addition
+
+
+def _open_journal(target_folder, source, mode, name):
+    """
+    出力サブフォルダと処理記録（MANIFEST_DIR に出力フォルダのパスごとに保存）を準備します。
+    - フォルダがない: 作成して新しい記録を保存（削除されたフォルダの古い記録は置き換える）
+    - 同じ入力（部品表は内容も同じ）の記録があるフォルダ: 前回の記録を使用（再開）
+    - 交換まで完了済みのフォルダ: ICD は削除済みのため、コピーはせず交換の後から再開
+    戻り値: (RunManifest, 検証済みコピー {コピー元パス: コピー結果})
+            ステップ1が完了済みで、コピーがすべて検証できた場合・交換まで完了済みの場合は (RunManifest, None)
+            再開できない既存フォルダ（別の入力・部品表が変更された）の場合は (None, None)
+    """
+    if not os.path.exists(target_folder):
+        os.makedirs(target_folder)
+        journal = RunManifest.create(target_folder, source, mode, name)
+        journal.set_stage(STAGE_COPY, "running")
+        journal.save()
+        return journal, {}
+
+    journal = RunManifest.load(target_folder)
+    if journal is None or not journal.same_source(source):
+        return None, None
+
+    if journal.delivered():
+        print(f"ℹ 交換まで完了済みのフォルダです（コピーは行いません）: {target_folder}")
+        return journal, None
+
+    verified = journal.verified_copies()
+    if journal.stage_done(STAGE_COPY) and all(p["source"] in verified for p in journal.copied_parts()):
+        print(f"ℹ 前回の処理を再開します（{journal.last_completed_stage()} まで完了）: {target_folder}")
+        return journal, None
+
+    print(f"ℹ 前回のコピーを再開します（検証済み {len(verified)} ファイルは省略）: {target_folder}")
+    journal.set_stage(STAGE_COPY, "running")
+    journal.save()
+    return journal, verified
+
+
+def _write_manifest(journal, part_records):
+    """
+    処理記録に品番ごとの結果を保存し、ステップ1を完了にします（config.txt の代わり）。
+    part_records: [(品番, コピー結果 or None), ...]（None は ICD 未検出）
+    """
+    journal.data["parts"] = []
+    for part_number, record in part_records:
+        if record:
+            journal.add_copied(part_number, record)
+        else:
+            journal.add_missing(part_number)
+    journal.set_stage(STAGE_COPY)
+    journal.save()
+    return journal
+
+
+def _journal_callback(journal, interval=1.0):
+    """CopyEngine の on_file_done 用: コピー完了を記録し、interval 秒に1回まで途中保存します。"""
+    if journal is None:
+        return None
+    lock = threading.Lock()
+    last_save = [0.0]
+
+    def _on_file_done(record):
+        journal.record_copy(record)
+        now = time.monotonic()
+        with lock:
+            if now - last_save[0] < interval:
+                return
+            last_save[0] = now
+        try:
+            journal.save()
+        except OSError as e:
+            print(f"⚠ 処理記録を保存できません: {e}")
+
+    return _on_file_done
+
+
+def _get_mirror():
+    """ICDミラー（設定で無効の場合は None）"""
+    if not ICD_MIRROR_ENABLED:
+        return None
+    try:
+        return get_icd_mirror()
+    except Exception as e:
+        print(f"⚠ ICDミラーを使用できません: {e}")
+        return None
+
+
+def _print_copy_stats(copy_stats):
+    """
+    コピーの集計（共有フォルダ読み込み / ローカル書き込みの時間、ミラーのヒット率）を表示。
+    読み込み / 書き込みの内訳は計測できた方式（buffered）の分だけ表示し、
+    OS にまとめて任せた方式（CopyFileExW など）は「OSコピー」の時間として表示します。
+    """
+    timing = []
+    if copy_stats["read_seconds"] or copy_stats["write_seconds"]:
+        timing.append(f"読み込み {copy_stats['read_seconds']:.1f} 秒 / 書き込み {copy_stats['write_seconds']:.1f} 秒")
+    if copy_stats.get("combined_seconds"):
+        timing.append(f"OSコピー {copy_stats['combined_seconds']:.1f} 秒（読み込み・書き込みの内訳なし）")
+    print(
+        f"📊 コピー: {copy_stats['files']} ファイル, {copy_stats['bytes'] / (1024 * 1024):.1f} MB, "
+        f"{copy_stats['elapsed']:.1f} 秒 ({copy_stats['mb_per_sec']:.1f} MB/s, {copy_stats['files_per_sec']:.1f} ファイル/s)"
+        + "".join(f" | {t}" for t in timing)
+    )
+    if copy_stats["cache_hits"] or copy_stats["cache_misses"]:
+        print(
+            f"📦 ICDミラー: ヒット {copy_stats['cache_hits']} / ミス {copy_stats['cache_misses']} "
+            f"(ヒット率 {copy_stats['hit_ratio']:.0%}, 節約 {copy_stats['bytes_saved'] / (1024 * 1024):.1f} MB)"
+        )
+
+
+def _format_copy_progress(snap):
+    """コピー進捗の表示文字列（MB・MB/s・ファイル/s）"""
+    mb_done = snap["bytes_done"] / (1024 * 1024)
+    return f"{mb_done:.1f} MB, {snap['mb_per_sec']:.1f} MB/s, {snap['files_per_sec']:.1f} ファイル/s"
+
+
+def _resolve_and_copy(part_numbers, target_folder, resolve_workers=None, progress_callback=None,
+                      journal=None, verified=None, preresolved=None, use_miss_cache=True):
+    """
+    検索とコピーのパイプライン:
+    - 検索側は見つかったICDパスを CopyEngine の上限付きキューに入れる
+    - コピー側（COPY_WORKERS スレッド）はキューから取り出して同時にコピーする
+    - verified（前回コピー済みで検証できたもの）に含まれるICDはコピーしない
+    - journal: コピー完了ごとに記録する処理記録（任意、異常終了後の再開用）
+    - preresolved: 検索済みの結果 (resolve_parts の戻り値、任意)。ある場合は検索せずにコピーだけ行う
+    戻り値: (copied_files, not_found, cached_misses, copy_timings, copy_stats, part_records)
+            ※ copied_files / not_found / part_records（[(品番, コピー結果 or None), ...]）はBOMの順番
+    """
+    total = len(set(part_numbers))
+    verified = verified or {}
+    lock = threading.Lock()
+    state = {"resolved": 0, "found": 0}
+    queued_sources = set(verified)
+
+    def _report(snap=None):
+        if not progress_callback:
+            return
+        snap = snap or engine.snapshot()
+        with lock:
+            resolved, found = state["resolved"], state["found"]
+        # 未検出 = 完了。見つかった品番は、サイズ判明済みファイルの平均から総バイト数を見積もって進捗を計算
+        byte_ratio = 0.0
+        if snap["files_sized"]:
+            estimated_bytes = snap["bytes_total"] / snap["files_sized"] * found
+            byte_ratio = min(1.0, snap["bytes_done"] / estimated_bytes) if estimated_bytes else 1.0
+        done = (resolved - found) + found * byte_ratio
+        progress = 25 + int(25 * done / max(total, 1))
+        progress_callback(
+            f"ステップ1: 検索 {resolved}/{total}・コピー {snap['files_done']}/{found} ({_format_copy_progress(snap)})",
+            progress,
+        )
+
+    def _on_resolved(part_number, found_file):
+        with lock:
+            state["resolved"] += 1
+            is_new_source = bool(found_file) and found_file not in queued_sources
+            if found_file:
+                state["found"] += 1
+                queued_sources.add(found_file)
+        if is_new_source:
+            engine.submit(found_file)  # キューが満杯の場合は検索側が待つ
+        _report()
+
+    engine = CopyEngine(target_folder, progress_callback=_report, mirror=_get_mirror(), checksum=True,
+                        on_file_done=_journal_callback(journal)).start()
+    try:
+        if preresolved:
+            resolved, cached_misses = preresolved
+            for part_number, found_file in dict(resolved).items():
+                _on_resolved(part_number, found_file)
+        else:
+            resolved, cached_misses = resolve_parts(part_numbers, workers=resolve_workers, on_resolved=_on_resolved,
+                                                    use_miss_cache=use_miss_cache)
+    finally:
+        timings = engine.finish()
+
+    errors = [t for t in timings if t["error"]]
+    if errors:
+        raise Exception(f"コピー失敗: {errors[0]['source']} ({errors[0]['error']})")
+
+    records = dict(verified)
+    records.update((t["source"], t) for t in timings)
+    copied_files = []
+    not_found = []
+    part_records = []
+    for part_number, found_file in resolved:
+        record = records.get(found_file) if found_file else None
+        part_records.append((part_number, record))
+        if record:
+            copied_files.append(found_file)
+        else:
+            not_found.append(part_number)
+    return copied_files, not_found, cached_misses, timings, engine.stats(), part_records
+
+
+def _step1_folder_mode(icd_folder_path, progress_callback=None):
     """
     フォルダモード処理: 指定フォルダ内の "drawing" サブフォルダを検索し、
     そこから.icdファイルを取得（ASで始まるファイルは除外、サブフォルダは除外）
@@ -153,49 +389,322 @@ def _step1_folder_mode(icd_folder_path):
         target_folder = os.path.join(output_folder, parent_folder_name)
         target_folder = os.path.normpath(target_folder)
 
-        if os.path.exists(target_folder):
+        # 同じICDフォルダの処理記録があるフォルダは、前回の続きから再開する
+        journal, verified = _open_journal(target_folder, icd_folder_path, "folder", parent_folder_name)
+        if journal is None:
             return {"error": f"フォルダ '{parent_folder_name}' は既に存在します。別のフォルダを選択してください。"}
-        
-        os.makedirs(target_folder)
+        if verified is None:
+            return journal.step1_info()
 
         # drawing フォルダ内のすべての.icdファイルを取得（サブフォルダは除外）
-        copied_files = []
-        
-        icd_files = [f for f in os.listdir(drawing_folder) 
-                     if os.path.isfile(os.path.join(drawing_folder, f)) and f.lower().endswith('.icd')]
+        with os.scandir(drawing_folder) as it:
+            icd_entries = [(e.path, e.stat().st_size) for e in it
+                           if e.is_file() and e.name.lower().endswith('.icd')]
 
-        if not icd_files:
+        if not icd_entries:
             return {"error": f"drawing フォルダに.icdファイルが見つかりません: {drawing_folder}"}
 
-        for icd_file in icd_files:
-            src_path = os.path.join(drawing_folder, icd_file)
-            dst_path = os.path.join(target_folder, icd_file)
-            try:
-                shutil.copy(src_path, dst_path)
+        total_bytes = sum(size for _, size in icd_entries)
+
+        def _report(snap):
+            if progress_callback:
+                ratio = snap["bytes_done"] / total_bytes if total_bytes else snap["files_done"] / len(icd_entries)
+                progress_callback(
+                    f"ステップ1: コピー {snap['files_done']}/{len(icd_entries)} ({_format_copy_progress(snap)})",
+                    25 + int(25 * min(ratio, 1.0)),
+                )
+
+        with CopyEngine(target_folder, progress_callback=_report, mirror=_get_mirror(), checksum=True,
+                        on_file_done=_journal_callback(journal)) as engine:
+            for src_path, size in icd_entries:
+                if src_path not in verified:
+                    engine.submit(src_path, size=size)
+        copy_timings = engine.timings
+        copy_stats = engine.stats()
+        record_copy_session(copy_stats)
+
+        results = dict(verified)
+        results.update((t["source"], t) for t in copy_timings)
+        copied_files = []
+        for src_path, _ in icd_entries:
+            error = results[src_path]["error"]
+            if error:
+                print(f"❌ コピー失敗: {os.path.basename(src_path)} - {error}")
+            else:
                 copied_files.append(src_path)
-                print(f"✅ コピー: {icd_file}")
-            except Exception as e:
-                print(f"❌ コピー失敗: {icd_file} - {str(e)}")
+                print(f"✅ コピー: {os.path.basename(src_path)}")
 
         if not copied_files:
             return {"error": f"コピーするICDファイルが見つかりません"}
 
-        # config.txt保存
-        with open(os.path.join(target_folder, "config.txt"), "w", encoding="utf-8") as f:
-            for file in copied_files:
-                f.write(file + "\n")
+        # 処理記録保存
+        _write_manifest(
+            journal, [(os.path.splitext(os.path.basename(src))[0], results[src]) for src, _ in icd_entries]
+        )
 
         print(f"Copied {len(copied_files)} files to {target_folder}")
+        _print_copy_stats(copy_stats)
 
         return {
             "output_folder": target_folder,
             "excel_name_clean": parent_folder_name,
             "copied_count": len(copied_files),
             "not_found": [],
+            "cached_misses": {},
             "icd_list": copied_files,
             "skipped_due_to_hold": [],
-            "added_due_to_addition": []
+            "added_due_to_addition": [],
+            "copy_timings": copy_timings,
+            "copy_stats": copy_stats
         }
 
     except Exception as e:
-        return {"error": f"フォルダモード処理エラー: {str(e)}"}
\ No newline at end of file
+        return {"error": f"フォルダモード処理エラー: {str(e)}"}
+
+
+def step1_batch_create_and_copy(paths, resolve_workers=None, progress_callback=None, use_miss_cache=True):
+    """
+    ステップ1（一括）: 複数の部品表（LS-*.xlsx）・ICDフォルダをまとめて処理します。
+    - 出力フォルダは1回だけ選択
+    - すべての部品表の品番を1回の検索（共有キャッシュ・並列）でまとめて解決
+    - 同じICDは共有フォルダから1回だけコピーし、他の出力フォルダへはローカルで複製
+    use_miss_cache: False の場合は未検出キャッシュを使わずに検索
+    戻り値:
+        成功時: paths と同じ順番の [step1_create_and_copy と同じ形式の結果, ...]
+                （部品表ごとのエラーは {"error": ...}、有効な品番がない場合は None）
+        エラー時: {"error": "エラーメッセージ"}
+    """
+    try:
+        if not paths:
+            return {"error": "ExcelファイルまたはICDフォルダを選択してください。"}
+
+        output_folder = filedialog.askdirectory(title="出力フォルダを選択してください")
+        if not output_folder:
+            return {"error": "出力フォルダが選択されませんでした。"}
+
+        jobs = [_prepare_batch_job(path, output_folder) for path in paths]
+
+        # 品番 → 必要な出力フォルダ（ジョブ番号、重複なし・入力順）。再開するジョブ・エラーのジョブは検索しない
+        part_jobs = {}
+        for i, job in enumerate(jobs):
+            if not job.get("target_folder") or job.get("resumed"):
+                continue
+            for part in job.get("part_numbers", []):
+                part_jobs.setdefault(part, [])
+                if i not in part_jobs[part]:
+                    part_jobs[part].append(i)
+
+        resolved, cached_misses, timings, session_stats = _batch_resolve_and_copy(
+            jobs, part_jobs, resolve_workers, progress_callback, use_miss_cache
+        )
+
+        results = [
+            _finish_batch_job(i, job, resolved, cached_misses, timings, session_stats)
+            for i, job in enumerate(jobs)
+        ]
+        record_copy_session(session_stats)
+        print(f"📦 一括処理: {len(jobs)} 件（共有フォルダからのコピー {session_stats['files']} ファイル）")
+        _print_copy_stats(session_stats)
+        return results
+
+    except Exception as e:
+        return {"error": f"一括処理エラー: {str(e)}"}
+
+
+def _prepare_batch_job(path, output_folder):
+    """
+    一括処理の1件分（部品表またはICDフォルダ）を検証し、出力サブフォルダと処理記録を準備します（_open_journal）。
+    同じ入力の処理記録があるフォルダは、1件の処理と同じように再開します。
+    戻り値: ジョブ情報（dict）。問題がある場合は "error" を含みます。
+            ステップ1が完了済みの場合は "resumed"（処理記録から作った結果）、
+            途中まで完了している場合は "verified"（検証済みのコピー）を含みます。
+    """
+    job = {"path": path, "part_numbers": [], "icd_entries": []}
+    try:
+        if os.path.isdir(path):
+            drawing_folder = os.path.join(path, "drawing")
+            if not os.path.isdir(drawing_folder):
+                job["error"] = f"'drawing' フォルダが見つかりません: {drawing_folder}"
+                return job
+            with os.scandir(drawing_folder) as it:
+                job["icd_entries"] = [(e.path, e.stat().st_size) for e in it
+                                      if e.is_file() and e.name.lower().endswith('.icd')]
+            if not job["icd_entries"]:
+                job["error"] = f"drawing フォルダに.icdファイルが見つかりません: {drawing_folder}"
+                return job
+            job["name"] = os.path.basename(path.rstrip("\\").rstrip("/"))
+            job["mode"] = "folder"
+        else:
+            excel_name = os.path.splitext(os.path.basename(path))[0]
+            if not excel_name.startswith("LS-"):
+                job["error"] = f"製作部品表ではありません（ファイル名は 'LS-' で始まる必要があります）: {os.path.basename(path)}"
+                return job
+            job["name"] = _clean_excel_name(excel_name)
+            job["mode"] = "excel"
+            job["part_numbers"], job["skipped_due_to_hold"], job["added_due_to_addition"] = _load_bom(path)
+            if not job["part_numbers"]:
+                job["empty"] = True
+                print(f"⚠ Excelファイルに有効な部品番号がありません: {os.path.basename(path)}")
+                return job
+
+        target_folder = os.path.normpath(os.path.join(output_folder, job["name"]))
+        journal, verified = _open_journal(target_folder, path, job["mode"], job["name"])
+        if journal is None:
+            job["error"] = f"フォルダ '{job['name']}' は既に存在します。"
+            return job
+        job["target_folder"] = target_folder
+        job["journal"] = journal
+        if verified is None:
+            job["resumed"] = journal.step1_info()
+        else:
+            job["verified"] = verified
+    except Exception as e:
+        job["error"] = f"{os.path.basename(path)}: {str(e)}"
+    return job
+
+
+def _batch_resolve_and_copy(jobs, part_jobs, resolve_workers=None, progress_callback=None, use_miss_cache=True):
+    """
+    一括処理の検索とコピー（_resolve_and_copy の複数出力フォルダ版）:
+    - 同じICDは最初に必要とする出力フォルダへ共有フォルダから1回だけコピー
+    - コピー完了後、他の出力フォルダへはそのファイルからローカルで複製
+    戻り値: ({品番: ICDパス or None}, cached_misses, {(ICDパス, ジョブ番号): コピー結果}, 共有フォルダからのコピーの集計)
+    """
+    active = [i for i, job in enumerate(jobs) if job.get("target_folder") and not job.get("resumed")]
+    source_jobs = {}  # ICDパス → 必要なジョブ番号（入力順）
+    lock = threading.Lock()
+    state = {"resolved": 0}
+    total = len(part_jobs)
+
+    def _need(src, i, size=None):
+        """ICDを出力フォルダ i にも必要として登録し、初めてのICDならコピーを開始"""
+        if src in jobs[i].get("verified", {}):
+            return  # 前回コピー済み（検証済み）
+        with lock:
+            first = src not in source_jobs
+            source_jobs.setdefault(src, [])
+            if i not in source_jobs[src]:
+                source_jobs[src].append(i)
+        if first:
+            dest = os.path.join(jobs[i]["target_folder"], os.path.basename(src))
+            engine.submit(src, size=size, dest=dest)
+
+    def _report(snap=None):
+        if progress_callback:
+            snap = snap or engine.snapshot()
+            progress_callback(
+                f"ステップ1(一括): 検索 {state['resolved']}/{total}・コピー {snap['files_done']}/{snap['files_submitted']} "
+                f"({_format_copy_progress(snap)})",
+                25 + int(25 * state["resolved"] / max(total, 1)),
+            )
+
+    def _on_resolved(part_number, found_file):
+        with lock:
+            state["resolved"] += 1
+        if found_file:
+            for i in part_jobs.get(part_number, []):
+                _need(found_file, i)
+        _report()
+
+    engine = CopyEngine(None, progress_callback=_report, mirror=_get_mirror(), checksum=True).start()
+    resolved, cached_misses = {}, {}
+    try:
+        # ICDフォルダのファイルは検索不要
+        for i in active:
+            for src_path, size in jobs[i]["icd_entries"]:
+                _need(src_path, i, size)
+        if part_jobs:
+            resolved_list, cached_misses = resolve_parts(
+                list(part_jobs), workers=resolve_workers, on_resolved=_on_resolved, use_miss_cache=use_miss_cache
+            )
+            resolved = dict(resolved_list)
+    finally:
+        engine.finish()
+
+    # 共有フォルダからのコピー結果を、他の出力フォルダへ複製
+    timings = {}
+    primary = {t["source"]: t for t in engine.timings}
+    for src, job_indexes in source_jobs.items():
+        first_record = primary.get(src) or {
+            "source": src, "dest": os.path.join(jobs[job_indexes[0]]["target_folder"], os.path.basename(src)),
+            "bytes": 0, "method": None, "cache": None, "read_seconds": 0.0, "write_seconds": 0.0,
+            "seconds": 0.0, "error": "コピーされていません", "size": None, "mtime": None, "checksum": None,
+        }
+        timings[(src, job_indexes[0])] = first_record
+        for i in job_indexes[1:]:
+            dest = os.path.join(jobs[i]["target_folder"], os.path.basename(src))
+            record = {"source": src, "dest": dest, "bytes": 0, "method": None, "cache": "shared",
+                      "read_seconds": 0.0, "write_seconds": 0.0, "seconds": 0.0, "error": None,
+                      "size": first_record.get("size"), "mtime": first_record.get("mtime"),
+                      "checksum": first_record.get("checksum")}
+            if first_record["error"]:
+                record["error"] = first_record["error"]
+            else:
+                started = time.perf_counter()
+                try:
+                    result = fast_copy(first_record["dest"], dest, preserve_metadata=True)
+                    record.update(bytes=result["bytes"], method=result["method"])
+                except Exception as e:
+                    record["error"] = str(e)
+                record["seconds"] = time.perf_counter() - started
+            timings[(src, i)] = record
+    return resolved, cached_misses, timings, engine.stats()
+
+
+def _finish_batch_job(index, job, resolved, cached_misses, timings, session_stats):
+    """一括処理の1件分の結果を step1_create_and_copy と同じ形式にまとめ、処理記録を保存します。"""
+    if job.get("error"):
+        return {"error": job["error"]}
+    if job.get("empty"):
+        return None
+    if job.get("resumed"):
+        return job["resumed"]
+
+    records = dict(job.get("verified", {}))
+    records.update((src, record) for (src, i), record in timings.items() if i == index)
+
+    copied_files = []
+    not_found = []
+    part_records = []
+    if job["mode"] == "excel":
+        for part_number in job["part_numbers"]:
+            found_file = resolved.get(part_number)
+            record = records.get(found_file) if found_file else None
+            part_records.append((part_number, record))
+            if record and not record["error"]:
+                copied_files.append(found_file)
+            else:
+                not_found.append(part_number)
+    else:
+        for src_path, _ in job["icd_entries"]:
+            record = records.get(src_path)
+            part_records.append((os.path.splitext(os.path.basename(src_path))[0], record))
+            if record and not record["error"]:
+                copied_files.append(src_path)
+            else:
+                print(f"❌ コピー失敗: {os.path.basename(src_path)} - {record['error'] if record else '不明'}")
+
+    failed = [r for r in records.values() if r["error"]]
+    if job["mode"] == "excel" and failed:
+        return {"error": f"コピー失敗: {failed[0]['source']} ({failed[0]['error']})"}
+    if job["mode"] == "folder" and not copied_files:
+        return {"error": f"コピーするICDファイルが見つかりません: {job['name']}"}
+
+    job["journal"].data["skipped_due_to_hold"] = job.get("skipped_due_to_hold", [])
+    job["journal"].data["added_due_to_addition"] = job.get("added_due_to_addition", [])
+    _write_manifest(job["journal"], part_records)
+    print(f"Copied {len(copied_files)} files to {job['target_folder']}")
+
+    copy_timings = list(records.values())
+    return {
+        "output_folder": job["target_folder"],
+        "excel_name_clean": job["name"],
+        "copied_count": len(copied_files),
+        "not_found": not_found,
+        "cached_misses": {p: cached_misses[p] for p in job["part_numbers"] if p in cached_misses},
+        "icd_list": copied_files,
+        "skipped_due_to_hold": job.get("skipped_due_to_hold", []),
+        "added_due_to_addition": job.get("added_due_to_addition", []),
+        "copy_timings": copy_timings,
+        "copy_stats": summarize_timings(copy_timings, session_stats["elapsed"]),
+    }
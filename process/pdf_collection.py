@@ -4,28 +4,46 @@ import pyautogui
 import pyperclip
 from utils.emergency_stop import emergency_manager
 from utils.check_ICAD_and_Docuworks import ensure_docuworks_running
+from utils.file_compare import compare_icd_outputs
+from utils.run_manifest import RunManifest
+from utils.stable_files import wait_for_stable_files
 
 
-def compare_icd_pdf(output_folder, icd_list):
+def compare_icd_pdf(output_folder, icd_list=None, snapshot=None):
     """
     ICDファイル（Step 1でコピーした）とPDFファイル（Step 4で貼り付けた）を比較
+    ICD側は処理記録から取得し、記録がない場合のみ icd_list を使用。
+    名前は正規化して比較し（大文字小文字・全角半角・-3D の違いは一致）、結果は処理記録に保存します。
+    snapshot: 出力フォルダの FolderSnapshot（任意）
     
-    戻り値:
+    戻り値: compare_names と同じ dict
         missing: ICDあるがPDFにない
         extra: PDFあるがICDにない
+        matched / normalized: 一致した ICD・表記違いで一致した (ICD, PDF) の組
     """
-    # ICD ファイル名リスト（拡張子なし）
-    icd_files = [os.path.splitext(os.path.basename(f))[0] for f in icd_list]
+    return compare_icd_outputs(output_folder, ".pdf", icd_list, snapshot)
 
-    # PDF ファイル名リスト（拡張子なし、出力フォルダから検索）
-    pdf_files = [os.path.splitext(f)[0] for f in os.listdir(output_folder) 
-                 if f.lower().endswith(".pdf")]
 
-    # 比較
-    missing = [icd for icd in icd_files if icd not in pdf_files]
-    extra = [pdf for pdf in pdf_files if pdf not in icd_files]
-
-    return missing, extra
+def _wait_for_paste(output_dir, expected=None, progress_callback=None):
+    """
+    貼り付けたPDFがそろい、Explorer の書き込みが終わるまで待ちます（固定の sleep の代わり）。
+    expected: 期待するPDF名（拡張子なし）。None の場合は処理記録の ICD ファイル名、
+              記録もない場合は書き込みが止まるまで
+    progress_callback(届いた数, 期待する数): 貼り付け中の到着状況（任意）
+    """
+    if expected is None:
+        manifest = RunManifest.load(output_dir)
+        expected = [os.path.splitext(f)[0] for f in manifest.icd_files()] if manifest is not None else None
+    result = wait_for_stable_files(output_dir, ".pdf", expected, should_stop=emergency_manager.is_stop_requested,
+                                   on_progress=progress_callback)
+    if result["stable"]:
+        print(f"✅ 貼り付け完了を確認: PDF {result['arrived']}/{result['total'] or result['files']} 件"
+              f"（{result['seconds']:.1f} 秒）")
+    elif result["idle"]:
+        print(f"⚠ 貼り付けが止まりましたが、PDFが {len(result['missing'])} 件不足しています")
+    elif result["timed_out"]:
+        print(f"⚠ 貼り付けが {result['seconds']:.0f} 秒以内に完了しませんでした（PDF不足 {len(result['missing'])} 件）")
+    return result
 
 
 def step3_collect_pdf(output_dir):
@@ -81,7 +99,7 @@ def step3_collect_pdf(output_dir):
         return False
 
 
-def step4_exchange_pdf(output_dir):
+def step4_exchange_pdf(output_dir, expected=None, progress_callback=None):
     """
     ステップ4 (PDFモード - 交換完了):
     - DocuWorks ウィンドウをアクティブにする
@@ -93,6 +111,8 @@ def step4_exchange_pdf(output_dir):
     - Alt+V, Alt+A, Alt+A: 貼り付け
     - Ctrl+A: 全てを選択
     - Ctrl+C: コピー
+    - 出力フォルダに貼り付け、PDFの到着を待つ（expected: 期待するPDF名、progress_callback: 到着状況の通知）
+    ※ PDFがそろわないまま待つのをやめた場合（タイムアウト・不足のまま停止）は False
     """
     try:
         print(f"🔍 DocuWorks ウィンドウをアクティブにしています...")
@@ -179,7 +199,11 @@ def step4_exchange_pdf(output_dir):
         
         # Ctrl+V を実行（貼り付け）
         pyautogui.hotkey("ctrl", "v")
-        time.sleep(1.5)
+        pasted = _wait_for_paste(output_dir, expected, progress_callback)
+        if not pasted["stable"]:
+            # そろっていないままクリーンアップ（ICDファイルの削除）に進まない
+            print("❌ PDFの貼り付けを確認できませんでした。")
+            return False
         
         print("✅ ファイルを出力フォルダに貼り付けました")
         return True
@@ -189,15 +213,17 @@ def step4_exchange_pdf(output_dir):
         return False
 
 
-def retry_exchange_pdf(output_dir):
+def retry_exchange_pdf(output_dir, expected=None, progress_callback=None):
     """
     再張り切り: DocuWorksから貼り付けの処理のみを実行
+    ※ DocuWorks は一部だけを貼り付けられないため、すべて貼り付けて expected（前回不足したPDF）の到着を待ちます
     - 検索・削除のステップはスキップ
     - Alt+V, Alt+A, Alt+A: 貼り付け
     - Ctrl+A: 全てを選択
     - Ctrl+C: コピー
     - 出力フォルダを開く
-    - Ctrl+V: 貼り付け
+    - Ctrl+V: 貼り付け、PDFの到着を待つ（progress_callback: 到着状況の通知）
+    ※ 前回不足したPDFがそろわないまま待つのをやめた場合は False
     """
     try:
         print(f"🔍 DocuWorks ウィンドウをアクティブにしています...")
@@ -239,7 +265,11 @@ def retry_exchange_pdf(output_dir):
         
         # Ctrl+V を実行（貼り付け）
         pyautogui.hotkey("ctrl", "v")
-        time.sleep(1.5)
+        pasted = _wait_for_paste(output_dir, expected, progress_callback)
+        if not pasted["stable"]:
+            # そろっていないままクリーンアップ（ICDファイルの削除）に進まない
+            print("❌ PDFの貼り付けを確認できませんでした。")
+            return False
         
         print("✅ ファイルを出力フォルダに貼り付けました")
         return True
@@ -0,0 +1,125 @@
+# process/plan.py
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.copy_history import estimate_copy_seconds
+from utils.part_resolver import clamp_workers, resolve_parts
+from .create import _clean_excel_name, _get_mirror, _load_bom
+
+_CANCELLED = {"error": "事前確認を中止しました。", "cancelled": True}
+
+
+def _cancelled(cancel_event):
+    return cancel_event is not None and cancel_event.is_set()
+
+
+def plan_step1(excel_path=None, icd_folder_path=None, resolve_workers=None, cancel_event=None, use_miss_cache=True):
+    """
+    ステップ1の事前確認（コピーはしない）:
+    - Excelモード: 部品表の品番を step1 と同じ方法で絞り込み、ICDファイルを検索（resolve_parts）
+    - フォルダモード: drawing フォルダの .icd ファイル一覧
+    - 見つかったICDのサイズ合計、ICDミラーのヒット数、最近のコピー速度からステップ1の所要時間を見積もり
+    検索結果（resolved / cached_misses）は step1_create_and_copy(plan=...) にそのまま渡せます。
+    cancel_event: threading.Event（任意）。セットされると途中で中止し {"error": ..., "cancelled": True} を返します
+    use_miss_cache: False の場合は未検出キャッシュを使わずに検索
+    戻り値:
+        成功時: {mode, source, name, part_numbers, resolved, cached_misses, found, missing, files,
+                 bytes_total, cache_hits, hit_bytes, share_bytes, resolve_seconds, estimated_seconds,
+                 mb_per_sec, measured, skipped_due_to_hold, added_due_to_addition}
+        エラー時: {"error": "エラーメッセージ"}
+    """
+    try:
+        started = time.perf_counter()
+        if excel_path and not icd_folder_path:
+            excel_name = os.path.splitext(os.path.basename(excel_path))[0]
+            if not excel_name.startswith("LS-"):
+                return {"error": "このファイルは製作部品表ではありません。ファイル名は 'LS-' で始まる必要があります。"}
+            part_numbers, skipped_due_to_hold, added_due_to_addition = _load_bom(excel_path)
+            if not part_numbers:
+                return {"error": "Excelファイルに有効な部品番号がありません。"}
+            if _cancelled(cancel_event):
+                return _CANCELLED.copy()
+            resolved, cached_misses = resolve_parts(part_numbers, workers=resolve_workers, cancel_event=cancel_event,
+                                                    use_miss_cache=use_miss_cache)
+            plan = {"mode": "excel", "source": excel_path, "name": _clean_excel_name(excel_name)}
+        elif icd_folder_path and not excel_path:
+            drawing_folder = os.path.join(icd_folder_path, "drawing")
+            if not os.path.isdir(drawing_folder):
+                return {"error": f"'drawing' フォルダが見つかりません: {drawing_folder}"}
+            with os.scandir(drawing_folder) as it:
+                sources = [e.path for e in it if e.is_file() and e.name.lower().endswith('.icd')]
+            part_numbers = [os.path.splitext(os.path.basename(src))[0] for src in sources]
+            resolved, cached_misses = list(zip(part_numbers, sources)), {}
+            skipped_due_to_hold, added_due_to_addition = [], []
+            plan = {"mode": "folder", "source": icd_folder_path,
+                    "name": os.path.basename(icd_folder_path.rstrip("\\").rstrip("/"))}
+        else:
+            return {"error": "ExcelファイルまたはICDフォルダのいずれかを選択してください。"}
+        resolve_seconds = time.perf_counter() - started
+        if _cancelled(cancel_event):
+            return _CANCELLED.copy()
+
+        # 見つかったICD（重複なし）のサイズとミラーの有無
+        sources = list(dict.fromkeys(path for _, path in resolved if path))
+        mirror = _get_mirror()
+
+        def _inspect(src):
+            try:
+                st = os.stat(src)
+            except OSError:
+                return 0, False
+            return st.st_size, bool(mirror) and mirror.contains(src, st)
+
+        with ThreadPoolExecutor(max_workers=clamp_workers(resolve_workers)) as pool:
+            inspected = list(pool.map(_inspect, sources))
+
+        bytes_total = sum(size for size, _ in inspected)
+        hit_bytes = sum(size for size, hit in inspected if hit)
+        cache_hits = sum(1 for _, hit in inspected if hit)
+        share_bytes = bytes_total - hit_bytes
+        estimated_seconds, mb_per_sec, measured = estimate_copy_seconds(share_bytes, len(sources) - cache_hits)
+
+        plan.update({
+            "part_numbers": part_numbers,
+            "resolved": resolved,
+            "cached_misses": cached_misses,
+            "found": [part for part, path in resolved if path],
+            "missing": [part for part, path in resolved if not path],
+            "files": len(sources),
+            "bytes_total": bytes_total,
+            "cache_hits": cache_hits,
+            "hit_bytes": hit_bytes,
+            "share_bytes": share_bytes,
+            "resolve_seconds": resolve_seconds,
+            "estimated_seconds": estimated_seconds,
+            "mb_per_sec": mb_per_sec,
+            "measured": measured,
+            "skipped_due_to_hold": skipped_due_to_hold,
+            "added_due_to_addition": added_due_to_addition,
+        })
+        return plan
+
+    except Exception as e:
+        return {"error": f"事前確認エラー: {str(e)}"}
+
+
+def format_plan(plan):
+    """事前確認の結果を表示用の文字列にします。"""
+    lines = [
+        f"事前確認: {plan['name']} — 品番 {len(plan['part_numbers'])} 件（見つかった {len(plan['found'])} / "
+        f"見つからない {len(plan['missing'])}）",
+        f"  コピー: {plan['files']} ファイル, {plan['bytes_total'] / (1024 * 1024):.1f} MB"
+        f"（ICDミラー ヒット {plan['cache_hits']} ファイル / {plan['hit_bytes'] / (1024 * 1024):.1f} MB）",
+        f"  見積もり: 約 {plan['estimated_seconds']:.0f} 秒（{plan['mb_per_sec']:.1f} MB/s, "
+        f"{'最近の実測値' if plan['measured'] else '既定値'}）, 検索 {plan['resolve_seconds']:.1f} 秒",
+    ]
+    if plan["missing"]:
+        shown = ", ".join(plan["missing"][:10])
+        more = f" 他 {len(plan['missing']) - 10} 件" if len(plan["missing"]) > 10 else ""
+        lines.append(f"  見つからない品番: {shown}{more}")
+    if plan["skipped_due_to_hold"]:
+        lines.append(f"  保留: {len(plan['skipped_due_to_hold'])} 件")
+    if plan["added_due_to_addition"]:
+        lines.append(f"  追加のみ: {len(plan['added_due_to_addition'])} 件")
+    return "\n".join(lines)
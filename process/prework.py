@@ -0,0 +1,105 @@
+# process/prework.py
+import os
+import threading
+import time
+
+from config.settings import STEP1_PREWORK_MAX_AGE
+from .create import _load_bom
+from .plan import plan_step1
+
+
+def _key(excel_path=None, icd_folder_path=None, batch_paths=None):
+    """入力のパス・サイズ・更新日時（ドロップ後に保存し直した部品表は別の入力とする）"""
+    paths = batch_paths or [excel_path or icd_folder_path]
+    return tuple((os.path.normcase(os.path.normpath(p)),) + _stamp(p) for p in paths if p)
+
+
+def _stamp(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return (None, None)
+    return (st.st_size, st.st_mtime)
+
+
+class _Job:
+    def __init__(self, key):
+        self.key = key
+        self.cancel = threading.Event()
+        self.done = threading.Event()
+        self.result = None
+        self.finished_at = None
+
+
+class Prework:
+    """
+    ファイル（部品表 / ICDフォルダ）をドロップした時点で、ステップ1の準備をバックグラウンドで始めます。
+    - 1件: plan_step1（部品表の読み込み・品番検索・ICDミラーの確認）
+    - 複数（一括処理）: 部品表の読み込みだけ（部品表キャッシュに保存）
+    別のファイルをドロップすると、実行中の準備は中止します。開始時は take() で結果を受け取ります。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._job = None
+
+    def start(self, excel_path=None, icd_folder_path=None, batch_paths=None):
+        key = _key(excel_path, icd_folder_path, batch_paths)
+        job = _Job(key)
+        with self._lock:
+            previous, self._job = self._job, job
+        if previous is not None:
+            previous.cancel.set()
+        threading.Thread(target=self._run, args=(job, excel_path, icd_folder_path, batch_paths), daemon=True).start()
+
+    def cancel(self):
+        """実行中の準備を中止し、結果を破棄します。"""
+        with self._lock:
+            job, self._job = self._job, None
+        if job is not None:
+            job.cancel.set()
+
+    def take(self, excel_path=None, icd_folder_path=None, batch_paths=None):
+        """
+        同じ入力の準備結果（plan_step1 の戻り値）を返します。実行中の場合は完了を待ちます。
+        入力が違う（ドロップ後にサイズ・更新日時が変わった場合を含む）・中止された・エラー・
+        古い（STEP1_PREWORK_MAX_AGE 秒以上前）場合は None。
+        一括処理（batch_paths）は部品表の読み込みの完了を待つだけで、常に None。
+        結果は1回だけ返します。
+        """
+        key = _key(excel_path, icd_folder_path, batch_paths)
+        with self._lock:
+            job = self._job
+            if job is None or job.key != key:
+                return None
+            self._job = None
+        job.done.wait()
+        plan = job.result
+        if job.cancel.is_set() or not plan or "error" in plan:
+            return None
+        if _key(excel_path, icd_folder_path, batch_paths) != job.key:
+            print("ℹ ドロップ後に入力が更新されたため、検索し直します。")
+            return None
+        if time.monotonic() - job.finished_at > STEP1_PREWORK_MAX_AGE:
+            print("ℹ ドロップ時の事前確認の結果が古いため、検索し直します。")
+            return None
+        return plan
+
+    def _run(self, job, excel_path, icd_folder_path, batch_paths):
+        try:
+            if batch_paths:
+                for path in batch_paths:
+                    if job.cancel.is_set():
+                        break
+                    if os.path.basename(path).startswith("LS-"):
+                        _load_bom(path)
+            else:
+                job.result = plan_step1(excel_path=excel_path, icd_folder_path=icd_folder_path,
+                                        cancel_event=job.cancel)
+                if "error" in job.result and not job.result.get("cancelled"):
+                    print(f"⚠ {job.result['error']}")
+        except Exception as e:
+            print(f"⚠ 事前確認エラー: {e}")
+        finally:
+            job.finished_at = time.monotonic()
+            job.done.set()
@@ -6,24 +6,21 @@ from tkinter import messagebox
 
 from utils.UI_helpers import (
     animate_loading, stop_loading, update_status,
-    log_error, clear_error_box,
-    update_file_comparison_message, add_delete_xdw_buttons, add_delete_pdf_buttons,
+    log_error, clear_error_box, update_error_box,
+    update_file_comparison_message, add_delete_pdf_buttons,
 )
-from config.settings import STATUS_ERROR_COLOR, STATUS_WARN_COLOR
+from config.settings import STATUS_ERROR_COLOR, STATUS_WARN_COLOR, STEP1_PLAN_PREVIEW
 
-from .create import step1_create_and_copy
-from .printing import step2_print_icd
-from .xdw_collection import step3_collect_xdw
-from .pdf_collection import step3_collect_pdf, step4_exchange_pdf, compare_icd_pdf, retry_exchange_pdf
+from .create import step1_create_and_copy, step1_batch_create_and_copy
+from .plan import plan_step1, format_plan
 from .rename_pdf import remove_suffix_3d_from_pdf
-from .clear import step4_cleanup
 from .clear_pdf import step4_cleanup_pdf
-from utils.cleanup_xdw import cleanup_xdw_on_user_request, show_no_delete_xdw_message
-from utils.cleanup_pdf import cleanup_pdf_on_user_request, show_no_delete_pdf_message
-from utils.excel_collect import add_ls_lk_excel_set_to_output
-from utils.excel_remove import excel_remove
+from utils.excel_collect import collect_ls_lk_excel_set
 from utils.emergency_stop import emergency_manager, cleanup_on_stop
-from utils.file_compare import compare_icd_xdw
+from utils.miss_cache import format_age
+from utils.folder_snapshot import FolderSnapshot
+from utils.run_manifest import RunManifest, mark_stage, STAGE_PRINT, STAGE_CONVERT, STAGE_EXCHANGE, STAGE_VALIDATE
+from utils.pdf_validator import validate_pdfs
 
 
 class ProcessManager:
@@ -33,13 +30,17 @@ class ProcessManager:
     # イベント: 非常に停止
     def emergency_stop(self):
         emergency_manager.trigger_stop()
+        self.app.prework.cancel()
         self.app.status_label.config(text="処理を強制停止しました。", fg=STATUS_ERROR_COLOR)
         self.app.progress["value"] = 0
         log_error(self.app, "ユーザーによって非常停止が実行されました。")
         self.app.print_done_btn.config(state="disabled")
         
-        # 作成されたフォルダをクリーンアップ
+        # 作成されたフォルダをクリーンアップ（一括処理の未処理分も含む）
         cleanup_on_stop(self.app, self.app.info)
+        for _, info in getattr(self.app, "pending_jobs", []):
+            cleanup_on_stop(self.app, info)
+        self.app.pending_jobs = []
         
         messagebox.showwarning("警告", "処理を強制停止しました。")
 
@@ -48,10 +49,25 @@ class ProcessManager:
         emergency_manager.reset()
         self.app.print_done_btn.config(state="disabled")
         clear_error_box(self.app)  # 古いエラーメッセージをすべて削除する
+        self.app.pending_jobs = []
 
         # モード判定（ExcelまたはFolder）
         input_mode = self.app.mode_var.get() if hasattr(self.app, "mode_var") else "excel"
         
+        batch_paths = getattr(self.app, "excel_batch_paths", []) if input_mode == "excel" else []
+        if len(batch_paths) > 1:
+            batch_paths = [os.path.normpath(p) for p in batch_paths]
+            missing = [p for p in batch_paths if not os.path.isfile(p)]
+            if missing:
+                messagebox.showerror("エラー", f"Excelファイルが見つかりません: {os.path.basename(missing[0])}")
+                return
+            self.app.start_btn.config(state="disabled")
+            self.app.is_running = True
+            animate_loading(self.app, "ステップ1: ファイルコピー中（一括）")
+            self.app.progress["value"] = 0
+            threading.Thread(target=self._run_batch_steps, args=(batch_paths,), daemon=True).start()
+            return
+
         if input_mode == "excel":
             excel_path = os.path.normpath(self.app.excel_full_path.strip()) if getattr(self.app, "excel_full_path", "") else ""
             if not excel_path or not os.path.isfile(excel_path):
@@ -90,9 +106,15 @@ class ProcessManager:
 
     def _run_steps(self, excel_path, folder_path=None):
         try:
+            # 事前確認（出力フォルダ選択の前に、検索結果・コピー量・所要時間の見積もりを表示）
+            plan = self._prepare_step1(excel_path, folder_path)
+
             # Step 1: Copy ICD files
             update_status(self.app, "ステップ1: ファイルコピー中...", 25)
-            self.app.info = step1_create_and_copy(excel_path=excel_path, icd_folder_path=folder_path)
+            self.app.info = step1_create_and_copy(
+                excel_path=excel_path, icd_folder_path=folder_path,
+                progress_callback=self._step1_progress, plan=plan, use_miss_cache=self._use_miss_cache(),
+            )
 
             # Kiểm tra lỗi ngay sau khi Step 1
             if not self.app.info or "error" in self.app.info:
@@ -102,18 +124,8 @@ class ProcessManager:
 
             # Dừng loading và hiển thị trạng thái hoàn tất Step 1
             stop_loading(self.app)
-            update_status(self.app, f"コピー完了: {self.app.info['copied_count']} ファイル", 50)
 
-            # Hiển thị thông báo ICD
-            if self.app.info.get("not_found"):
-                msg_icd = f"{len(self.app.info['not_found'])} 件のICDファイルが見つかりません:\n" + "\n".join(self.app.info['not_found'][:10])
-                status = "error"
-            else:
-                msg_icd = "すべてのICDファイルが見つかりました！"
-                status = "success"
-
-            # Delay 1.5 giây trước khi chuyển sang Step 2
-            self.app.after(1500, lambda: self._continue_steps(excel_path, msg_icd, status))
+            self._continue_job(excel_path)
 
         except Exception as e:
             log_error(self.app, str(e))
@@ -121,6 +133,146 @@ class ProcessManager:
             # Cho phép nhấn lại 開始 nếu cần
             self.app.start_btn.config(state="normal")
 
+    def _prepare_step1(self, excel_path, folder_path):
+        """
+        ステップ1の事前確認の結果を返します（ない・エラーの場合は None）。
+        ドロップ時に始めた準備（Prework）があればその結果を使い、なければ STEP1_PLAN_PREVIEW の場合だけ検索します。
+        STEP1_PLAN_PREVIEW の場合は結果を error_box に表示します。
+        """
+        update_status(self.app, "ステップ1: 事前確認中（検索のみ）...", 10)
+        use_miss_cache = self._use_miss_cache()
+        if use_miss_cache:
+            plan = self.app.prework.take(excel_path=excel_path, icd_folder_path=folder_path)
+        else:
+            self.app.prework.cancel()  # ドロップ時の準備は未検出キャッシュを使っているため破棄
+            plan = None
+        if plan is None:
+            if not STEP1_PLAN_PREVIEW:
+                return None
+            plan = plan_step1(excel_path=excel_path, icd_folder_path=folder_path, use_miss_cache=use_miss_cache)
+            if "error" in plan:
+                print(f"⚠ {plan['error']}")
+                return None
+        else:
+            print(f"ℹ ドロップ時の事前確認の結果を使用: {plan['name']}")
+        if not STEP1_PLAN_PREVIEW:
+            return plan
+        update_error_box(self.app, format_plan(plan), status="warning" if plan["missing"] else "info")
+        return plan
+
+    def _use_miss_cache(self):
+        """「未検出も再検索」がオフの場合は True（未検出キャッシュを使う）"""
+        recheck = getattr(self.app, "recheck_misses_var", None)
+        return not (recheck is not None and recheck.get())
+
+    def _after_step1(self, excel_path):
+        """ステップ1の結果（self.app.info）を表示し、ステップ2へ進みます。"""
+        copy_stats = self.app.info.get("copy_stats")
+        copy_msg = f"コピー完了: {self.app.info['copied_count']} ファイル"
+        if copy_stats:
+            copy_msg += f" ({copy_stats['bytes'] / (1024 * 1024):.1f} MB, {copy_stats['mb_per_sec']:.1f} MB/s"
+            if copy_stats.get("cache_hits"):
+                copy_msg += f", キャッシュ {copy_stats['hit_ratio']:.0%}"
+            copy_msg += ")"
+        update_status(self.app, copy_msg, 50)
+
+        # Hiển thị thông báo ICD
+        if self.app.info.get("not_found"):
+            cached_misses = self.app.info.get("cached_misses", {})
+            lines = []
+            for part in self.app.info['not_found'][:10]:
+                if part in cached_misses:
+                    lines.append(f"{part}（cached miss: {format_age(cached_misses[part])}に確認）")
+                else:
+                    lines.append(part)
+            msg_icd = f"{len(self.app.info['not_found'])} 件のICDファイルが見つかりません:\n" + "\n".join(lines)
+            if cached_misses:
+                msg_icd += "\n（cached miss は「未検出も再検索」をオンにして開始すると再検索します）"
+            status = "error"
+        else:
+            msg_icd = "すべてのICDファイルが見つかりました！"
+            status = "success"
+
+        # Delay 1.5 giây trước khi chuyển sang Step 2
+        self.app.after(1500, lambda: self._continue_steps(excel_path, msg_icd, status))
+
+    def _continue_job(self, excel_path):
+        """ステップ1の結果から続けます（前回の処理記録から再開する場合は、完了済みのステップを省略）。"""
+        resumed_stage = self.app.info.get("resumed_stage")
+        if resumed_stage in (STAGE_PRINT, STAGE_CONVERT, STAGE_EXCHANGE):
+            self._resume_from(resumed_stage)
+        else:
+            self._after_step1(excel_path)
+
+    def _resume_from(self, stage):
+        """処理記録で完了済みのステップの次から再開します。"""
+        output_folder = self.app.info["output_folder"]
+        update_error_box(self.app, f"前回の処理を再開します: {output_folder}", status="info")
+
+        if stage == STAGE_PRINT:
+            manifest = RunManifest.load(output_folder)
+            if manifest is not None:
+                self.app.info["docuworks_folder"] = manifest.stage_info(STAGE_PRINT).get("docuworks_folder")
+            self.app.after(0, lambda: self.app.print_done_btn.config(state="normal"))
+            update_status(self.app, "印刷済みです。印刷完了を確認してください。", 75, color=STATUS_WARN_COLOR)
+        elif stage == STAGE_CONVERT:
+            self.app.after(0, lambda: self.app.exchange_done_btn.config(state="normal"))
+            update_status(self.app, "PDFコンバージョン済みです。交換完了ボタンを押してください。", 90, color=STATUS_WARN_COLOR)
+        elif stage == STAGE_EXCHANGE:
+            # 確認は別スレッドで実行（一括処理の次の部品表はメインスレッドから再開するため）
+            threading.Thread(target=self._finish_exchange, daemon=True).start()
+
+    def _run_batch_steps(self, excel_paths):
+        """一括処理: ステップ1をまとめて実行し、部品表ごとに順番にステップ2以降へ進みます。"""
+        try:
+            update_status(self.app, "ステップ1: ファイルコピー中（一括）...", 25)
+            self.app.prework.take(batch_paths=excel_paths)  # ドロップ時の部品表の読み込みが終わるまで待つ
+            results = step1_batch_create_and_copy(excel_paths, progress_callback=self._step1_progress,
+                                                  use_miss_cache=self._use_miss_cache())
+            stop_loading(self.app)
+
+            if not results or isinstance(results, dict):
+                log_error(self.app, (results or {}).get("error", "不明なエラーが発生しました。"))
+                return
+
+            jobs = []
+            for excel_path, info in zip(excel_paths, results):
+                if not info:
+                    log_error(self.app, f"有効な部品番号がありません: {os.path.basename(excel_path)}")
+                elif "error" in info:
+                    log_error(self.app, info["error"])
+                else:
+                    jobs.append((excel_path, info))
+            if not jobs:
+                return
+
+            (excel_path, self.app.info), self.app.pending_jobs = jobs[0], jobs[1:]
+            print(f"📦 一括処理: {len(jobs)} 件の部品表を順番に処理します")
+            self._continue_job(excel_path)
+
+        except Exception as e:
+            log_error(self.app, str(e))
+        finally:
+            self.app.start_btn.config(state="normal")
+
+    def _start_next_job(self):
+        """一括処理: 次の部品表があれば、ステップ1の結果表示から続けます。"""
+        if not getattr(self.app, "pending_jobs", None):
+            return
+        (excel_path, self.app.info), self.app.pending_jobs = self.app.pending_jobs[0], self.app.pending_jobs[1:]
+        self.app.exchange_btn_mode = "first"
+        self.app.after(0, lambda: self.app.exchange_done_btn.config(text="交換完了", state="disabled"))
+        update_status(self.app, f"次の部品表: {self.app.info['excel_name_clean']}（残り {len(self.app.pending_jobs)} 件）", 50)
+        self._continue_job(excel_path)
+
+    def _step1_progress(self, text, progress):
+        """ステップ1の進捗表示（検索・コピースレッドから呼ばれる）"""
+        def _update():
+            if self.app.is_running:
+                stop_loading(self.app)
+            update_status(self.app, text, progress)
+        self.app.after(0, _update)
+
     def _continue_steps(self, excel_path, msg_icd, status):
         try:
             # Chỉ xử lý Excel khi là mode Excel
@@ -128,18 +280,15 @@ class ProcessManager:
             msg_hold_add = ""
             
             if excel_path:  # Excel mode
-                # Excel xử lý
-                related = add_ls_lk_excel_set_to_output(
+                # LS/LK の Excel を集める（ID が一致しない・(先行手配) はコピーしない）
+                kept, removed, skipped = collect_ls_lk_excel_set(
                     excel_path=excel_path,
                     output_dir=self.app.info["output_folder"],
+                    folder_id=self.app.info["excel_name_clean"],
                     include_selected=True,
                     recursive=False
                 )
 
-                folder_id = self.app.info["excel_name_clean"]
-                base_dir = self.app.info["output_folder"]
-                kept, removed, skipped = excel_remove(folder_id, base_dir)
-
                 # Hiển thị thông báo tổng hợp
                 msg_cleanup = f"Excel整理完了: 保持={kept}, 削除={removed}, スキップ={skipped}"
 
@@ -177,6 +326,8 @@ class ProcessManager:
             log_error(self.app, str(e))
 
     def _print_icd(self):
+        # 印刷・PDF変換・貼り付けのモジュール（pyautogui / cv2 など）は起動を速くするため使用時に読み込む
+        from .printing import step2_print_icd
         try:
             folder_name = step2_print_icd(self.app.info["output_folder"], self.app.info["excel_name_clean"])
 
@@ -188,6 +339,7 @@ class ProcessManager:
                 raise Exception("印刷に失敗しました。DocuWorksが開いていない可能性があります。")
 
             self.app.info["docuworks_folder"] = folder_name
+            mark_stage(self.app.info["output_folder"], STAGE_PRINT, docuworks_folder=folder_name)
             self.app.after(0, lambda: self.app.print_done_btn.config(state="normal"))
             self.app.after(0, lambda: update_status(self.app, "印刷完了を確認してください。", 75, color=STATUS_WARN_COLOR))
 
@@ -215,9 +367,11 @@ class ProcessManager:
         # Step 3: PDF変換（Ctrl+A, Alt+T, K, 0, 3を実行）
         update_status(self.app, "ステップ3: PDFコンバージョン中...", 85)
         
+        from .pdf_collection import step3_collect_pdf
         success = step3_collect_pdf(self.app.info["output_folder"])
         
         if success:
+            mark_stage(self.app.info["output_folder"], STAGE_CONVERT)
             update_status(self.app, "PDFコンバージョン完了。交換完了ボタンを押してください。", 90, color=STATUS_WARN_COLOR)
             self.app.exchange_done_btn.config(state="normal")
         else:
@@ -227,9 +381,11 @@ class ProcessManager:
         """PDFモード: Ctrl+A, Alt+T, K, 0, 3 を実行して PDF化"""
         update_status(self.app, "ステップ3: PDFコンバージョン中...", 85)
         
+        from .pdf_collection import step3_collect_pdf
         success = step3_collect_pdf(self.app.info["output_folder"])
         
         if success:
+            mark_stage(self.app.info["output_folder"], STAGE_CONVERT)
             update_status(self.app, "PDFコンバージョン完了。交換完了ボタンを押してください。", 90, color=STATUS_WARN_COLOR)
             self.app.exchange_done_btn.config(state="normal")
             # messagebox.showinfo("情報", "PDFコンバージョンコマンドを実行しました。\n交換完了ボタンを押してください。")
@@ -245,70 +401,171 @@ class ProcessManager:
             return
 
         update_status(self.app, "ステップ4: PDF検索・移動中...", 95)
-        
-        success = step4_exchange_pdf(self.app.info["output_folder"])
-        
-        if success:
-            # PDF ファイル以外を削除（クリーンアップ）- ICD ファイルを削除
-            update_status(self.app, "ステップ5: クリーンアップ中...", 98)
-            step4_cleanup_pdf(self.app.info["output_folder"])
-            
-            # ICD と PDF を比較（-3D削除前に比較する必要がある）
-            update_status(self.app, "ステップ6: ファイル比較中...", 99)
-            missing, extra = compare_icd_pdf(
-                self.app.info["output_folder"],
-                self.app.info.get("icd_list", [])
+        self.app.exchange_done_btn.config(state="disabled")  # 貼り付け中の二重クリックを防ぐ
+        expected = [os.path.splitext(os.path.basename(f))[0] for f in self.app.info.get("icd_list", [])]
+        # 貼り付けの完了待ちは長くかかるため、別スレッドで実行（メインスレッドは非常停止を受け付ける）
+        threading.Thread(target=self._exchange, args=(expected,), daemon=True).start()
+
+    def _exchange(self, expected):
+        """交換（別スレッド）: 貼り付け → 到着待ち → 確認"""
+        from .pdf_collection import step4_exchange_pdf
+        try:
+            success = step4_exchange_pdf(
+                self.app.info["output_folder"], expected=expected or None,
+                progress_callback=self._paste_progress("ステップ4: PDF貼り付け中"),
             )
-            
-            # PDFの名前から "-3D" を削除
-            update_status(self.app, "ステップ7: PDF名前変更中 (-3D を削除)...", 99)
-            rename_log = remove_suffix_3d_from_pdf(self.app.info["output_folder"])
-            if rename_log:
-                print(f"✅ {len(rename_log)} 個のPDFファイルを名前変更しました")
-            
-            # 結果を確認
-            if missing or extra:
-                warning_msg = (
-                    f"処理が完了しましたが、ファイル数が一致しません。\n"
-                    f"ICDファイル数: {len(self.app.info.get('icd_list', []))} 件\n"
-                    f"PDFファイル数: {len([f for f in os.listdir(self.app.info['output_folder']) if f.lower().endswith('.pdf')])} 件\n"
-                )
-                if missing:
-                    warning_msg += f"\n不足ファイル({len(missing)}):\n" + "\n".join(missing[:10])
-                    if len(missing) > 10:
-                        warning_msg += "\n... (残り省略)"
-                if extra:
-                    warning_msg += f"\n余分ファイル({len(extra)}):\n" + "\n".join(extra[:10])
-                    if len(extra) > 10:
-                        warning_msg += "\n... (残り省略)"
-
-                messagebox.showwarning("注意", warning_msg)
-                update_file_comparison_message(self.app, warning_msg, status="warning")
-                # ファイル数が一致しない場合、再張り切りボタンを表示（button text を変更）
-                self.app.exchange_btn_mode = "retry"
-                self.app.after(0, lambda: self.app.exchange_done_btn.config(text="再張り切り", state="normal"))
-                
-                # PDF削除ボタンをerror_boxに表示
-                add_delete_pdf_buttons(
-                    self.app,
-                    on_yes_callback=lambda: cleanup_pdf_on_user_request(self.app, self.app.info["output_folder"]),
-                    on_no_callback=lambda: show_no_delete_pdf_message(self.app)
-                )
+            if self._stopped("交換完了"):
+                return
+
+            if success:
+                mark_stage(self.app.info["output_folder"], STAGE_EXCHANGE)
+                self._finish_exchange()
             else:
-                success_msg = (
-                    f"処理が完了しました。\n"
-                    f"ICDファイル数: {len(self.app.info.get('icd_list', []))} 件\n"
-                    f"PDFファイル数: {len([f for f in os.listdir(self.app.info['output_folder']) if f.lower().endswith('.pdf')])} 件\n"
-                    f"ファイル数が一致しました！"
-                )
-                messagebox.showinfo("情報", success_msg)
-                update_file_comparison_message(self.app, success_msg, status="success")
-            
-            update_status(self.app, "完了！すべての処理が終了しました。", 100, color="green")
-            self.app.exchange_done_btn.config(state="disabled")
-            self._open_folder_safe(self.app.info["output_folder"])
+                log_error(self.app, "PDF検索・貼り付けに失敗しました（ICDファイルは削除していません）。もう一度お試しください。")
+                self.app.after(0, lambda: self.app.exchange_done_btn.config(state="normal"))
+        except Exception as e:
+            log_error(self.app, str(e))
+
+    def _stopped(self, label):
+        """非常停止が押されたかどうか（別スレッドから呼ばれる）"""
+        if not emergency_manager.is_stop_requested():
+            return False
+        print(f"⚠ 非常停止が押されたため、{label}処理を中断します。")
+        self.app.after(0, lambda: self.app.status_label.config(text="処理は非常停止で中断されました。",
+                                                               fg=STATUS_ERROR_COLOR))
+        return True
+
+    def _set_status(self, text, progress, color="blue"):
+        """別スレッドからのステータス表示（メインスレッドで更新）"""
+        self.app.after(0, lambda: update_status(self.app, text, progress, color=color))
+
+    def _validate_pdfs(self, snapshot):
+        """出力フォルダの PDF を検証し、問題のある PDF（validate_pdf の結果）の一覧を返します。"""
+        summary = validate_pdfs(snapshot.folder, snapshot.names(".pdf"))
+        mark_stage(snapshot.folder, STAGE_VALIDATE, checked=summary["checked"],
+                   invalid=[r["name"] for r in summary["invalid"]], pages=summary["pages"])
+        return summary["invalid"]
+
+    @staticmethod
+    def _format_invalid_pdfs(invalid):
+        """比較結果のメッセージに追加する、問題のある PDF の一覧"""
+        text = f"\n破損の可能性があるPDF({len(invalid)}):\n" + "\n".join(
+            f"{r['name']} ({r['error']})" for r in invalid[:10]
+        )
+        if len(invalid) > 10:
+            text += "\n... (残り省略)"
+        return text
+
+    def _paste_progress(self, label):
+        """貼り付け中の「N / M 件」表示（交換の別スレッドから呼ばれるため、メインスレッドで更新）"""
+        def _callback(arrived, total):
+            self._set_status(f"{label}... PDF {arrived} / {total} 件", 95)
+        return _callback
+
+    def _check_exchange(self, labels):
+        """
+        貼り付け後の確認（別スレッド）: クリーンアップ・ICD と PDF の比較・-3D の削除・PDF の検証。
+        labels: 各ステップのステータス表示（クリーンアップ, 比較, 名前変更, 検証）
+        戻り値: {"missing", "extra", "normalized", "invalid", "pdf_count"}
+        """
+        from .pdf_collection import compare_icd_pdf
+
+        cleanup_label, compare_label, rename_label, validate_label = labels
+        output_folder = self.app.info["output_folder"]
+
+        # 出力フォルダの一覧は1回だけ取得し、以降のステップで共有（削除・名前変更は一覧に反映）
+        snapshot = FolderSnapshot.scan(output_folder)
+
+        # PDF ファイル以外を削除（クリーンアップ）- ICD ファイルを削除
+        self._set_status(cleanup_label, 98)
+        step4_cleanup_pdf(output_folder, snapshot=snapshot)
+
+        # ICD と PDF を比較（-3D削除前に比較する必要がある）
+        self._set_status(compare_label, 99)
+        diff = compare_icd_pdf(output_folder, self.app.info.get("icd_list", []), snapshot=snapshot)
+        missing, extra = diff["missing"], diff["extra"]
+        self.app.info["missing_pdfs"] = missing  # 再張り切りで到着を待つPDF
+
+        # PDFの名前から "-3D" を削除
+        self._set_status(rename_label, 99)
+        rename_log = remove_suffix_3d_from_pdf(output_folder, snapshot=snapshot)
+        if rename_log:
+            print(f"✅ {len(rename_log)} 個のPDFファイルを名前変更しました")
+
+        # PDF の検証（途中で切れた・空のファイル）
+        self._set_status(validate_label, 99)
+        invalid = self._validate_pdfs(snapshot)
+        return {"missing": missing, "extra": extra, "normalized": diff["normalized"], "invalid": invalid,
+                "pdf_count": snapshot.count(".pdf")}
+
+    def _result_message(self, result):
+        """確認結果のメッセージ（問題がある場合は警告の内容）"""
+        missing, extra, invalid = result["missing"], result["extra"], result["invalid"]
+        counts = (
+            f"ICDファイル数: {len(self.app.info.get('icd_list', []))} 件\n"
+            f"PDFファイル数: {result['pdf_count']} 件\n"
+        )
+        if result["normalized"]:
+            counts += f"表記違いで一致（-3D・大文字小文字など）: {len(result['normalized'])} 件\n"
+        if not (missing or extra or invalid):
+            return "処理が完了しました。\n" + counts + "ファイル数が一致しました！"
+
+        warning_msg = (
+            "処理が完了しましたが、ファイル数が一致しません。\n" if missing or extra
+            else "処理が完了しましたが、問題のあるPDFがあります。\n"
+        ) + counts
+        if missing:
+            warning_msg += f"\n不足ファイル({len(missing)}):\n" + "\n".join(missing[:10])
+            if len(missing) > 10:
+                warning_msg += "\n... (残り省略)"
+        if extra:
+            warning_msg += f"\n余分ファイル({len(extra)}):\n" + "\n".join(extra[:10])
+            if len(extra) > 10:
+                warning_msg += "\n... (残り省略)"
+        if invalid:
+            warning_msg += self._format_invalid_pdfs(invalid)
+        return warning_msg
+
+    def _finish_exchange(self):
+        """交換完了後（別スレッド）: 確認を行い、結果はメインスレッドで表示します。"""
+        try:
+            result = self._check_exchange((
+                "ステップ5: クリーンアップ中...", "ステップ6: ファイル比較中...",
+                "ステップ7: PDF名前変更中 (-3D を削除)...", "ステップ8: PDF検証中...",
+            ))
+        except Exception as e:
+            log_error(self.app, str(e))
+            return
+        self.app.after(0, lambda: self._show_exchange_result(result))
+
+    def _show_exchange_result(self, result):
+        """交換完了の結果表示（メインスレッド）"""
+        from utils.cleanup_pdf import cleanup_pdf_on_user_request, show_no_delete_pdf_message
+
+        missing, extra, invalid = result["missing"], result["extra"], result["invalid"]
+        message = self._result_message(result)
+        if missing or extra or invalid:
+            messagebox.showwarning("注意", message)
+            update_file_comparison_message(self.app, message, status="warning")
+            # ファイル数が一致しない場合、再張り切りボタンを表示（button text を変更）
+            self.app.exchange_btn_mode = "retry"
+            self.app.exchange_done_btn.config(text="再張り切り", state="normal")
+
+            # PDF削除ボタンをerror_boxに表示
+            add_delete_pdf_buttons(
+                self.app,
+                on_yes_callback=lambda: cleanup_pdf_on_user_request(self.app, self.app.info["output_folder"]),
+                on_no_callback=lambda: show_no_delete_pdf_message(self.app)
+            )
         else:
-            log_error(self.app, "PDF検索に失敗しました。")
+            messagebox.showinfo("情報", message)
+            update_file_comparison_message(self.app, message, status="success")
+            self.app.exchange_done_btn.config(state="disabled")
+
+        update_status(self.app, "完了！すべての処理が終了しました。", 100, color="green")
+        self._open_folder_safe(self.app.info["output_folder"])
+        if not (missing or extra or invalid):
+            self._start_next_job()  # 問題がある場合は再張り切りで解決してから次の部品表へ
 
     # イベント: 再張り切り
     def retry_exchange(self):
@@ -323,63 +580,60 @@ class ProcessManager:
             return
 
         update_status(self.app, "再張り切り処理中...", 95)
-        
-        success = retry_exchange_pdf(self.app.info["output_folder"])
-        
-        if success:
-            # PDF ファイル以外を削除（クリーンアップ）- ICD ファイルを削除
-            update_status(self.app, "クリーンアップ中...", 98)
-            step4_cleanup_pdf(self.app.info["output_folder"])
-            
-            # ICD と PDF を比較
-            update_status(self.app, "ファイル比較中...", 99)
-            missing, extra = compare_icd_pdf(
-                self.app.info["output_folder"],
-                self.app.info.get("icd_list", [])
+        self.app.exchange_done_btn.config(state="disabled")  # 貼り付け中の二重クリックを防ぐ
+
+        # DocuWorks は一部だけを貼り付けられないため、すべて貼り付けて前回不足したPDFの到着を待つ
+        missing_before = self.app.info.get("missing_pdfs") or None
+        if missing_before:
+            update_error_box(
+                self.app,
+                f"再張り切り: 不足しているPDF {len(missing_before)} 件の到着を確認します: "
+                + ", ".join(missing_before[:10]) + (" ..." if len(missing_before) > 10 else ""),
+                status="info",
             )
-            
-            # PDFの名前から "-3D" を削除
-            update_status(self.app, "PDF名前変更中 (-3D を削除)...", 99)
-            rename_log = remove_suffix_3d_from_pdf(self.app.info["output_folder"])
-            if rename_log:
-                print(f"✅ {len(rename_log)} 個のPDFファイルを名前変更しました")
-            
-            # 結果を確認
-            if missing or extra:
-                warning_msg = (
-                    f"処理が完了しましたが、ファイル数が一致しません。\n"
-                    f"ICDファイル数: {len(self.app.info.get('icd_list', []))} 件\n"
-                    f"PDFファイル数: {len([f for f in os.listdir(self.app.info['output_folder']) if f.lower().endswith('.pdf')])} 件\n"
-                )
-                if missing:
-                    warning_msg += f"\n不足ファイル({len(missing)}):\n" + "\n".join(missing[:10])
-                    if len(missing) > 10:
-                        warning_msg += "\n... (残り省略)"
-                if extra:
-                    warning_msg += f"\n余分ファイル({len(extra)}):\n" + "\n".join(extra[:10])
-                    if len(extra) > 10:
-                        warning_msg += "\n... (残り省略)"
-
-                messagebox.showwarning("注意", warning_msg)
-                update_file_comparison_message(self.app, warning_msg, status="warning")
-                # 再度ファイル数が一致しない場合、ボタンは再張り切り状態のまま保つ（何度でも試せる）
-                self.app.exchange_btn_mode = "retry"
-                self.app.after(0, lambda: self.app.exchange_done_btn.config(text="再張り切り", state="normal"))
+        threading.Thread(target=self._retry_exchange, args=(missing_before,), daemon=True).start()
+
+    def _retry_exchange(self, missing_before):
+        """再張り切り（別スレッド）: 貼り付け → 到着待ち → 確認"""
+        from .pdf_collection import retry_exchange_pdf
+        try:
+            success = retry_exchange_pdf(
+                self.app.info["output_folder"], expected=missing_before,
+                progress_callback=self._paste_progress("再張り切り中（不足分）"),
+            )
+            if self._stopped("再張り切り"):
+                return
+
+            if success:
+                mark_stage(self.app.info["output_folder"], STAGE_EXCHANGE)
+                result = self._check_exchange((
+                    "クリーンアップ中...", "ファイル比較中...", "PDF名前変更中 (-3D を削除)...", "PDF検証中...",
+                ))
+                self.app.after(0, lambda: self._show_retry_result(result))
             else:
-                success_msg = (
-                    f"処理が完了しました。\n"
-                    f"ICDファイル数: {len(self.app.info.get('icd_list', []))} 件\n"
-                    f"PDFファイル数: {len([f for f in os.listdir(self.app.info['output_folder']) if f.lower().endswith('.pdf')])} 件\n"
-                    f"ファイル数が一致しました！"
-                )
-                messagebox.showinfo("情報", success_msg)
-                update_file_comparison_message(self.app, success_msg, status="success")
-            
-            update_status(self.app, "完了！再張り切り処理が終了しました。", 100, color="green")
-            # 成功した場合のみ、ボタンを交換完了に戻す
-            self.app.exchange_btn_mode = "first"
-            self.app.after(0, lambda: self.app.exchange_done_btn.config(text="交換完了", state="disabled"))
-            self._open_folder_safe(self.app.info["output_folder"])
+                log_error(self.app, "再張り切り処理に失敗しました（ICDファイルは削除していません）。もう一度お試しください。")
+                self.app.after(0, lambda: self.app.exchange_done_btn.config(state="normal"))
+        except Exception as e:
+            log_error(self.app, str(e))
+
+    def _show_retry_result(self, result):
+        """再張り切りの結果表示（メインスレッド）"""
+        missing, extra, invalid = result["missing"], result["extra"], result["invalid"]
+        message = self._result_message(result)
+        if missing or extra or invalid:
+            messagebox.showwarning("注意", message)
+            update_file_comparison_message(self.app, message, status="warning")
+            # 再度ファイル数が一致しない場合、ボタンは再張り切り状態のまま保つ（何度でも試せる）
+            self.app.exchange_btn_mode = "retry"
+            self.app.exchange_done_btn.config(text="再張り切り", state="normal")
         else:
-            log_error(self.app, "再張り切り処理に失敗しました。")
+            messagebox.showinfo("情報", message)
+            update_file_comparison_message(self.app, message, status="success")
+            # 一致した場合のみ、ボタンを交換完了に戻して次の部品表へ（一括処理）
+            self.app.exchange_btn_mode = "first"
+            self.app.exchange_done_btn.config(text="交換完了", state="disabled")
 
+        update_status(self.app, "完了！再張り切り処理が終了しました。", 100, color="green")
+        self._open_folder_safe(self.app.info["output_folder"])
+        if not (missing or extra or invalid):
+            self._start_next_job()
@@ -3,13 +3,14 @@ import re
 from pathlib import Path
 
 
-def remove_suffix_3d_from_pdf(output_folder):
+def remove_suffix_3d_from_pdf(output_folder, snapshot=None):
     """
     PDFファイル名から "-3D" というサフィックスを削除する
     例: "drawing-3D.pdf" → "drawing.pdf"
     
     Args:
         output_folder (str): 処理対象フォルダのパス
+        snapshot (FolderSnapshot): 処理対象フォルダの一覧（任意）。ある場合は一覧・重複チェックに使い、名前変更を反映
         
     Returns:
         dict: {old_filename: new_filename} の形式で名前変更ログを返す
@@ -18,7 +19,7 @@ def remove_suffix_3d_from_pdf(output_folder):
     rename_log = {}
     
     try:
-        for fname in os.listdir(output_folder):
+        for fname in (snapshot.names(".pdf") if snapshot else os.listdir(output_folder)):
             if fname.lower().endswith(".pdf"):
                 m = pattern.match(fname)
                 if m:
@@ -30,7 +31,8 @@ def remove_suffix_3d_from_pdf(output_folder):
                     dst_path = os.path.join(output_folder, candidate_name)
                     
                     # 重複チェック
-                    if os.path.exists(dst_path) and src_path != dst_path:
+                    exists = snapshot.exists(candidate_name) if snapshot else os.path.exists(dst_path)
+                    if exists and src_path != dst_path:
                         print(f"⚠ スキップ: '{candidate_name}' は既に存在します")
                         continue
                     
@@ -38,6 +40,8 @@ def remove_suffix_3d_from_pdf(output_folder):
                     try:
                         os.rename(src_path, dst_path)
                         rename_log[fname] = candidate_name
+                        if snapshot:
+                            snapshot.rename(fname, candidate_name)
                         print(f"✅ 名前変更: {fname} → {candidate_name}")
                     except Exception as e:
                         print(f"❌ 名前変更失敗: {fname} ({str(e)})")
@@ -8,6 +8,7 @@ from utils.check_ICAD_and_Docuworks import ensure_docuworks_running
 from utils.rename import remove_suffix_3d_in_names
 from utils.file_compare import compare_icd_xdw
 from utils.refresh_explore import refresh_explorer
+from utils.stable_files import wait_for_stable_files
 
 def delete_folder_in_docuworks(docuworks_folder):
     folder_name = os.path.basename(docuworks_folder)
@@ -104,7 +105,10 @@ def step3_collect_xdw(output_dir, docuworks_folder,icd_list):
 
         # Dán file vào thư mục đích
         pyautogui.hotkey("ctrl", "v")
-        time.sleep(2)
+        # 貼り付けた XDW がそろい、書き込みが終わるまで待つ
+        wait_for_stable_files(
+            output_dir, ".xdw", [os.path.splitext(os.path.basename(f))[0] for f in icd_list or []] or None
+        )
         print("✅ Đã dán tất cả file vào thư mục đích.")
 
         # Đếm số file .xdw trong output_dir
@@ -113,7 +117,8 @@ def step3_collect_xdw(output_dir, docuworks_folder,icd_list):
         print(f"✅ Tổng số file .xdw đã copy: {copied_count}")
         
         # ✅ So sánh trước khi rename
-        missing, extra = compare_icd_xdw(output_dir, icd_list)
+        diff = compare_icd_xdw(output_dir, icd_list)
+        missing, extra = diff["missing"], diff["extra"]
 
         try:
             rename_logs = remove_suffix_3d_in_names(
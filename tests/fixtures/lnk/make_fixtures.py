@@ -0,0 +1,121 @@
+# tests/fixtures/lnk/make_fixtures.py
+"""
+テスト用の .lnk（[MS-SHLLINK] のバイナリ）を作成します。
+Windows で作成したショートカットと同じ構造（ヘッダー → IDList → LinkInfo → StringData）で、
+リンク先だけを固定の値にしています。
+
+使い方（リポジトリのルートで実行）:
+    python tests/fixtures/lnk/make_fixtures.py
+"""
+import os
+import struct
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+_LINK_CLSID = bytes.fromhex("0114020000000000c000000000000046")
+_HAS_LINK_TARGET_ID_LIST = 0x01
+_HAS_LINK_INFO = 0x02
+_HAS_NAME = 0x04
+_HAS_RELATIVE_PATH = 0x08
+_IS_UNICODE = 0x80
+
+# 期待するリンク先（tests/test_shortcut.py と共通。relative.lnk は .lnk のフォルダ基準の相対パス）
+TARGETS = {
+    "local.lnk": "Y:\\専用機\\TSZ\\TSZ1234 搬送装置",
+    "unc.lnk": "\\\\fileserver\\図面\\専用機\\TSZ5678",
+    "unicode.lnk": "Y:\\専用機\\TSZ\\TSZ9012 ①ﾃｽﾄ装置",
+    "relative.lnk": "..\\TSZ3456",
+}
+
+
+def _header(flags):
+    header = struct.pack("<I", 0x4C) + _LINK_CLSID + struct.pack("<I", flags)
+    return header + b"\x00" * (0x4C - len(header))
+
+
+def _id_list():
+    # ルート（マイコンピューター）だけの IDList
+    item = struct.pack("<H", 0x14) + b"\x1f\x50" + bytes.fromhex("e04fd020ea3a6910a2d808002b30309d")
+    items = item + b"\x00\x00"
+    return struct.pack("<H", len(items)) + items
+
+
+def _volume_id():
+    label = b"DATA\x00"
+    return struct.pack("<4I", 0x10 + len(label), 3, 0x1234ABCD, 0x10) + label
+
+
+def _link_info_local(base, suffix):
+    """ANSI（cp932）のローカルパス"""
+    header_size = 0x1C
+    volume = _volume_id()
+    base_raw = base.encode("cp932") + b"\x00"
+    suffix_raw = suffix.encode("cp932") + b"\x00"
+    volume_offset = header_size
+    base_offset = volume_offset + len(volume)
+    suffix_offset = base_offset + len(base_raw)
+    body = volume + base_raw + suffix_raw
+    return struct.pack("<7I", header_size + len(body), header_size, 0x01,
+                       volume_offset, base_offset, 0, suffix_offset) + body
+
+
+def _link_info_unicode(base, suffix):
+    """Unicode のローカルパス（LinkInfoHeaderSize 0x24、cp932 にない文字を含む）"""
+    header_size = 0x24
+    volume = _volume_id()
+    base_ansi = b"?\x00"
+    suffix_ansi = b"\x00"
+    base_u = (base + "\x00").encode("utf-16-le")
+    suffix_u = (suffix + "\x00").encode("utf-16-le")
+    volume_offset = header_size
+    base_offset = volume_offset + len(volume)
+    suffix_offset = base_offset + len(base_ansi)
+    base_u_offset = suffix_offset + len(suffix_ansi)
+    suffix_u_offset = base_u_offset + len(base_u)
+    body = volume + base_ansi + suffix_ansi + base_u + suffix_u
+    return struct.pack("<9I", header_size + len(body), header_size, 0x01, volume_offset, base_offset, 0,
+                       suffix_offset, base_u_offset, suffix_u_offset) + body
+
+
+def _link_info_network(net_name, suffix):
+    """UNC パス（CommonNetworkRelativeLink）"""
+    header_size = 0x1C
+    net_raw = net_name.encode("cp932") + b"\x00"
+    network = struct.pack("<5I", 0x14 + len(net_raw), 0x02, 0x14, 0, 0x00020000) + net_raw
+    suffix_raw = suffix.encode("cp932") + b"\x00"
+    network_offset = header_size
+    suffix_offset = network_offset + len(network)
+    body = network + suffix_raw
+    return struct.pack("<7I", header_size + len(body), header_size, 0x02,
+                       0, 0, network_offset, suffix_offset) + body
+
+
+def _string_data(text):
+    return struct.pack("<H", len(text)) + text.encode("utf-16-le")
+
+
+def build():
+    """{ファイル名: .lnk の内容}"""
+    return {
+        "local.lnk": (_header(_HAS_LINK_TARGET_ID_LIST | _HAS_LINK_INFO | _HAS_NAME | _IS_UNICODE)
+                      + _id_list() + _link_info_local("Y:\\専用機\\TSZ\\", "TSZ1234 搬送装置")
+                      + _string_data("搬送装置")),
+        "unc.lnk": (_header(_HAS_LINK_INFO | _HAS_RELATIVE_PATH | _IS_UNICODE)
+                    + _link_info_network("\\\\fileserver\\図面", "専用機\\TSZ5678")
+                    + _string_data("..\\..\\fileserver\\TSZ5678")),
+        "unicode.lnk": (_header(_HAS_LINK_TARGET_ID_LIST | _HAS_LINK_INFO | _IS_UNICODE)
+                        + _id_list() + _link_info_unicode("Y:\\専用機\\TSZ", "TSZ9012 ①ﾃｽﾄ装置")),
+        "relative.lnk": (_header(_HAS_RELATIVE_PATH | _IS_UNICODE)
+                         + _string_data(TARGETS["relative.lnk"])),
+    }
+
+
+def main():
+    for name, data in build().items():
+        with open(os.path.join(HERE, name), "wb") as f:
+            f.write(data)
+        print(f"✅ {name}: {len(data)} バイト")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+# tests/test_bom_reader.py
+"""
+utils.bom_reader（部品表の読み込み・振り分け）のテスト。
+テスト用の .xlsx は zipfile で最小構成のものを作成します（Excel 不要）。
+
+使い方（リポジトリのルートで実行）:
+    python -m pytest tests
+"""
+import os
+import shutil
+import tempfile
+import unittest
+import zipfile
+from xml.sax.saxutils import escape
+
+from utils.bom_reader import filter_bom, iter_bom_rows
+
+_MAIN_NS = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+_REL_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+_PKG_REL_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+_REL_TYPE = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/"
+
+
+def _cell(ref, value, strings):
+    """値の型に合わせた <c> 要素（文字列は sharedStrings、数値は <v> のまま）"""
+    if value is None:
+        return ""
+    if isinstance(value, str):
+        if value not in strings:
+            strings.append(value)
+        return f'<c r="{ref}" t="s"><v>{strings.index(value)}</v></c>'
+    return f'<c r="{ref}"><v>{value}</v></c>'
+
+
+def write_xlsx(path, rows, first_row=8):
+    """rows: (K, AB, AD) の値のリスト。first_row 行目から書き込みます。"""
+    strings = []
+    sheet_rows = ['<row r="1">' + _cell("A1", "部品表", strings) + "</row>"]
+    for number, (k, ab, ad) in enumerate(rows, first_row):
+        cells = _cell(f"K{number}", k, strings) + _cell(f"AB{number}", ab, strings) + _cell(f"AD{number}", ad, strings)
+        sheet_rows.append(f'<row r="{number}">{cells}</row>')
+
+    workbook = (f'<workbook xmlns="{_MAIN_NS}" xmlns:r="{_REL_NS}"><sheets>'
+                '<sheet name="Sheet1" sheetId="1" r:id="rId1"/></sheets></workbook>')
+    rels = (f'<Relationships xmlns="{_PKG_REL_NS}">'
+            f'<Relationship Id="rId1" Type="{_REL_TYPE}worksheet" Target="worksheets/sheet1.xml"/>'
+            f'<Relationship Id="rId2" Type="{_REL_TYPE}sharedStrings" Target="sharedStrings.xml"/>'
+            '</Relationships>')
+    sheet = f'<worksheet xmlns="{_MAIN_NS}"><sheetData>{"".join(sheet_rows)}</sheetData></worksheet>'
+    shared = (f'<sst xmlns="{_MAIN_NS}" count="{len(strings)}" uniqueCount="{len(strings)}">'
+              + "".join(f"<si><t>{escape(s)}</t></si>" for s in strings) + "</sst>")
+
+    with zipfile.ZipFile(path, "w") as zf:
+        zf.writestr("xl/workbook.xml", workbook)
+        zf.writestr("xl/_rels/workbook.xml.rels", rels)
+        zf.writestr("xl/worksheets/sheet1.xml", sheet)
+        zf.writestr("xl/sharedStrings.xml", shared)
+
+
+class IterBomRowsTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp, "部品表.xlsx")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def test_reads_typed_values_from_first_row(self):
+        write_xlsx(self.path, [("TSZ-001", 1, None), (12345, 2.5, "保留"), (None, None, None), ("TSZ-002", "", "追加")])
+        self.assertEqual(list(iter_bom_rows(self.path)), [
+            ("TSZ-001", 1, None),
+            (12345, 2.5, "保留"),
+            ("TSZ-002", None, "追加"),  # 空文字は None、空の行は返さない
+        ])
+
+    def test_zero_cell_is_int(self):
+        # 計算結果などで "0.0" と保存されたセルも、"0" と同じ整数の 0 として読む
+        write_xlsx(self.path, [("A", 0, None), ("B", 0.0, None), ("C", 1.5, None)])
+        rows = list(iter_bom_rows(self.path))
+        self.assertEqual(rows, [("A", 0, None), ("B", 0, None), ("C", 1.5, None)])
+        self.assertIs(type(rows[1][1]), int)
+
+
+class FilterBomTest(unittest.TestCase):
+    def test_normal_rows(self):
+        parts, hold, addition = filter_bom([
+            ("TSZ-001", 1, None),
+            ("TSZ-002", None, None),      # AB 列なし
+            ("TSZ-003", 2, "保留"),
+            (0, 1, None),                 # 品番 0
+            ("TSZ-004", "A", " "),
+        ])
+        self.assertEqual(parts, ["TSZ-001", "TSZ-004"])
+        self.assertEqual(hold, ["TSZ-003"])
+        self.assertEqual(addition, [])
+
+    def test_ab_zero_is_excluded(self):
+        # 以前は AB 列が小数の列として読まれ "0.0" になり、除外されないことがあった
+        parts, _, _ = filter_bom([("TSZ-001", 0, None), ("TSZ-002", 0.5, None), ("TSZ-003", "0", None)])
+        self.assertEqual(parts, ["TSZ-002"])
+
+    def test_addition_rows_take_precedence(self):
+        parts, hold, addition = filter_bom([
+            ("TSZ-001", 1, None),
+            ("TSZ-002", None, "追加"),
+            ("TSZ-003", 1, "保留"),
+            (0, None, "追加"),
+        ])
+        self.assertEqual(parts, ["TSZ-002"])
+        self.assertEqual(hold, ["TSZ-003"])
+        self.assertEqual(addition, ["TSZ-002", "0"])
+
+    def test_from_xlsx(self):
+        tmp = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tmp, "部品表.xlsx")
+            write_xlsx(path, [("TSZ-001", 1, None), ("TSZ-002", 0, None), ("TSZ-003", 1, "保留")])
+            parts, hold, _ = filter_bom(iter_bom_rows(path))
+            self.assertEqual(parts, ["TSZ-001"])
+            self.assertEqual(hold, ["TSZ-003"])
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    unittest.main()
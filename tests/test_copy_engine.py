@@ -0,0 +1,87 @@
+# tests/test_copy_engine.py
+"""
+utils.copy_engine の並列コピーのテスト（Windows 以外でも実行可）。
+
+使い方（リポジトリのルートで実行）:
+    python -m pytest tests
+"""
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+from utils.copy_engine import CopyEngine
+
+
+class CopyEngineTest(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.src_dir = os.path.join(self.root, "src")
+        self.dst_dir = os.path.join(self.root, "dst")
+        os.makedirs(self.src_dir)
+        os.makedirs(self.dst_dir)
+        self.sources = []
+        for i in range(8):
+            path = os.path.join(self.src_dir, f"P{i}.icd")
+            with open(path, "wb") as f:
+                f.write(os.urandom(1000 + i))
+            self.sources.append(path)
+
+    def tearDown(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def _run(self, **kwargs):
+        result = {}
+
+        def _copy():
+            engine = CopyEngine(self.dst_dir, workers=2, queue_size=1, report_interval=0, **kwargs)
+            with engine:
+                for src in self.sources:
+                    engine.submit(src)
+            result["timings"] = engine.timings
+
+        thread = threading.Thread(target=_copy, daemon=True)
+        thread.start()
+        thread.join(10)
+        self.assertFalse(thread.is_alive(), "コピーが終わりません（コピースレッドが停止）")
+        return result["timings"]
+
+    def test_copies_all_files(self):
+        timings = self._run(checksum=True)
+        self.assertEqual(len(timings), len(self.sources))
+        self.assertTrue(all(t["error"] is None and t["checksum"] for t in timings))
+        self.assertEqual(sorted(os.listdir(self.dst_dir)), sorted(os.path.basename(s) for s in self.sources))
+
+    def test_failing_on_file_done_does_not_stop_workers(self):
+        def _on_file_done(record):
+            raise OSError("disk full")
+
+        timings = self._run(on_file_done=_on_file_done)
+        self.assertEqual(len(timings), len(self.sources))
+        self.assertTrue(all(t["error"] is None for t in timings))
+
+    def test_failing_progress_callback_is_not_a_copy_error(self):
+        def _progress(snapshot):
+            raise RuntimeError("main thread is not in main loop")
+
+        timings = self._run(progress_callback=_progress)
+        self.assertEqual(len(timings), len(self.sources))
+        self.assertTrue(all(t["error"] is None for t in timings))
+
+    def test_failed_mirror_bytes_are_not_counted_twice(self):
+        class _BrokenMirror:
+            def fetch(self, src, dst, on_bytes=None):
+                on_bytes(500)
+                raise OSError("ミラーの容量が不足しています")
+
+        engine = CopyEngine(self.dst_dir, workers=2, queue_size=1, report_interval=0, mirror=_BrokenMirror())
+        with engine:
+            for src in self.sources:
+                engine.submit(src)
+        self.assertTrue(all(t["error"] is None for t in engine.timings))
+        self.assertEqual(engine.bytes_done, sum(os.path.getsize(s) for s in self.sources))
+
+
+if __name__ == "__main__":
+    unittest.main()
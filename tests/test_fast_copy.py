@@ -0,0 +1,66 @@
+# tests/test_fast_copy.py
+"""
+utils.fast_copy のテスト（Windows 以外でも実行可、CopyFileExW はモックに置き換え）。
+
+使い方（リポジトリのルートで実行）:
+    python -m pytest tests
+"""
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from utils import fast_copy as fast_copy_module
+from utils.fast_copy import fast_copy
+
+
+class FastCopyTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.src = os.path.join(self.tmp, "src.icd")
+        self.dst = os.path.join(self.tmp, "dst.icd")
+        self.data = os.urandom(300 * 1024)
+        with open(self.src, "wb") as f:
+            f.write(self.data)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def _read_dst(self):
+        with open(self.dst, "rb") as f:
+            return f.read()
+
+    def test_reports_all_bytes_once(self):
+        reported = []
+        result = fast_copy(self.src, self.dst, buffer_size=64 * 1024, on_bytes=reported.append)
+        self.assertEqual(self._read_dst(), self.data)
+        self.assertEqual(result["bytes"], len(self.data))
+        self.assertEqual(sum(reported), len(self.data))
+
+    def test_failed_copyfileex_bytes_are_rolled_back(self):
+        def _fail_midway(src, dst, on_bytes):
+            on_bytes(100 * 1024)
+            on_bytes(50 * 1024)
+            raise OSError("ネットワークが切断されました")
+
+        reported = []
+        with mock.patch.object(fast_copy_module.sys, "platform", "win32"), \
+                mock.patch.object(fast_copy_module, "_copy_windows", side_effect=_fail_midway):
+            result = fast_copy(self.src, self.dst, buffer_size=64 * 1024, on_bytes=reported.append)
+
+        self.assertEqual(result["method"], "buffered")
+        self.assertEqual(self._read_dst(), self.data)
+        self.assertIn(-150 * 1024, reported)
+        self.assertEqual(sum(reported), len(self.data))
+
+    def test_failed_copyfileex_without_callback(self):
+        with mock.patch.object(fast_copy_module.sys, "platform", "win32"), \
+                mock.patch.object(fast_copy_module, "_copy_windows", side_effect=OSError("失敗")):
+            result = fast_copy(self.src, self.dst)
+        self.assertEqual(result["bytes"], len(self.data))
+        self.assertEqual(self._read_dst(), self.data)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+# tests/test_file_compare.py
+"""
+utils.file_compare の ICD と出力ファイル名の比較のテスト（Windows 以外でも実行可）。
+
+使い方（リポジトリのルートで実行）:
+    python -m pytest tests
+"""
+import unittest
+
+from utils.file_compare import compare_names, expected_keys, normalize_name
+
+
+class NormalizeNameTest(unittest.TestCase):
+    def test_width_case_and_3d(self):
+        self.assertEqual(normalize_name(" ＡＢＣ-１２３-3d "), "abc-123")
+        self.assertEqual(normalize_name("ABC-123-3D"), normalize_name("abc-123"))
+
+    def test_plain_twin_keeps_3d(self):
+        keys = expected_keys(["A-B", "A-B-3D", "C-3D"])
+        self.assertEqual(keys, {"A-B": "a-b", "A-B-3D": "a-b-3d", "C-3D": "c"})
+
+
+class CompareNamesTest(unittest.TestCase):
+    def test_exact_match(self):
+        diff = compare_names(["P1", "P2"], ["P2", "P1"])
+        self.assertEqual(diff, {"missing": [], "extra": [], "matched": ["P1", "P2"], "normalized": []})
+
+    def test_normalized_match(self):
+        diff = compare_names(["ab-1-3D", "ＣＤ-2"], ["AB-1", "cd-2"])
+        self.assertEqual(diff["missing"], [])
+        self.assertEqual(diff["extra"], [])
+        self.assertEqual(diff["normalized"], [("ab-1-3D", "AB-1"), ("ＣＤ-2", "cd-2")])
+
+    def test_missing_and_extra_in_order(self):
+        diff = compare_names(["P3", "P1", "P2"], ["X2", "P1", "X1"])
+        self.assertEqual(diff["missing"], ["P3", "P2"])
+        self.assertEqual(diff["extra"], ["X2", "X1"])
+        self.assertEqual(diff["matched"], ["P1"])
+
+    def test_duplicate_output_is_extra(self):
+        diff = compare_names(["P1"], ["P1", "p1-3D"])
+        self.assertEqual(diff["matched"], ["P1"])
+        self.assertEqual(diff["extra"], ["p1-3D"])
+
+    def test_duplicate_icd_is_counted_once(self):
+        diff = compare_names(["P1", "P1"], ["P1"])
+        self.assertEqual((diff["matched"], diff["missing"]), (["P1"], []))
+
+    def test_3d_twin_is_a_different_drawing(self):
+        # A-B と A-B-3D は別の図面: 片方しか出力がない場合は不足（余分ではない）
+        diff = compare_names(["A-B", "A-B-3D"], ["A-B"])
+        self.assertEqual(diff["missing"], ["A-B-3D"])
+        self.assertEqual(diff["extra"], [])
+
+        diff = compare_names(["A-B", "A-B-3D"], ["A-B-3D"])
+        self.assertEqual(diff["missing"], ["A-B"])
+        self.assertEqual(diff["extra"], [])
+
+        diff = compare_names(["A-B", "A-B-3D"], ["a-b", "A-B-3d"])
+        self.assertEqual((diff["missing"], diff["extra"]), ([], []))
+        self.assertEqual(diff["normalized"], [("A-B", "a-b"), ("A-B-3D", "A-B-3d")])
+
+    def test_3d_without_twin_still_folds(self):
+        diff = compare_names(["A-B-3D", "C"], ["A-B", "C-3D"])
+        self.assertEqual((diff["missing"], diff["extra"]), ([], []))
+
+
+if __name__ == "__main__":
+    unittest.main()
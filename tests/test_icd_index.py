@@ -0,0 +1,83 @@
+# tests/test_icd_index.py
+"""
+utils.icd_index のインデックス検索と、従来の検索（glob / os.walk）が同じ結果になることのテスト（Windows 以外でも実行可）。
+複数のファイルが一致する場合も、従来と同じファイル（深さ優先・フォルダの一覧順で最初のもの）を選ぶことを確認します。
+
+使い方（リポジトリのルートで実行）:
+    python -m pytest tests
+"""
+import os
+import shutil
+import tempfile
+import unittest
+
+from utils.icd_index import IcdIndex
+from utils.searchTools import search_in_project, list_project_icd, match_parts_in_listing
+
+WORKPIECES = ["A100-TSZ1", "A100-TSZ1-01", "B200-TSZ1", "B200-TSZ1-02", "C300-TSZ1", "Z999-TSZ1"]
+
+
+class IcdIndexEquivalenceTest(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.project = os.path.join(self.root, "TSZ1 搬送装置")
+        self.index = IcdIndex(db_path=os.path.join(self.root, "cache", "icd_index.sqlite3"))
+        # 同じ品番のファイルを複数のフォルダ・階層に置く（どれを選ぶかは走査の順番で決まる）
+        for i, sub in enumerate(["zz", "a", "m/deep", "b/x/y", "kk", "c", "m", ".hidden", "q/r"]):
+            folder = os.path.join(self.project, sub)
+            os.makedirs(folder, exist_ok=True)
+            self._touch(folder, "A100-TSZ1.icd")
+            self._touch(folder, "A100-TSZ1-3D.icd")
+            self._touch(folder, f"A100-TSZ1-01-{i}.icd")
+            if i % 2:
+                self._touch(folder, "B200-TSZ1-02.icd")
+                self._touch(folder, "B200-TSZ1.icd")
+        self._touch(os.path.join(self.project, "m"), "C300-TSZ1-OLD.icd")
+        self._touch(os.path.join(self.project, "kk"), "C300-TSZ1-3D.icd")
+
+    def tearDown(self):
+        self.index.close()
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    @staticmethod
+    def _touch(folder, name):
+        with open(os.path.join(folder, name), "wb") as f:
+            f.write(b"icd")
+
+    def _assert_same_as_legacy(self):
+        self.assertTrue(self.index.refresh(self.project, force=True))
+        self.assertEqual(self.index.list_icd(self.project), list_project_icd(self.project))
+        indexed = match_parts_in_listing(WORKPIECES, self.index.list_icd(self.project))
+        for wp in WORKPIECES:
+            legacy = search_in_project(self.project, wp)
+            self.assertEqual(self.index.lookup(wp, self.project), legacy, wp)
+            self.assertEqual(indexed[wp], legacy, wp)
+
+    def test_same_as_legacy(self):
+        self._assert_same_as_legacy()
+        self.assertIsNone(self.index.lookup("Z999-TSZ1", self.project))
+
+    def test_same_as_legacy_after_changes(self):
+        self._assert_same_as_legacy()
+        # フォルダの追加・削除で一覧の順番が変わっても、変わっていないフォルダの順番を更新する
+        for sub in ["0", "n/new", "b/aa"]:
+            folder = os.path.join(self.project, sub)
+            os.makedirs(folder, exist_ok=True)
+            self._touch(folder, "A100-TSZ1.icd")
+            self._touch(folder, "C300-TSZ1.icd")
+        shutil.rmtree(os.path.join(self.project, "a"))
+        self._assert_same_as_legacy()
+
+    def test_old_schema_is_rebuilt(self):
+        self.index.refresh(self.project)
+        self.index.close()
+        conn = self.index._connect()
+        conn.execute("PRAGMA user_version = 1")
+        conn.commit()
+        self.index.close()
+        self.assertEqual(self.index.list_icd(self.project), [])  # 古いインデックスは削除
+        self._assert_same_as_legacy()
+
+
+if __name__ == "__main__":
+    unittest.main()
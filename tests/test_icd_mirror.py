@@ -0,0 +1,162 @@
+# tests/test_icd_mirror.py
+"""
+utils.icd_mirror（ICD ファイルのローカルミラー）のテスト。
+共有フォルダ・ミラーとも一時フォルダを使います。
+
+使い方（リポジトリのルートで実行）:
+    python -m pytest tests
+"""
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from utils import icd_mirror as icd_mirror_module
+from utils.fast_copy import fast_copy
+from utils.icd_mirror import IcdMirror
+
+
+class IcdMirrorTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.share = os.path.join(self.tmp, "share")
+        self.out = os.path.join(self.tmp, "out")
+        os.makedirs(self.share)
+        os.makedirs(self.out)
+        self.mirror = IcdMirror(root=os.path.join(self.tmp, "mirror"), max_bytes=10_000)
+
+    def tearDown(self):
+        if self.mirror._conn is not None:
+            self.mirror._conn.close()
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def _source(self, name, size):
+        path = os.path.join(self.share, name)
+        with open(path, "wb") as f:
+            f.write(os.urandom(size))
+        return path
+
+    def _read(self, path):
+        with open(path, "rb") as f:
+            return f.read()
+
+    def _keys(self):
+        return {row[0] for row in self.mirror._connect().execute("SELECT key FROM entries")}
+
+    def test_miss_then_hit(self):
+        src = self._source("P100.icd", 3000)
+        reported = []
+        first = self.mirror.fetch(src, os.path.join(self.out, "a.icd"), on_bytes=reported.append)
+        second = self.mirror.fetch(src, os.path.join(self.out, "b.icd"), on_bytes=reported.append)
+        self.assertEqual(first["cache"], "miss")
+        self.assertEqual(second["cache"], "hit")
+        self.assertEqual(self._read(os.path.join(self.out, "a.icd")), self._read(src))
+        self.assertEqual(self._read(os.path.join(self.out, "b.icd")), self._read(src))
+        self.assertEqual(sum(reported), 6000)
+        self.assertTrue(self.mirror.contains(src))
+
+    def _fetch_counting_copies(self, src, dst, cloned):
+        """fetch を実行し、fast_copy のコピー元の一覧を返します（cloned: リフリンクが使えるかどうか）"""
+        calls = []
+
+        def _fast_copy(copy_src, copy_dst, *args, **kwargs):
+            calls.append(copy_src)
+            return fast_copy(copy_src, copy_dst, *args, **kwargs)
+
+        def _clone_file(copy_src, copy_dst):
+            if cloned:
+                shutil.copyfile(copy_src, copy_dst)
+            return cloned
+
+        with mock.patch.object(icd_mirror_module, "fast_copy", side_effect=_fast_copy), \
+                mock.patch.object(icd_mirror_module, "clone_file", side_effect=_clone_file):
+            self.mirror.fetch(src, dst)
+        self.assertEqual(self._read(dst), self._read(src))
+        return calls
+
+    def test_miss_reads_share_once_and_clones(self):
+        src = self._source("P100.icd", 3000)
+        self.assertEqual(self._fetch_counting_copies(src, os.path.join(self.out, "a.icd"), cloned=True), [src])
+
+    def test_miss_copies_from_mirror_without_reflink(self):
+        src = self._source("P100.icd", 3000)
+        calls = self._fetch_counting_copies(src, os.path.join(self.out, "a.icd"), cloned=False)
+        self.assertEqual(calls[0], src)
+        self.assertEqual(len(calls), 2)
+        self.assertTrue(calls[1].startswith(self.mirror.root))  # 2回目はミラーから
+
+    def test_failed_dest_copy_keeps_blob_counted(self):
+        src = self._source("P100.icd", 3000)
+        real_fast_copy = fast_copy
+
+        def _fail_on_dest(copy_src, copy_dst, *args, **kwargs):
+            if copy_dst.startswith(self.out):
+                raise OSError("出力先に書き込めません")
+            return real_fast_copy(copy_src, copy_dst, *args, **kwargs)
+
+        with mock.patch.object(icd_mirror_module, "clone_file", return_value=False), \
+                mock.patch.object(icd_mirror_module, "fast_copy", side_effect=_fail_on_dest):
+            with self.assertRaises(OSError):
+                self.mirror.fetch(src, os.path.join(self.out, "a.icd"))
+        self.assertTrue(self.mirror.contains(src))
+        self.assertEqual(len(self._keys()), 1)
+
+    def test_failed_share_copy_leaves_no_temp_file(self):
+        src = self._source("P100.icd", 3000)
+
+        def _cut_off(copy_src, copy_dst, *args, **kwargs):
+            with open(copy_dst, "wb") as f:
+                f.write(b"partial")
+            raise OSError("ネットワークが切断されました")
+
+        with mock.patch.object(icd_mirror_module, "fast_copy", side_effect=_cut_off):
+            with self.assertRaises(OSError):
+                self.mirror.fetch(src, os.path.join(self.out, "a.icd"))
+        leftovers = [name for _, _, names in os.walk(self.mirror.root) for name in names if name.endswith(".tmp")]
+        self.assertEqual(leftovers, [])
+        self.assertEqual(self._keys(), set())
+
+    def test_evict_oldest(self):
+        old = self._source("OLD.icd", 6000)
+        new = self._source("NEW.icd", 6000)
+        self.mirror.fetch(old, os.path.join(self.out, "old.icd"))
+        self.mirror.fetch(new, os.path.join(self.out, "new.icd"))
+        self.assertFalse(self.mirror.contains(old))
+        self.assertTrue(self.mirror.contains(new))
+
+    def test_evict_keeps_row_when_remove_fails(self):
+        old = self._source("OLD.icd", 6000)
+        self.mirror.fetch(old, os.path.join(self.out, "old.icd"))
+        old_keys = self._keys()
+
+        real_remove = os.remove
+
+        def _locked(path):
+            if path.startswith(self.mirror.root):
+                raise PermissionError(13, "使用中です", path)
+            real_remove(path)
+
+        new = self._source("NEW.icd", 6000)
+        with mock.patch.object(icd_mirror_module.os, "remove", side_effect=_locked):
+            self.mirror.fetch(new, os.path.join(self.out, "new.icd"))
+        # 削除できなかったファイルは記録を残し、容量に数えたまま
+        self.assertTrue(old_keys <= self._keys())
+        self.assertTrue(self.mirror.contains(old))
+
+        # 次に削除できたときに記録も削除
+        self.mirror._evict()
+        self.assertFalse(self.mirror.contains(old))
+        self.assertTrue(self.mirror.contains(new))
+
+    def test_evict_drops_row_of_missing_blob(self):
+        old = self._source("OLD.icd", 6000)
+        self.mirror.fetch(old, os.path.join(self.out, "old.icd"))
+        key = next(iter(self._keys()))
+        os.remove(self.mirror._blob_path(key, old))
+        self.mirror.fetch(self._source("NEW.icd", 6000), os.path.join(self.out, "new.icd"))
+        self.assertNotIn(key, self._keys())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,127 @@
+# tests/test_miss_cache.py
+"""
+utils.miss_cache（見つからなかった品番のキャッシュ）のテスト。
+一時フォルダの SQLite ファイルを使います。
+
+使い方（リポジトリのルートで実行）:
+    python -m pytest tests
+"""
+import os
+import shutil
+import sqlite3
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from utils import miss_cache as miss_cache_module
+from utils.miss_cache import MissCache, format_age
+from utils.searchTools import search_gradually_batch
+
+
+class MissCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.cache = MissCache(db_path=os.path.join(self.tmp, "cache", "misses.sqlite3"), ttl=3600)
+
+    def tearDown(self):
+        if self.cache._conn is not None:
+            self.cache._conn.close()
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def _mkdir(self, *parts):
+        path = os.path.join(self.tmp, *parts)
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    def test_lookup_returns_age_and_watch_set(self):
+        self.assertIsNone(self.cache.lookup("P100"))
+        self.cache.put("P100", watch_set="abc")
+        age, watch_set = self.cache.lookup("P100")
+        self.assertGreaterEqual(age, 0)
+        self.assertLess(age, 60)
+        self.assertEqual(watch_set, "abc")
+
+    def test_ttl_expiry(self):
+        now = time.time()
+        with mock.patch.object(miss_cache_module.time, "time", return_value=now):
+            self.cache.put("P100")
+        with mock.patch.object(miss_cache_module.time, "time", return_value=now + 3599):
+            self.assertIsNotNone(self.cache.lookup("P100"))
+        with mock.patch.object(miss_cache_module.time, "time", return_value=now + 3601):
+            self.assertIsNone(self.cache.lookup("P100"))
+        self.assertIsNone(self.cache.lookup("P100"))  # 期限切れの結果は削除済み
+
+    def test_clock_moved_back(self):
+        now = time.time()
+        with mock.patch.object(miss_cache_module.time, "time", return_value=now):
+            self.cache.put("P100")
+        with mock.patch.object(miss_cache_module.time, "time", return_value=now - 10):
+            self.assertIsNone(self.cache.lookup("P100"))
+
+    def test_discard(self):
+        self.cache.put("P100")
+        self.cache.discard("P100")
+        self.assertIsNone(self.cache.lookup("P100"))
+
+    def test_watch_set_invalidated_by_folder_mtime(self):
+        project = self._mkdir("base", "P")
+        drawings = self._mkdir("base", "P", "sub", "drawings")
+        with open(os.path.join(drawings, "X100.icd"), "wb") as f:
+            f.write(b"icd")
+        past = time.time() - 100
+        for path in (project, drawings):
+            os.utime(path, (past, past))
+
+        visited = {}
+        search_gradually_batch(os.path.join(self.tmp, "base"), ["P100"], visited=visited)
+        self.assertIn(drawings, visited)
+        set_id = self.cache.save_watch_set(visited)
+        self.assertTrue(self.cache.watch_set_valid(set_id))
+        self.assertTrue(self.cache.watch_set_valid(set_id, workers=4))
+
+        # 深い階層の図面フォルダに追加された図面
+        with open(os.path.join(drawings, "P100.icd"), "wb") as f:
+            f.write(b"icd")
+        self.assertFalse(self.cache.watch_set_valid(set_id))
+        self.assertFalse(self.cache.watch_set_valid(set_id, workers=4))
+
+    def test_watch_set_invalidated_by_removed_folder(self):
+        folder = self._mkdir("base", "P")
+        set_id = self.cache.save_watch_set({folder: os.stat(folder).st_mtime})
+        shutil.rmtree(folder)
+        self.assertFalse(self.cache.watch_set_valid(set_id))
+
+    def test_unknown_watch_set(self):
+        self.assertFalse(self.cache.watch_set_valid("missing"))
+
+    def test_unreferenced_watch_sets_are_removed(self):
+        first = self.cache.save_watch_set({self._mkdir("a"): 1.0})
+        self.cache.put("P100", watch_set=first)
+        second = self.cache.save_watch_set({self._mkdir("b"): 2.0})
+        self.cache.discard("P100")
+        self.cache.save_watch_set({self._mkdir("c"): 3.0})
+        ids = {row[0] for row in self.cache._conn.execute("SELECT id FROM watch_sets")}
+        self.assertNotIn(first, ids)
+        self.assertNotIn(second, ids)
+
+    def test_old_database_gains_watch_set_column(self):
+        os.makedirs(os.path.dirname(self.cache.db_path))
+        conn = sqlite3.connect(self.cache.db_path)
+        conn.execute("CREATE TABLE misses (part TEXT PRIMARY KEY, checked_at REAL, dirs TEXT)")
+        conn.commit()
+        conn.close()
+        self.cache.put("P100", watch_set="abc")
+        self.assertEqual(self.cache.lookup("P100")[1], "abc")
+
+
+class FormatAgeTest(unittest.TestCase):
+    def test_format_age(self):
+        self.assertEqual(format_age(59), "0分前")
+        self.assertEqual(format_age(125), "2分前")
+        self.assertEqual(format_age(3 * 3600), "3時間前")
+        self.assertEqual(format_age(50 * 3600), "2日前")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,113 @@
+# tests/test_pdf_validator.py
+"""
+utils.pdf_validator（変換後の PDF の検証）のテスト。
+テスト用の PDF は最小構成のものをその場で作成します。
+
+使い方（リポジトリのルートで実行）:
+    python -m pytest tests
+"""
+import os
+import shutil
+import tempfile
+import unittest
+
+from utils.pdf_validator import validate_pdf, validate_pdfs
+
+
+def make_pdf(pages):
+    """カタログ（1）・ページツリー（2）・ページ（3〜）だけの PDF"""
+    kids = b" ".join(b"%d 0 R" % (3 + i) for i in range(pages))
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [" + kids + b"] /Count %d >>" % pages,
+    ] + [b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] >>"] * pages
+    data = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(data))
+        data += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref_at = len(data)
+    data += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    data += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    data += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref_at)
+    return data
+
+
+def append_page_count(data, count):
+    """追記保存: ページツリー（2）だけを書き換え、/Prev で元の xref 表につなぎます。"""
+    prev = int(data.rsplit(b"startxref", 1)[1].split()[0])
+    pages_at = len(data)
+    data += b"2 0 obj\n<< /Type /Pages /Kids [] /Count %d >>\nendobj\n" % count
+    xref_at = len(data)
+    data += b"xref\n2 1\n%010d 00000 n \n" % pages_at
+    data += b"trailer\n<< /Size 3 /Root 1 0 R /Prev %d >>\nstartxref\n%d\n%%%%EOF\n" % (prev, xref_at)
+    return data
+
+
+class ValidatePdfTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def _write(self, name, data):
+        path = os.path.join(self.tmp, name)
+        with open(path, "wb") as f:
+            f.write(data)
+        return path
+
+    def test_valid(self):
+        data = make_pdf(3)
+        result = validate_pdf(self._write("ok.pdf", data))
+        self.assertEqual(result, {"name": "ok.pdf", "size": len(data), "pages": 3, "error": None})
+
+    def test_empty(self):
+        result = validate_pdf(self._write("empty.pdf", b""))
+        self.assertEqual(result["error"], "0 バイト")
+
+    def test_truncated(self):
+        data = make_pdf(3)
+        result = validate_pdf(self._write("cut.pdf", data[:len(data) // 2]))
+        self.assertIn("%%EOF", result["error"])
+
+    def test_missing_header(self):
+        result = validate_pdf(self._write("bad.pdf", b"<html>" + make_pdf(1)[8:]))
+        self.assertEqual(result["error"], "PDFヘッダーがありません")
+
+    def test_bad_startxref(self):
+        data = make_pdf(1).replace(b"startxref\n", b"startxref\n9")
+        result = validate_pdf(self._write("bad.pdf", data))
+        self.assertTrue(result["error"].startswith("startxref の位置が不正です"))
+
+    def test_zero_pages(self):
+        result = validate_pdf(self._write("blank.pdf", make_pdf(0)))
+        self.assertEqual(result["pages"], 0)
+        self.assertEqual(result["error"], "ページがありません")
+
+    def test_incremental_update_uses_latest_page_tree(self):
+        path = self._write("updated.pdf", append_page_count(make_pdf(2), 5))
+        self.assertEqual(validate_pdf(path)["pages"], 5)
+        path = self._write("cleared.pdf", append_page_count(make_pdf(2), 0))
+        self.assertEqual(validate_pdf(path)["error"], "ページがありません")
+
+    def test_xref_stream_is_not_counted(self):
+        # 圧縮された相互参照（xref ストリーム）はページ数を数えずに通す
+        body = b"%PDF-1.5\n1 0 obj\n<< /Type /XRef /Size 1 /W [1 2 1] >>\nstream\n\nendstream\nendobj\n"
+        result = validate_pdf(self._write("stream.pdf", body + b"startxref\n9\n%%EOF\n"))
+        self.assertIsNone(result["pages"])
+        self.assertIsNone(result["error"])
+
+    def test_validate_pdfs(self):
+        self._write("a.pdf", make_pdf(2))
+        self._write("b.PDF", make_pdf(1))
+        self._write("c.pdf", b"")
+        self._write("d.txt", b"")
+        summary = validate_pdfs(self.tmp, workers=2)
+        self.assertEqual(summary["checked"], 3)
+        self.assertEqual(summary["pages"], 3)
+        self.assertEqual([r["name"] for r in summary["invalid"]], ["c.pdf"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+# tests/test_run_manifest.py
+"""
+utils.run_manifest の処理記録のテスト（Windows 以外でも実行可）。
+記録の保存先（MANIFEST_DIR）は一時フォルダに置き換えます。
+
+使い方（リポジトリのルートで実行）:
+    python -m pytest tests
+"""
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from utils import run_manifest
+from utils.run_manifest import RunManifest, STAGE_COPY, STAGE_PRINT, STAGE_EXCHANGE, discard_manifest
+
+
+class RunManifestTest(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.manifest_dir = os.path.join(self.root, "manifests")
+        patcher = mock.patch.object(run_manifest, "MANIFEST_DIR", self.manifest_dir)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.bom = os.path.join(self.root, "LS-TEST.xlsx")
+        with open(self.bom, "wb") as f:
+            f.write(b"v1")
+        self.output = os.path.join(self.root, "out", "TEST")
+        os.makedirs(self.output)
+
+    def tearDown(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def _save(self, *stages):
+        journal = RunManifest.create(self.output, self.bom, "excel", "TEST")
+        for stage in stages:
+            journal.set_stage(stage)
+        journal.save()
+        return journal
+
+    def test_saved_outside_output_folder(self):
+        self._save(STAGE_COPY)
+        self.assertEqual(os.listdir(self.output), [])
+        self.assertEqual(len(os.listdir(self.manifest_dir)), 1)
+        self.assertIsNotNone(RunManifest.load(self.output + os.sep))
+
+    def test_discard(self):
+        self._save(STAGE_COPY)
+        discard_manifest(self.output)
+        self.assertIsNone(RunManifest.load(self.output))
+        discard_manifest(self.output)  # ない場合は何もしない
+
+    def test_load_without_output_folder(self):
+        self._save(STAGE_COPY)
+        shutil.rmtree(self.output)
+        self.assertIsNone(RunManifest.load(self.output))
+
+    def test_same_source_after_touch(self):
+        journal = self._save(STAGE_COPY)
+        os.utime(self.bom, (1, 1))
+        self.assertTrue(journal.same_source(self.bom))
+
+    def test_edited_source_is_different(self):
+        journal = self._save(STAGE_COPY)
+        with open(self.bom, "wb") as f:
+            f.write(b"v2")  # 同じサイズ・別の内容
+        os.utime(self.bom, (1, 1))
+        self.assertFalse(journal.same_source(self.bom))
+        self.assertFalse(journal.same_source(os.path.join(self.root, "LS-OTHER.xlsx")))
+
+    def test_resumed_stage(self):
+        self.assertEqual(self._save(STAGE_COPY, STAGE_PRINT).step1_info()["resumed_stage"], STAGE_PRINT)
+        delivered = self._save(STAGE_COPY, STAGE_EXCHANGE)  # 途中のステップの記録がなくても交換済み
+        self.assertTrue(delivered.delivered())
+        self.assertEqual(delivered.step1_info()["resumed_stage"], STAGE_EXCHANGE)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+# tests/test_search_gradually.py
+"""
+utils.searchTools の標準機の検索（search_gradually / search_gradually_batch）のテスト。
+一時フォルダに作成したフォルダ構成で、一括版が従来の glob 版と同じ結果になることを確認します。
+
+使い方（リポジトリのルートで実行）:
+    python -m pytest tests
+"""
+import os
+import shutil
+import tempfile
+import unittest
+
+from utils.searchTools import search_gradually, search_gradually_batch
+
+# base_path からの相対パス
+FILES = [
+    "P100.icd",                 # 階層0（対象外）
+    "A/P200-3D.icd",            # 接尾辞一致
+    "A/P300-OLD.icd",           # 除外キーワード
+    "A/X-P400.icd",             # 品番で始まらない
+    "A/P1000.pdf.icd",          # 除外キーワード
+    "B/P200.icd",               # 同じ階層の完全一致を優先
+    "B/P900.icd",
+    "B/C/P400.icd",
+    "B/C/P500-2D.icd",
+    "B/C/P500-3D.icd",
+    "B/C/P500(M).icd",          # 接尾辞が -\w+ ではない
+    "B/C/P300.icd",
+    "B/C/D/E/P600.icd",         # 階層4
+    "B/C/D/E/F/P700.icd",       # 階層5（max_depth を超える）
+    "B/C/D/P600-2D.icd",
+    ".hidden/P800.icd",         # 隠しフォルダ
+    "A/.P800.icd",              # 隠しファイル
+    "A/P800-2D-3D.icd",         # 接尾辞が -\w+ ではない
+    "B/C/docs/P400.txt",        # 図面のないフォルダ
+]
+
+WORKPIECES = ["P100", "P200", "P300", "P400", "P500", "P600", "P700", "P800", "[P900]", "P1000", "P999"]
+
+
+class SearchGraduallyBatchTest(unittest.TestCase):
+    def setUp(self):
+        self.base = tempfile.mkdtemp()
+        for rel in FILES:
+            path = os.path.join(self.base, *rel.split("/"))
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "wb") as f:
+                f.write(b"icd")
+
+    def tearDown(self):
+        shutil.rmtree(self.base, ignore_errors=True)
+
+    def _path(self, rel):
+        return os.path.join(self.base, *rel.split("/"))
+
+    def test_same_result_as_search_gradually(self):
+        expected = {wp: search_gradually(self.base, wp) for wp in WORKPIECES}
+        self.assertEqual(search_gradually_batch(self.base, WORKPIECES), expected)
+        self.assertEqual(search_gradually_batch(self.base, WORKPIECES, workers=4), expected)
+
+    def test_matching_rules(self):
+        results = search_gradually_batch(self.base, WORKPIECES)
+        self.assertIsNone(results["P100"])
+        self.assertEqual(results["P200"], self._path("B/P200.icd"))
+        self.assertEqual(results["P300"], self._path("B/C/P300.icd"))
+        self.assertEqual(results["P400"], self._path("B/C/P400.icd"))
+        self.assertIn(results["P500"], (self._path("B/C/P500-2D.icd"), self._path("B/C/P500-3D.icd")))
+        self.assertEqual(results["P600"], self._path("B/C/D/P600-2D.icd"))  # 浅い階層を優先
+        self.assertIsNone(results["P700"])
+        self.assertIsNone(results["P800"])
+        self.assertEqual(results["[P900]"], self._path("B/P900.icd"))
+        self.assertIsNone(results["P1000"])
+        self.assertIsNone(results["P999"])
+
+    def test_max_depth(self):
+        results = search_gradually_batch(self.base, ["P400", "P700"], max_depth=1)
+        self.assertEqual(results, {"P400": None, "P700": None})
+
+    def test_visited_records_read_folders(self):
+        visited = {}
+        search_gradually_batch(self.base, ["P999"], visited=visited)
+        # 監視するのはプロジェクトのフォルダ（階層1まで）と図面のあるフォルダだけ
+        self.assertEqual(set(visited), {self.base} | {self._path(rel) for rel in ("A", "B", "B/C", "B/C/D", "B/C/D/E")})
+        self.assertEqual(visited[self._path("A")], os.stat(self._path("A")).st_mtime)
+
+
+if __name__ == "__main__":
+    unittest.main()
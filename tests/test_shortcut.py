@@ -0,0 +1,71 @@
+# tests/test_shortcut.py
+"""
+utils.shortcut の .lnk パーサーのテスト（Windows 以外でも実行可）。
+フィクスチャは tests/fixtures/lnk/make_fixtures.py で作成したものです。
+
+使い方（リポジトリのルートで実行）:
+    python -m pytest tests
+"""
+import os
+import shutil
+import tempfile
+import unittest
+
+from utils.shortcut import parse_lnk_target, read_lnk_target
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "lnk")
+
+
+def _read(name):
+    with open(os.path.join(FIXTURES, name), "rb") as f:
+        return f.read()
+
+
+class ParseLnkTargetTest(unittest.TestCase):
+    def test_local_path(self):
+        self.assertEqual(parse_lnk_target(_read("local.lnk")), "Y:\\専用機\\TSZ\\TSZ1234 搬送装置")
+
+    def test_unc_path(self):
+        self.assertEqual(parse_lnk_target(_read("unc.lnk")), "\\\\fileserver\\図面\\専用機\\TSZ5678")
+
+    def test_unicode_path(self):
+        self.assertEqual(parse_lnk_target(_read("unicode.lnk")), "Y:\\専用機\\TSZ\\TSZ9012 ①ﾃｽﾄ装置")
+
+    def test_relative_path(self):
+        lnk_path = os.path.join(FIXTURES, "relative.lnk")
+        expected = os.path.normpath(os.path.join(FIXTURES, "..", "TSZ3456"))
+        self.assertEqual(parse_lnk_target(_read("relative.lnk"), lnk_path), expected)
+        self.assertIsNone(parse_lnk_target(_read("relative.lnk")))  # 基準のフォルダがない
+
+    def test_invalid_data(self):
+        self.assertIsNone(parse_lnk_target(b""))
+        self.assertIsNone(parse_lnk_target(b"not a shortcut" * 10))
+        for name in ("local.lnk", "unc.lnk", "unicode.lnk"):
+            data = _read(name)
+            for size in (0x4C, 0x60, len(data) // 2):
+                self.assertIn(parse_lnk_target(data[:size]), (None, parse_lnk_target(data)), f"{name}[:{size}]")
+
+
+class ReadLnkTargetTest(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.folder, ignore_errors=True)
+
+    def test_reads_file_and_refreshes_on_change(self):
+        lnk_path = os.path.join(self.folder, "project.lnk")
+        shutil.copyfile(os.path.join(FIXTURES, "local.lnk"), lnk_path)
+        self.assertEqual(read_lnk_target(lnk_path), "Y:\\専用機\\TSZ\\TSZ1234 搬送装置")
+
+        shutil.copyfile(os.path.join(FIXTURES, "unc.lnk"), lnk_path)
+        st = os.stat(lnk_path)
+        os.utime(lnk_path, (st.st_atime, st.st_mtime + 10))
+        self.assertEqual(read_lnk_target(lnk_path), "\\\\fileserver\\図面\\専用機\\TSZ5678")
+
+    def test_missing_file(self):
+        self.assertIsNone(read_lnk_target(os.path.join(self.folder, "none.lnk")))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,112 @@
+# tests/test_stable_files.py
+"""
+utils.stable_files のテスト（Windows 以外でも実行可）。
+書き込み中の判定（共有なしで開けるか）はモックで確認します。
+
+使い方（リポジトリのルートで実行）:
+    python -m pytest tests
+"""
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from utils import stable_files
+from utils.stable_files import ArrivalTracker, wait_for_stable_files
+
+
+class InUseTest(unittest.TestCase):
+    def _in_use(self, error):
+        with mock.patch.object(stable_files.sys, "platform", "win32"), \
+                mock.patch.object(stable_files, "_open_exclusive_error", return_value=error):
+            return stable_files._in_use("A.pdf")
+
+    def test_sharing_violation_is_busy(self):
+        self.assertTrue(self._in_use(32))
+
+    def test_access_denied_is_not_busy(self):
+        self.assertFalse(self._in_use(5))  # 読み取り専用のファイルなど
+
+    def test_opened_is_not_busy(self):
+        self.assertFalse(self._in_use(0))
+
+    def test_open_failure_is_not_busy(self):
+        with mock.patch.object(stable_files.sys, "platform", "win32"), \
+                mock.patch.object(stable_files, "_open_exclusive_error", side_effect=OSError("no kernel32")):
+            self.assertFalse(stable_files._in_use("A.pdf"))
+
+    def test_not_checked_outside_windows(self):
+        with mock.patch.object(stable_files.sys, "platform", "linux"), \
+                mock.patch.object(stable_files, "_open_exclusive_error", return_value=32) as opened:
+            self.assertFalse(stable_files._in_use("A.pdf"))
+        opened.assert_not_called()
+
+
+class ArrivalTrackerTest(unittest.TestCase):
+    def test_counts_normalized_names(self):
+        tracker = ArrivalTracker(["A-3D", "B", "C"])
+        self.assertTrue(tracker.update(["a.pdf", "X.pdf"]))
+        self.assertEqual(tracker.arrived, 1)
+        self.assertEqual(tracker.missing(), ["B", "C"])
+        tracker.update(["a.pdf", "b.PDF", "C.pdf"])
+        self.assertEqual((tracker.arrived, tracker.missing()), (3, []))
+        tracker.update(["b.PDF"])
+        self.assertEqual(tracker.missing(), ["A-3D", "C"])
+
+    def test_3d_twin_is_a_different_file(self):
+        tracker = ArrivalTracker(["A-B", "A-B-3D"])
+        tracker.update(["A-B.pdf"])
+        self.assertEqual((tracker.arrived, tracker.missing()), (1, ["A-B-3D"]))
+        tracker.update(["A-B.pdf", "a-b-3d.pdf"])
+        self.assertEqual((tracker.arrived, tracker.missing()), (2, []))
+
+
+class WaitForStableFilesTest(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        for name in ("A.pdf", "B.pdf"):
+            with open(os.path.join(self.folder, name), "wb") as f:
+                f.write(b"%PDF-1.4\n")
+
+    def tearDown(self):
+        shutil.rmtree(self.folder, ignore_errors=True)
+
+    def _wait(self, expected, **kwargs):
+        options = dict(timeout=2, poll_interval=0.01, settle=0.05, idle_timeout=0.2)
+        options.update(kwargs)
+        return wait_for_stable_files(self.folder, ".pdf", expected, **options)
+
+    def test_stable_when_all_arrived(self):
+        result = self._wait(["A", "B"])
+        self.assertTrue(result["stable"])
+        self.assertEqual((result["arrived"], result["total"]), (2, 2))
+
+    def test_idle_when_missing(self):
+        result = self._wait(["A", "B", "C"])
+        self.assertFalse(result["stable"])
+        self.assertTrue(result["idle"])
+        self.assertEqual(result["missing"], ["C"])
+
+    def test_waits_while_file_is_being_written(self):
+        busy = {"A.pdf": 3}  # 3 回目の確認まで書き込み中
+
+        def _in_use(path):
+            name = os.path.basename(path)
+            busy[name] = busy.get(name, 0) - 1
+            return busy[name] >= 0
+
+        with mock.patch.object(stable_files, "_in_use", side_effect=_in_use) as in_use:
+            result = self._wait(["A", "B"])
+        self.assertTrue(result["stable"])
+        self.assertGreaterEqual(in_use.call_count, 4)
+
+    def test_timeout_while_file_is_being_written(self):
+        with mock.patch.object(stable_files, "_in_use", return_value=True):
+            result = self._wait(["A", "B"], timeout=0.3)
+        self.assertFalse(result["stable"])
+        self.assertTrue(result["timed_out"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+# utils/bom_cache.py
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from config.settings import BOM_CACHE_PATH, BOM_CACHE_MAX_ENTRIES
+from utils.checksum import file_digest
+
+# 抽出ルールを変更した場合はこの値を上げる（古い結果を使わないため）
+_FORMAT_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS boms (
+    key       TEXT PRIMARY KEY,
+    data      TEXT,
+    last_used REAL
+);
+CREATE INDEX IF NOT EXISTS boms_last_used ON boms(last_used);
+"""
+
+
+class BomCache:
+    """
+    解析済み部品表の永続キャッシュ（SQLite）。
+    - キーはファイル内容のハッシュ（内容が変われば別キーになるため、古い結果は使われない）
+    - BOM_CACHE_MAX_ENTRIES 件を超えた場合は最後に使われた日時が古いものから削除
+    """
+
+    def __init__(self, db_path=BOM_CACHE_PATH, max_entries=BOM_CACHE_MAX_ENTRIES):
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = None
+        self._digests = {}  # path -> (size, mtime_ns, digest)
+
+    def _connect(self):
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._conn.executescript(_SCHEMA)
+        return self._conn
+
+    def key_for(self, path):
+        """
+        キャッシュキー（形式バージョン + ファイル内容のハッシュ）を返します。
+        同じプロセス内でサイズ・更新日時が変わっていないファイルはハッシュを再計算しません。
+        """
+        st = os.stat(path)
+        cached = self._digests.get(path)
+        if cached and cached[0] == st.st_size and cached[1] == st.st_mtime_ns:
+            digest = cached[2]
+        else:
+            digest = file_digest(path)
+            self._digests[path] = (st.st_size, st.st_mtime_ns, digest)
+        return f"{_FORMAT_VERSION}:{digest}"
+
+    def get(self, key):
+        """キャッシュ済みの結果（dict）を返します。ない場合は None。"""
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute("SELECT data FROM boms WHERE key = ?", (key,)).fetchone()
+            if not row:
+                return None
+            conn.execute("UPDATE boms SET last_used = ? WHERE key = ?", (time.time(), key))
+            conn.commit()
+        return json.loads(row[0])
+
+    def put(self, key, data):
+        """結果を保存し、上限を超えた分を削除します。"""
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO boms (key, data, last_used) VALUES (?, ?, ?)",
+                (key, json.dumps(data, ensure_ascii=False), time.time()),
+            )
+            conn.execute(
+                "DELETE FROM boms WHERE key NOT IN "
+                "(SELECT key FROM boms ORDER BY last_used DESC LIMIT ?)",
+                (self.max_entries,),
+            )
+            conn.commit()
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_bom_cache():
+    """共有の BomCache インスタンスを返します（初回呼び出し時に作成）。"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = BomCache()
+        return _cache
@@ -0,0 +1,215 @@
+# utils/bom_reader.py
+import os
+import posixpath
+import re
+import zipfile
+import xml.etree.ElementTree as ET
+
+_REL_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+_CELL_REF = re.compile(r"([A-Z]+)(\d*)")
+
+
+def column_index(letters: str) -> int:
+    """列名を 0 始まりの番号に変換します（A → 0, K → 10, AB → 27）。"""
+    index = 0
+    for ch in letters.upper():
+        index = index * 26 + (ord(ch) - ord("A") + 1)
+    return index - 1
+
+
+def _local(tag):
+    """名前空間を除いたタグ名（strict OOXML の名前空間にも対応）"""
+    return tag.rsplit("}", 1)[-1]
+
+
+def _to_number(text):
+    value = float(text)
+    return int(value) if value.is_integer() else value
+
+
+class _SharedRef:
+    """共有文字列（sharedStrings.xml）の参照。シート読み込み後にまとめて解決します。"""
+    __slots__ = ("index",)
+
+    def __init__(self, index):
+        self.index = index
+
+
+def _first_sheet_paths(zf):
+    """ブック内の最初のシートと sharedStrings.xml のパスを返します。"""
+    rels = {}
+    shared_strings = None
+    with zf.open("xl/_rels/workbook.xml.rels") as f:
+        for _, elem in ET.iterparse(f):
+            if _local(elem.tag) == "Relationship":
+                target = elem.get("Target", "")
+                target = target.lstrip("/") if target.startswith("/") else posixpath.join("xl", target)
+                rels[elem.get("Id")] = posixpath.normpath(target)
+                if elem.get("Type", "").endswith("/sharedStrings"):
+                    shared_strings = rels[elem.get("Id")]
+
+    sheet_path = None
+    with zf.open("xl/workbook.xml") as f:
+        for _, elem in ET.iterparse(f):
+            if _local(elem.tag) == "sheet":
+                sheet_path = rels.get(elem.get(f"{{{_REL_NS}}}id"))
+                break
+    if sheet_path is None:
+        raise ValueError("Excelファイルにシートが見つかりません。")
+    return sheet_path, shared_strings
+
+
+def _cell_value(cell):
+    """<c> 要素の値を型付きで返します（共有文字列は _SharedRef）。"""
+    cell_type = cell.get("t", "n")
+    if cell_type == "inlineStr":
+        return "".join(t.text or "" for t in cell.iter() if _local(t.tag) == "t") or None
+
+    v = None
+    for child in cell:
+        if _local(child.tag) == "v":
+            v = child.text
+            break
+    if v is None:
+        return None
+    if cell_type == "s":
+        return _SharedRef(int(v))
+    if cell_type == "b":
+        return v == "1"
+    if cell_type == "e":
+        return None  # #N/A などのエラー値は空扱い
+    if cell_type in ("str", "d"):
+        return v or None
+    try:
+        return _to_number(v)
+    except ValueError:
+        return v
+
+
+def _read_sheet(zf, sheet_path, col_indexes, first_row):
+    """シートXMLを逐次読み込み、対象列だけを [(row_number, [値...]), ...] で返します。"""
+    wanted = {col: pos for pos, col in enumerate(col_indexes)}
+    rows = []
+    row_number = 0
+    with zf.open(sheet_path) as f:
+        for _, elem in ET.iterparse(f):
+            if _local(elem.tag) != "row":
+                continue
+            r = elem.get("r")
+            row_number = int(r) if r else row_number + 1
+            if row_number >= first_row:
+                values = [None] * len(col_indexes)
+                col = -1
+                for cell in elem:
+                    if _local(cell.tag) != "c":
+                        continue
+                    ref = cell.get("r")
+                    m = _CELL_REF.match(ref) if ref else None
+                    col = column_index(m.group(1)) if m else col + 1
+                    pos = wanted.get(col)
+                    if pos is not None:
+                        values[pos] = _cell_value(cell)
+                if any(v is not None for v in values):
+                    rows.append((row_number, values))
+            elem.clear()
+    return rows
+
+
+def _read_shared_strings(zf, path, needed):
+    """sharedStrings.xml から必要な番号の文字列だけを読み込みます（ふりがな <rPh> は除外）。"""
+    strings = {}
+    if not needed or not path:
+        return strings
+    last_needed = max(needed)
+    index = 0
+    with zf.open(path) as f:
+        for _, elem in ET.iterparse(f):
+            if _local(elem.tag) != "si":
+                continue
+            if index in needed:
+                parts = []
+                for child in elem:
+                    name = _local(child.tag)
+                    if name == "t":
+                        parts.append(child.text or "")
+                    elif name == "r":
+                        parts.extend(t.text or "" for t in child if _local(t.tag) == "t")
+                strings[index] = "".join(parts)
+            elem.clear()
+            index += 1
+            if index > last_needed:
+                break
+    return strings
+
+
+def _iter_xls_rows(path, columns, first_row):
+    """旧形式（.xls）は zip ではないため、従来どおり pandas で読み込みます。"""
+    import pandas as pd
+
+    df = pd.read_excel(path, usecols=",".join(columns), skiprows=first_row - 1, header=None)
+    for values in df.itertuples(index=False):
+        yield tuple(None if pd.isna(v) else v for v in values)
+
+
+def iter_bom_rows(path, columns=("K", "AB", "AD"), first_row=8):
+    """
+    部品表（最初のシート）の指定列を first_row 行目から読み込み、行ごとに値のタプルを返します。
+    - .xlsx / .xlsm: zip 内のシートXMLを逐次読み込み（DataFrame を作らない）
+    - 値の型: 文字列 / 整数 / 小数 / bool、空セル・空文字・エラー値は None
+    - 対象列がすべて空の行は返しません
+    """
+    if os.path.splitext(path)[1].lower() == ".xls":
+        for values in _iter_xls_rows(path, columns, first_row):
+            if any(v is not None for v in values):
+                yield values
+        return
+
+    col_indexes = [column_index(c) for c in columns]
+    with zipfile.ZipFile(path) as zf:
+        sheet_path, shared_strings_path = _first_sheet_paths(zf)
+        rows = _read_sheet(zf, sheet_path, col_indexes, first_row)
+        needed = {v.index for _, values in rows for v in values if isinstance(v, _SharedRef)}
+        strings = _read_shared_strings(zf, shared_strings_path, needed)
+
+    for _, values in rows:
+        resolved = []
+        for v in values:
+            if isinstance(v, _SharedRef):
+                v = strings.get(v.index) or None
+            resolved.append(v)
+        if any(v is not None for v in resolved):
+            yield tuple(resolved)
+
+
+HOLD = "保留"
+ADDITION = "追加"
+
+
+def filter_bom(rows):
+    """
+    部品表の行（iter_bom_rows の (K, AB, AD) タプル）を1回の走査で振り分けます。
+    - 「追加」の行が1つでもある場合: 「追加」の行の品番だけ
+    - ない場合: 品番と AB 列があり、「保留」ではない行の品番
+    戻り値: (品番リスト, 保留の品番, 追加の品番)
+    """
+    hold = []
+    addition = []
+    addition_parts = []
+    normal_parts = []
+    has_addition = False
+    for k, ab, ad in rows:
+        status = ad.strip() if ad.__class__ is str else ("" if ad is None else str(ad).strip())
+        if status == ADDITION:
+            has_addition = True
+            if k is not None:
+                part = str(k).strip()
+                addition.append(part)
+                if k != 0:
+                    addition_parts.append(part)
+        elif k is None:
+            continue
+        elif status == HOLD:
+            hold.append(str(k).strip())
+        elif k != 0 and ab is not None and ab != "" and str(ab) != "0":
+            normal_parts.append(str(k).strip())
+    return (addition_parts if has_addition else normal_parts), hold, addition
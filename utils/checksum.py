@@ -0,0 +1,14 @@
+# utils/checksum.py
+import hashlib
+
+
+def file_digest(path, chunk_size=1024 * 1024):
+    """ファイル内容の BLAKE2b ハッシュ（16進）を返します。"""
+    h = hashlib.blake2b(digest_size=20)
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            h.update(chunk)
+    return h.hexdigest()
@@ -0,0 +1,205 @@
+# utils/copy_engine.py
+import os
+import queue
+import threading
+import time
+
+from config.settings import COPY_WORKERS, COPY_QUEUE_SIZE, COPY_BUFFER_SIZE
+from utils.checksum import file_digest
+from utils.fast_copy import fast_copy
+
+
+class CopyEngine:
+    """
+    並列コピーエンジン。
+    - submit() でコピー元を上限付きキューに入れ、workers 個のスレッドが同時にコピーする（fast_copy 使用）
+    - コピー済みバイト数・ファイル/s・MB/s を progress_callback(snapshot) で定期的に通知する
+    - finish() でファイルごとの所要時間（読み込み / 書き込み別）を返す
+    """
+
+    def __init__(self, target_folder, workers=COPY_WORKERS, buffer_size=COPY_BUFFER_SIZE,
+                 queue_size=COPY_QUEUE_SIZE, progress_callback=None, report_interval=0.25, mirror=None,
+                 checksum=False, on_file_done=None):
+        self.target_folder = target_folder
+        self.mirror = mirror  # IcdMirror（任意）: ヒットした場合は共有フォルダにアクセスしない
+        self.checksum = checksum  # True の場合、コピー後のファイルのチェックサムを記録
+        self.on_file_done = on_file_done  # ファイルごとのコピー結果を受け取る関数（任意、コピースレッドから呼ばれます）
+        self.workers = max(1, int(workers))
+        self.buffer_size = buffer_size
+        self.progress_callback = progress_callback
+        self.report_interval = report_interval
+
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._lock = threading.Lock()
+        self._threads = []
+        self._started_at = None
+        self._last_report = 0.0
+
+        self.timings = []          # ファイルごとの結果（完了順）
+        self.files_submitted = 0
+        self.files_done = 0
+        self.bytes_done = 0
+        self.bytes_total = 0       # 判明しているサイズの合計
+        self.files_sized = 0       # サイズが判明しているファイル数
+
+    # ---------------- 実行 ----------------
+    def start(self):
+        self._started_at = time.perf_counter()
+        for _ in range(self.workers):
+            thread = threading.Thread(target=self._worker, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def submit(self, src, size=None, dest=None):
+        """
+        コピー元を追加します（キューが満杯の場合は空くまで待つ）。
+        dest: コピー先パス（省略時は target_folder 直下の同名ファイル）
+        """
+        with self._lock:
+            self.files_submitted += 1
+            if size is not None:
+                self.bytes_total += size
+                self.files_sized += 1
+        self._queue.put((src, size, dest))
+
+    def finish(self):
+        """すべてのコピーが終わるまで待ち、ファイルごとの結果を返します。"""
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+        self._report(force=True)
+        return self.timings
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.finish()
+        return False
+
+    def _worker(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            src, size_hint, dst = item
+            if dst is None:
+                dst = os.path.join(self.target_folder, os.path.basename(src))
+            started = time.perf_counter()
+            record = {"source": src, "dest": dst, "bytes": 0, "method": None, "cache": None,
+                      "read_seconds": 0.0, "write_seconds": 0.0, "combined_seconds": 0.0, "seconds": 0.0, "error": None,
+                      "size": size_hint, "mtime": None, "checksum": None}
+            try:
+                st = os.stat(src)
+                record.update(size=st.st_size, mtime=st.st_mtime)
+                if size_hint is None:
+                    with self._lock:
+                        self.bytes_total += st.st_size
+                        self.files_sized += 1
+                record.update(self._copy_one(src, dst))
+                record["seconds"] = time.perf_counter() - started
+                if self.checksum:
+                    record["checksum"] = file_digest(dst)  # コピー時間には含めない
+            except Exception as e:
+                record["error"] = str(e)
+                record["seconds"] = time.perf_counter() - started
+            with self._lock:
+                self.timings.append(record)
+                self.files_done += 1
+            # 呼び出し側の処理（記録の保存など）が失敗してもスレッドは止めない（キューが空かず submit() が止まるため）
+            if self.on_file_done:
+                try:
+                    self.on_file_done(record)
+                except Exception as e:
+                    print(f"⚠ コピー結果を記録できません: {os.path.basename(src)} | {e}")
+            self._report(force=True)
+
+    def _copy_one(self, src, dst):
+        if self.mirror is not None:
+            reported = [0]
+
+            def _counted(n):
+                reported[0] += n
+                self._on_bytes(n)
+
+            try:
+                return self.mirror.fetch(src, dst, on_bytes=_counted)
+            except Exception as e:
+                print(f"⚠ ICDミラーを使用できません（直接コピーします）: {e}")
+                if reported[0]:
+                    self._on_bytes(-reported[0])  # 直接コピーで数え直すため、通知済みの分を取り消す
+        return fast_copy(src, dst, self.buffer_size, on_bytes=self._on_bytes)
+
+    def _on_bytes(self, n):
+        with self._lock:
+            self.bytes_done += n
+        self._report()
+
+    # ---------------- 進捗 ----------------
+    def snapshot(self):
+        """現在の進捗（バイト数・ファイル数・スループット）を返します。"""
+        with self._lock:
+            elapsed = time.perf_counter() - self._started_at if self._started_at else 0.0
+            return {
+                "files_submitted": self.files_submitted,
+                "files_done": self.files_done,
+                "bytes_done": self.bytes_done,
+                "bytes_total": self.bytes_total,
+                "files_sized": self.files_sized,
+                "elapsed": elapsed,
+                "files_per_sec": self.files_done / elapsed if elapsed > 0 else 0.0,
+                "mb_per_sec": self.bytes_done / (1024 * 1024) / elapsed if elapsed > 0 else 0.0,
+            }
+
+    def stats(self):
+        """
+        コピー結果の集計を返します。
+        read_seconds（共有フォルダ側）と write_seconds（ローカル側）の合計を比べるとボトルネックが分かります。
+        OS に読み書きを任せる方式（CopyFileExW など）は内訳がないため、コピー時間は combined_seconds に入ります。
+        ミラー使用時は、ヒット率と共有フォルダから読まずに済んだバイト数（bytes_saved）も含みます。
+        """
+        snap = self.snapshot()
+        with self._lock:
+            timings = list(self.timings)
+        return summarize_timings(timings, snap["elapsed"])
+
+    def _report(self, force=False):
+        if not self.progress_callback:
+            return
+        now = time.perf_counter()
+        with self._lock:
+            if not force and now - self._last_report < self.report_interval:
+                return
+            self._last_report = now
+        # 進捗表示（UI）の失敗はコピーの失敗にしない
+        try:
+            self.progress_callback(self.snapshot())
+        except Exception as e:
+            print(f"⚠ コピーの進捗を表示できません: {e}")
+
+
+
+def summarize_timings(timings, elapsed):
+    """ファイルごとの結果（CopyEngine.timings と同じ形式）を CopyEngine.stats() と同じ形式に集計します。"""
+    ok = [t for t in timings if not t["error"]]
+    hits = [t for t in ok if t["cache"] == "hit"]
+    misses = [t for t in ok if t["cache"] == "miss"]
+    total_bytes = sum(t["bytes"] for t in ok)
+    return {
+        "files": len(ok),
+        "failed": len(timings) - len(ok),
+        "bytes": total_bytes,
+        "elapsed": elapsed,
+        "files_per_sec": len(ok) / elapsed if elapsed > 0 else 0.0,
+        "mb_per_sec": total_bytes / (1024 * 1024) / elapsed if elapsed > 0 else 0.0,
+        "read_seconds": sum(t["read_seconds"] for t in ok),
+        "write_seconds": sum(t["write_seconds"] for t in ok),
+        "combined_seconds": sum(t.get("combined_seconds", 0.0) for t in ok),
+        "cache_hits": len(hits),
+        "cache_misses": len(misses),
+        "hit_ratio": len(hits) / (len(hits) + len(misses)) if hits or misses else 0.0,
+        "bytes_saved": sum(t["bytes"] for t in hits),
+    }
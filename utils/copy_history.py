@@ -0,0 +1,68 @@
+# utils/copy_history.py
+import json
+import os
+import threading
+import time
+
+from config.settings import COPY_HISTORY_PATH, COPY_HISTORY_SIZE, COPY_DEFAULT_MB_PER_SEC
+
+_lock = threading.Lock()
+
+
+def _load():
+    try:
+        with open(COPY_HISTORY_PATH, "r", encoding="utf-8") as f:
+            sessions = json.load(f)
+        return sessions if isinstance(sessions, list) else []
+    except (OSError, ValueError):
+        return []
+
+
+def record_copy_session(copy_stats):
+    """
+    ステップ1のコピー結果（CopyEngine.stats()）から、共有フォルダから読んだ分の速度を記録します。
+    ミラーのヒットだけだった回（共有フォルダを読んでいない）は記録しません。
+    """
+    share_bytes = copy_stats["bytes"] - copy_stats.get("bytes_saved", 0)
+    share_files = copy_stats["files"] - copy_stats.get("cache_hits", 0)
+    if share_files <= 0 or copy_stats["elapsed"] <= 0:
+        return
+    with _lock:
+        sessions = _load()
+        sessions.append({
+            "at": time.time(),
+            "bytes": share_bytes,
+            "files": share_files,
+            "elapsed": copy_stats["elapsed"],
+        })
+        sessions = sessions[-COPY_HISTORY_SIZE:]
+        try:
+            os.makedirs(os.path.dirname(COPY_HISTORY_PATH), exist_ok=True)
+            tmp_path = COPY_HISTORY_PATH + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(sessions, f)
+            os.replace(tmp_path, COPY_HISTORY_PATH)
+        except OSError as e:
+            print(f"⚠ コピー速度の記録を保存できません: {e}")
+
+
+def estimate_copy_seconds(share_bytes, share_files):
+    """
+    共有フォルダから share_files 個・share_bytes バイトをコピーする所要時間（秒）を見積もります。
+    最近のコピーの実測値（MB/s とファイル/s のうち遅い方）を使用し、記録がない場合は COPY_DEFAULT_MB_PER_SEC。
+    戻り値: (秒, 見積もりに使った MB/s, 実測値かどうか)
+    """
+    with _lock:
+        sessions = _load()
+    total_elapsed = sum(s["elapsed"] for s in sessions)
+    if not sessions or total_elapsed <= 0:
+        mb_per_sec = COPY_DEFAULT_MB_PER_SEC
+        return share_bytes / (1024 * 1024) / mb_per_sec, mb_per_sec, False
+
+    bytes_per_sec = sum(s["bytes"] for s in sessions) / total_elapsed
+    files_per_sec = sum(s["files"] for s in sessions) / total_elapsed
+    seconds = max(
+        share_bytes / bytes_per_sec if bytes_per_sec else 0.0,
+        share_files / files_per_sec if files_per_sec else 0.0,
+    )
+    return seconds, bytes_per_sec / (1024 * 1024), True
@@ -5,6 +5,8 @@ import threading
 import os
 import subprocess
 
+from utils.run_manifest import RunManifest, STAGE_COPY, discard_manifest
+
 
 class EmergencyStopManager:
     def __init__(self):
@@ -27,6 +29,7 @@ class EmergencyStopManager:
 def cleanup_on_stop(app, info_dict):
     """
     非常停止時の後処理: Step 1で作成されたフォルダを削除
+    ただし Step 1 が完了済み（処理記録あり）の場合は、次回再開できるようにフォルダを残す
     
     Args:
         app: ShutsuzuuApp インスタンス
@@ -36,7 +39,17 @@ def cleanup_on_stop(app, info_dict):
         return
     
     folder_to_delete = info_dict["output_folder"]
+
+    manifest = RunManifest.load(folder_to_delete)
+    if manifest is not None and manifest.stage_done(STAGE_COPY):
+        from utils.UI_helpers import log_info
+        log_info(app, f"再開できるようにフォルダを残しました: {folder_to_delete}")
+        print(f"[保持] 処理記録があるため削除しません: {folder_to_delete}")
+        return
+
     _try_delete_folder(app, folder_to_delete)
+    if not os.path.exists(folder_to_delete):
+        discard_manifest(folder_to_delete)  # 処理記録はローカルに保存しているため、フォルダと一緒に削除
 
 
 def _try_delete_folder(app, folder_path):
@@ -2,8 +2,9 @@
 # excel_collect.py
 import os
 import re
-import shutil
 import unicodedata
+from utils.fast_copy import fast_copy
+from utils.excel_remove import VALID_EXT, extract_id, normalize_text as normalize_id
 
 def normalize_text(s: str) -> str:
     return unicodedata.normalize('NFKC', s or '').strip()
@@ -70,7 +71,7 @@ def add_ls_lk_excel_set_to_output(excel_path: str, output_dir: str,
             fname = os.path.basename(src)
             dst = os.path.join(output_dir, fname)
             dst = next_nonconflict_path(dst)
-            shutil.copy2(src, dst)
+            fast_copy(src, dst, preserve_metadata=True)
             copied.append(dst)
             print(f"✅ コピー: {src} -> {dst}")
         except Exception as e:
@@ -78,3 +79,82 @@ def add_ls_lk_excel_set_to_output(excel_path: str, output_dir: str,
 
     print(f"📦 合計 {len(copied)} 件をコピーしました。")
     return copied
+
+def collect_ls_lk_excel_set(excel_path: str, output_dir: str, folder_id: str,
+                            include_selected: bool = True, recursive: bool = False) -> tuple[int, int, int]:
+    """
+    add_ls_lk_excel_set_to_output（LS/LK の Excel を集める）と excel_remove（ID が一致しない・(先行手配) を削除）
+    の規則を、コピー元フォルダの一覧1回に適用し、残るものだけをコピーします（コピー後の削除なし）。
+    - 保持: ID が folder_id と一致する LS/LK の Excel（コピーする）
+    - 削除: LS/LK の Excel だが (先行手配) または ID が一致しない（コピーしない）
+    - スキップ: 非対象のファイル・コピー失敗
+    出力フォルダに同じ名前・サイズ・更新日時のファイルがある場合（再開時など）はコピーしません。
+    戻り値: (保持, 削除, スキップ)
+    """
+    kept = removed = skipped = 0
+    if not excel_path or not os.path.isfile(excel_path):
+        print("❌ 指定Excelが不正です。")
+        return kept, removed, skipped
+    if not output_dir or not os.path.isdir(output_dir):
+        print(f"❌ 出力フォルダが存在しません: {output_dir}")
+        return kept, removed, skipped
+
+    base_dir = os.path.dirname(excel_path)
+    id_part = extract_id_from_name(os.path.basename(excel_path))
+    if not id_part:
+        print("⚠ 指定Excel名から ID（LS-/LK-の直後）が取得できませんでした。例：LS-1234_... の形式にしてください。")
+        return kept, removed, skipped
+
+    set_pat = re.compile(rf'^(?:LS|LK)[-_ ]?{re.escape(id_part)}', flags=re.IGNORECASE)
+    fid = normalize_id(folder_id)
+    selected = os.path.abspath(excel_path)
+
+    survivors = []
+    for _, entries in _list_files(base_dir, recursive):
+        for entry in entries:
+            name_no_ext, ext = os.path.splitext(entry.name)
+            if (ext.lower() not in VALID_EXT or entry.name.startswith("~$")
+                    or not set_pat.match(normalize_text(name_no_ext))
+                    or (not include_selected and os.path.abspath(entry.path) == selected)):
+                skipped += 1
+                continue
+            if "(先行手配)" in unicodedata.normalize("NFC", name_no_ext):
+                print(f"除外しました(先行手配): {entry.path}")
+                removed += 1
+            elif normalize_id(extract_id(name_no_ext)) != fid:
+                print(f"除外しました: {entry.path}")
+                removed += 1
+            else:
+                survivors.append(entry)
+
+    for entry in survivors:
+        dst = os.path.join(output_dir, entry.name)
+        try:
+            st = entry.stat()
+            if os.path.exists(dst):
+                dst_st = os.stat(dst)
+                if dst_st.st_size == st.st_size and int(dst_st.st_mtime) == int(st.st_mtime):
+                    print(f"保持しました(コピー済み): {dst}")
+                    kept += 1
+                    continue
+                dst = next_nonconflict_path(dst)
+            fast_copy(entry.path, dst, preserve_metadata=True)
+            print(f"✅ コピー: {entry.path} -> {dst}")
+            kept += 1
+        except Exception as e:
+            print(f"⚠ コピー失敗: {entry.path} | エラー: {e}")
+            skipped += 1
+
+    print(f"\n結果: 保持={kept}, 削除={removed}, スキップ(非対象)={skipped}")
+    return kept, removed, skipped
+
+def _list_files(base_dir: str, recursive: bool):
+    """(フォルダ, [ファイルの DirEntry, ...]) をフォルダごとに返します（フォルダごとに1回だけ一覧を取得）。"""
+    pending = [base_dir]
+    while pending:
+        root = pending.pop(0)
+        with os.scandir(root) as it:
+            entries = list(it)
+        yield root, [e for e in entries if e.is_file()]
+        if recursive:
+            pending.extend(e.path for e in entries if e.is_dir())
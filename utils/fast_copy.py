@@ -0,0 +1,214 @@
+# utils/fast_copy.py
+import errno
+import os
+import shutil
+import sys
+import time
+
+from config.settings import COPY_BUFFER_SIZE
+
+# copy_file_range / sendfile 1回あたりの転送量（進捗通知の粒度）
+_CHUNK_SIZE = 8 * 1024 * 1024
+
+# Linux: ioctl(FICLONE) によるリフリンク（btrfs / XFS など）
+_FICLONE = 0x40049409
+
+# カーネル・ファイルシステムが対応していない場合のエラー（次の方式にフォールバック）
+_UNSUPPORTED_ERRNOS = {
+    errno.ENOSYS, errno.EXDEV, errno.EINVAL, errno.EOPNOTSUPP,
+    errno.ENOTTY, errno.EBADF, errno.EPERM,
+}
+
+
+def _copy_buffered(fsrc, fdst, buffer_size, on_bytes):
+    """大きなバッファでの読み書きコピー（読み込み / 書き込み時間を別々に計測）"""
+    buf = bytearray(buffer_size)
+    view = memoryview(buf)
+    total = 0
+    read_seconds = 0.0
+    write_seconds = 0.0
+    while True:
+        t0 = time.perf_counter()
+        n = fsrc.readinto(buf)
+        t1 = time.perf_counter()
+        read_seconds += t1 - t0
+        if not n:
+            break
+        fdst.write(view[:n])
+        write_seconds += time.perf_counter() - t1
+        total += n
+        if on_bytes:
+            on_bytes(n)
+    return {"bytes": total, "read_seconds": read_seconds, "write_seconds": write_seconds, "method": "buffered"}
+
+
+def _reflink(in_fd, out_fd):
+    """Linux: ioctl(FICLONE) でデータをコピーせずにブロックを共有します。対応していない場合は False。"""
+    try:
+        import fcntl
+        fcntl.ioctl(out_fd, _FICLONE, in_fd)
+        return True
+    except (ImportError, OSError):
+        return False
+
+
+def clone_file(src, dst):
+    """
+    src を dst にクローンします（リフリンク: データはコピーせず、書き込まれた部分だけ別々になる）。
+    Linux の btrfs / XFS などのみ。対応していない場合は False を返し、dst は作成しません。
+    ※ Windows では CopyFileExW が、対応するボリューム（ReFS など）で自動的にブロッククローンを行います
+    """
+    if not sys.platform.startswith("linux"):
+        return False
+    with open(src, "rb") as fsrc:
+        with open(dst, "wb") as fdst:
+            cloned = _reflink(fsrc.fileno(), fdst.fileno())
+        if not cloned:
+            os.remove(dst)
+            return False
+    try:
+        shutil.copymode(src, dst)
+    except OSError:
+        pass
+    return True
+
+
+def _copy_kernel(fsrc, fdst, on_bytes):
+    """
+    Linux: リフリンク → copy_file_range → sendfile の順に試します。
+    どれも使えない場合は None を返します（何も書き込んでいない状態）。
+    """
+    in_fd = fsrc.fileno()
+    out_fd = fdst.fileno()
+    size = os.fstat(in_fd).st_size
+
+    if _reflink(in_fd, out_fd):
+        if on_bytes and size:
+            on_bytes(size)
+        return {"bytes": size, "method": "reflink"}
+
+    for method in ("copy_file_range", "sendfile"):
+        func = getattr(os, method, None)
+        if func is None:
+            continue
+        total = 0
+        try:
+            while True:
+                if method == "copy_file_range":
+                    n = func(in_fd, out_fd, _CHUNK_SIZE)
+                else:
+                    n = func(out_fd, in_fd, total, _CHUNK_SIZE)
+                if not n:
+                    break
+                total += n
+                if on_bytes:
+                    on_bytes(n)
+        except OSError as e:
+            if total == 0 and e.errno in _UNSUPPORTED_ERRNOS:
+                continue
+            raise
+        if total == 0 and size > 0:
+            # 仮想ファイルシステムなどで 0 バイトしか転送されない場合は次の方式へ
+            continue
+        return {"bytes": total, "method": method}
+    return None
+
+
+def _copy_windows(src, dst, on_bytes):
+    """
+    Windows: CopyFileExW（SMB のサーバー側コピー・大きなI/Oを OS に任せる）。
+    使えない場合は None を返します。
+    """
+    try:
+        import ctypes
+        from ctypes import wintypes
+    except ImportError:
+        return None
+
+    transferred = [0]
+
+    progress_routine_type = ctypes.WINFUNCTYPE(
+        wintypes.DWORD,
+        ctypes.c_longlong, ctypes.c_longlong, ctypes.c_longlong, ctypes.c_longlong,
+        wintypes.DWORD, wintypes.DWORD, wintypes.HANDLE, wintypes.HANDLE, wintypes.LPVOID,
+    )
+
+    def _progress(total_size, total_transferred, stream_size, stream_transferred,
+                  stream_number, reason, h_src, h_dst, data):
+        delta = total_transferred - transferred[0]
+        transferred[0] = total_transferred
+        if on_bytes and delta > 0:
+            on_bytes(delta)
+        return 0  # PROGRESS_CONTINUE
+
+    kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+    copy_file_ex = kernel32.CopyFileExW
+    copy_file_ex.argtypes = [
+        wintypes.LPCWSTR, wintypes.LPCWSTR, progress_routine_type,
+        wintypes.LPVOID, ctypes.POINTER(wintypes.BOOL), wintypes.DWORD,
+    ]
+    copy_file_ex.restype = wintypes.BOOL
+
+    callback = progress_routine_type(_progress)
+    if not copy_file_ex(os.fspath(src), os.fspath(dst), callback, None, None, 0):
+        raise ctypes.WinError(ctypes.get_last_error())
+    return {"bytes": transferred[0], "method": "CopyFileExW"}
+
+
+def fast_copy(src, dst, buffer_size=COPY_BUFFER_SIZE, on_bytes=None, preserve_metadata=False):
+    """
+    OS で最も速い方式でファイルをコピーします。
+    - Windows: CopyFileExW
+    - Linux: リフリンク → copy_file_range → sendfile
+    - 上記が使えない場合: 大きなバッファでの読み書き
+    preserve_metadata=False は shutil.copy（権限ビットのみ、更新日時はコピーした時刻）、
+    True は shutil.copy2（更新日時なども）相当。
+    ※ CopyFileExW は常に更新日時・属性もコピーするため、False の場合はコピー後に更新日時を現在時刻にします
+    on_bytes: 転送したバイト数ごとに呼び出されます（任意）。CopyFileExW が途中で失敗して次の方式でやり直す場合は、
+              通知済みのバイト数を負の値で1回呼び出して取り消します
+    戻り値: {"bytes", "read_seconds", "write_seconds", "combined_seconds", "method"}
+            ※ read/write の内訳は buffered 方式のみ計測できます。
+              他の方式（OS が読み書きをまとめて行う）はコピー全体の時間を combined_seconds に入れ、read/write は 0
+    """
+    started = time.perf_counter()
+    result = None
+    if sys.platform == "win32":
+        reported = [0]
+
+        def _counted(n):
+            reported[0] += n
+            on_bytes(n)
+
+        try:
+            result = _copy_windows(src, dst, _counted if on_bytes else None)
+        except OSError:
+            result = None
+            if reported[0]:
+                # 途中まで通知した分を取り消してから、読み書きコピーで最初からやり直す
+                on_bytes(-reported[0])
+        if result is not None:
+            result.update(read_seconds=0.0, write_seconds=0.0, combined_seconds=time.perf_counter() - started)
+            if not preserve_metadata:
+                try:
+                    os.utime(dst)
+                except OSError:
+                    pass
+            return result
+
+    with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+        if sys.platform.startswith("linux"):
+            result = _copy_kernel(fsrc, fdst, on_bytes)
+            if result is not None:
+                result.update(read_seconds=0.0, write_seconds=0.0, combined_seconds=time.perf_counter() - started)
+        if result is None:
+            result = _copy_buffered(fsrc, fdst, buffer_size, on_bytes)
+            result["combined_seconds"] = 0.0
+
+    try:
+        if preserve_metadata:
+            shutil.copystat(src, dst)
+        else:
+            shutil.copymode(src, dst)
+    except OSError:
+        pass
+    return result
@@ -1,19 +1,128 @@
 import os
-def compare_icd_xdw(output_folder, icd_list):
+import re
+import unicodedata
+from utils.folder_snapshot import FolderSnapshot
+from utils.run_manifest import RunManifest, STAGE_EXCHANGE, STAGE_COMPARE
+
+_SUFFIX_3D = re.compile(r"-3d$")
+
+
+def _base_key(stem):
+    """NFKC（全角・半角の統一）・大文字小文字・前後の空白を無視したキー"""
+    return unicodedata.normalize("NFKC", stem).strip().casefold()
+
+
+def normalize_name(stem):
+    """比較用のキー: NFKC（全角・半角の統一）・大文字小文字・前後の空白・末尾の -3D を無視"""
+    return _SUFFIX_3D.sub("", _base_key(stem)).rstrip()
+
+
+def expected_keys(names):
     """
-    So sánh danh sách ICD (từ dữ liệu đã lưu) với danh sách XDW trong output_folder.
-    Trả về:
-        missing: ICD có nhưng không có XDW
-        extra: XDW có nhưng không có ICD
+    期待するファイル名（拡張子なし）→ 比較用のキー。
+    末尾の -3D は、同じ名前で -3D のないもの（A-B と A-B-3D）が期待する一覧にない場合だけ無視します
+    （別の図面を同じキーにしないため）。
+    """
+    bases = {_base_key(name) for name in names}
+    keys = {}
+    for name in names:
+        base = _base_key(name)
+        folded = normalize_name(name)
+        keys[name] = base if folded != base and folded in bases else folded
+    return keys
+
+
+def output_key(stem, keys):
+    """出力ファイル名（拡張子なし）の比較用のキー。keys（expected_keys の値）にそのまま一致すれば -3D を残す"""
+    base = _base_key(stem)
+    return base if base in keys else normalize_name(stem)
+
+
+def compare_names(expected, actual):
+    """
+    ファイル名（拡張子なし）の一覧を正規化したキーで比較します（集合による比較、件数に比例）。
+    キーは expected_keys / output_key（A-B と A-B-3D の両方を期待する場合は -3D を区別）。
+    同じキーの出力が複数ある場合、2つ目以降は余分とします。
+    戻り値: {
+        "missing": expected にあり actual にないもの（expected の順番）,
+        "extra": actual にあり expected にないもの（actual の順番）,
+        "matched": 一致した expected の名前,
+        "normalized": 正規化後に一致した (expected, actual) の組（名前が完全には一致しないもの）,
+    }
     """
-    # Danh sách ICD lấy từ icd_list (đã copy ở Step 1)
-    icd_files = [os.path.splitext(os.path.basename(f))[0] for f in icd_list]
+    keys = expected_keys(expected)
+    key_set = set(keys.values())
+    outputs = {}
+    extra = []
+    for name in actual:
+        key = output_key(name, key_set)
+        if key in outputs:
+            extra.append(name)
+        else:
+            outputs[key] = name
 
-    # Danh sách XDW đọc từ thư mục
-    xdw_files = [os.path.splitext(f)[0] for f in os.listdir(output_folder) if f.lower().endswith(".xdw")]
+    missing = []
+    matched = []
+    normalized = []
+    seen = set()
+    for name in expected:
+        key = keys[name]
+        if key in seen:
+            continue  # 同じICDの重複
+        seen.add(key)
+        output = outputs.get(key)
+        if output is None:
+            missing.append(name)
+            continue
+        matched.append(name)
+        if output != name:
+            normalized.append((name, output))
 
-    # So sánh
-    missing = [icd for icd in icd_files if icd not in xdw_files]
-    extra = [xdw for xdw in xdw_files if xdw not in icd_files]
+    extra = [name for key, name in outputs.items() if key not in seen] + extra
+    return {"missing": missing, "extra": extra, "matched": matched, "normalized": normalized}
 
-    return missing, extra
+
+def compare_icd_outputs(output_folder, ext, icd_list=None, snapshot=None):
+    """
+    ICD（処理記録、記録がない場合は icd_list）と出力フォルダの ext（".pdf" / ".xdw"）を比較します。
+    出力フォルダの一覧は1回だけ取得します（snapshot: FolderSnapshot がある場合はそれを使用）。
+    結果（品番ごとの出力の有無）は処理記録に保存します。
+    戻り値: compare_names と同じ dict
+    """
+    manifest = RunManifest.load(output_folder)
+
+    if manifest is not None:
+        icd_files = [os.path.splitext(f)[0] for f in manifest.icd_files()]
+    else:
+        icd_files = [os.path.splitext(os.path.basename(f))[0] for f in icd_list or []]
+
+    snapshot = snapshot or FolderSnapshot.scan(output_folder)
+    outputs = snapshot.stems(ext)
+
+    diff = compare_names(icd_files, outputs)
+    for icd, output in diff["normalized"][:10]:
+        print(f"ℹ 名前の表記違いを一致と判定: {icd} ↔ {output}{ext}")
+
+    if manifest is not None:
+        try:
+            manifest.mark_outputs(STAGE_EXCHANGE, set(diff["matched"]))
+            manifest.set_stage(STAGE_COMPARE, missing=len(diff["missing"]), extra=len(diff["extra"]),
+                               normalized=len(diff["normalized"]))
+            manifest.save()
+        except OSError as e:
+            print(f"⚠ 処理記録を保存できません: {e}")
+
+    return diff
+
+
+def compare_icd_xdw(output_folder, icd_list=None):
+    """
+    So sánh danh sách ICD (từ dữ liệu đã lưu) với danh sách XDW trong output_folder.
+    ICD側は処理記録から取得し、記録がない場合のみ icd_list を使用。
+    名前は正規化して比較します（compare_names）。
+    Trả về: compare_names と同じ dict
+        missing: ICD có nhưng không có XDW
+        extra: XDW có nhưng không có ICD
+        matched / normalized: 一致した ICD・表記違いで一致した (ICD, XDW) の組
+    """
+    return compare_icd_outputs(output_folder, ".xdw", icd_list)
@@ -0,0 +1,99 @@
+# utils/folder_snapshot.py
+import os
+
+
+class FolderSnapshot:
+    """
+    フォルダ直下の一覧（名前・サイズ・更新日時）を1回の os.scandir で取得して保持します。
+    交換完了後のステップ（クリーンアップ → 比較 → -3D の削除 → 結果表示）で共有し、
+    削除・名前変更は remove() / rename() で一覧に反映するため、フォルダを何度も読み込みません。
+    名前の検索は Windows と同じく大文字小文字を区別しません（os.path.normcase）。
+    """
+
+    def __init__(self, folder):
+        self.folder = folder
+        self._entries = {}  # 名前 → (サイズ, 更新日時, フォルダかどうか)（一覧の順番）
+        self._names = {}    # normcase(名前) → 名前
+
+    @classmethod
+    def scan(cls, folder):
+        snapshot = cls(folder)
+        snapshot.refresh()
+        return snapshot
+
+    def refresh(self):
+        """フォルダを読み込み直します（外部で変更された場合）。"""
+        self._entries = {}
+        self._names = {}
+        with os.scandir(self.folder) as it:
+            for entry in it:
+                try:
+                    is_dir = entry.is_dir()
+                    st = entry.stat()
+                    self._set(entry.name, st.st_size, st.st_mtime, is_dir)
+                except OSError:
+                    continue  # 読み込み中に削除されたファイル
+
+    def _set(self, name, size, mtime, is_dir=False):
+        self._entries[name] = (size, mtime, is_dir)
+        self._names[os.path.normcase(name)] = name
+
+    # ---------------- 参照 ----------------
+    def path(self, name):
+        return os.path.join(self.folder, name)
+
+    def names(self, ext=None, include_dirs=False):
+        """
+        名前の一覧（一覧の順番）。
+        ext: ".pdf" などを指定すると、その拡張子のファイルだけ
+        include_dirs: True の場合はフォルダも含める（ext 指定なしの場合のみ）
+        """
+        if include_dirs and ext is None:
+            return list(self._entries)
+        ext = ext.lower() if ext else None
+        return [name for name, (_, _, is_dir) in self._entries.items()
+                if not is_dir and (ext is None or name.lower().endswith(ext))]
+
+    def stems(self, ext):
+        """ext のファイル名（拡張子なし）の一覧"""
+        return [os.path.splitext(name)[0] for name in self.names(ext)]
+
+    def count(self, ext):
+        return len(self.names(ext))
+
+    def exists(self, name):
+        return os.path.normcase(name) in self._names
+
+    def is_dir(self, name):
+        entry = self._entries.get(self._names.get(os.path.normcase(name)))
+        return bool(entry and entry[2])
+
+    def size(self, name):
+        entry = self._entries.get(self._names.get(os.path.normcase(name)))
+        return entry[0] if entry else None
+
+    def mtime(self, name):
+        entry = self._entries.get(self._names.get(os.path.normcase(name)))
+        return entry[1] if entry else None
+
+    # ---------------- 変更の反映 ----------------
+    def add(self, name, size=None, mtime=None):
+        """作成・コピーしたファイルを一覧に追加します（サイズ・更新日時を省略した場合は stat）。"""
+        if size is None or mtime is None:
+            st = os.stat(self.path(name))
+            size, mtime = st.st_size, st.st_mtime
+        self._set(name, size, mtime)
+
+    def remove(self, name):
+        """削除したファイルを一覧から除きます。"""
+        actual = self._names.pop(os.path.normcase(name), None)
+        if actual is not None:
+            self._entries.pop(actual, None)
+
+    def rename(self, old, new):
+        """名前を変更したファイルを一覧に反映します（順番は変わります）。"""
+        actual = self._names.pop(os.path.normcase(old), None)
+        if actual is None:
+            return
+        size, mtime, is_dir = self._entries.pop(actual)
+        self._set(new, size, mtime, is_dir)
@@ -0,0 +1,321 @@
+# utils/icd_index.py
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from config.settings import ICD_INDEX_PATH, ICD_INDEX_REFRESH_INTERVAL
+from utils.searchTools import (
+    split_workpiece, resolve_project_root, is_senyouki_match, search_in_project,
+    list_project_icd, match_parts_in_listing,
+)
+
+# 列を変更した場合は上げる（古いインデックスは作り直す）
+_SCHEMA_VERSION = 2
+
+# pos: 親フォルダの一覧（os.scandir）での位置
+# walk_key: ルートからの pos を連結したキー。(walk_key, pos) の順が従来の glob（深さ優先・フォルダの一覧順）と同じ
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS dirs (
+    path     TEXT PRIMARY KEY,
+    parent   TEXT,
+    mtime    REAL,
+    pos      INTEGER,
+    walk_key TEXT
+);
+CREATE INDEX IF NOT EXISTS dirs_parent ON dirs(parent);
+CREATE TABLE IF NOT EXISTS icd_files (
+    path   TEXT PRIMARY KEY,
+    dir    TEXT,
+    name   TEXT,
+    zuban  TEXT,
+    seiban TEXT,
+    hinban TEXT,
+    pos    INTEGER
+);
+CREATE INDEX IF NOT EXISTS icd_files_key ON icd_files(zuban, seiban);
+CREATE INDEX IF NOT EXISTS icd_files_dir ON icd_files(dir);
+"""
+
+# 一致するファイルの並び順（従来の glob と同じ）
+_WALK_ORDER = "SELECT f.path FROM icd_files f JOIN dirs d ON d.path = f.dir "
+
+
+def _child_key(walk_key, pos):
+    return f"{walk_key}{pos:06d}/"
+
+
+def _like_prefix(path):
+    """path 配下を表す LIKE パターン（% と _ をエスケープ）"""
+    escaped = path.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return escaped + "\\\\%" if os.sep == "\\" else escaped + os.sep + "%"
+
+
+class IcdIndex:
+    """
+    品番（zuban/seiban/hinban）→ .icd パスの永続インデックス（SQLite）。
+    - フォルダごとに mtime を記録し、mtime が変わったフォルダだけを再スキャンする
+    - 同じルートの再チェックは ICD_INDEX_REFRESH_INTERVAL 秒に1回まで
+    - 複数一致した場合は、従来の glob と同じ順番（深さ優先・フォルダの一覧順）で最初のもの
+    """
+
+    def __init__(self, db_path=ICD_INDEX_PATH):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = None
+        self._fresh = {}  # root -> 最終リフレッシュ時刻 (monotonic)
+
+    def _connect(self):
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            if self._conn.execute("PRAGMA user_version").fetchone()[0] != _SCHEMA_VERSION:
+                self._conn.executescript("DROP TABLE IF EXISTS dirs; DROP TABLE IF EXISTS icd_files;")
+                self._conn.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
+            self._conn.executescript(_SCHEMA)
+        return self._conn
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    # ---------------- 更新 ----------------
+    def refresh(self, root, force=False):
+        """
+        root 以下のインデックスを更新します。
+        mtime が変わっていないフォルダはファイル一覧を読まず、記録済みのサブフォルダだけを辿ります。
+        ファイルサーバーへのアクセス中はロックを保持しないため、複数スレッドから並行して呼び出せます。
+        戻り値: すべてのフォルダを読めた場合は True（読めないフォルダがあり、インデックスが不完全な場合は False）
+        """
+        root = os.path.normpath(root)
+        now = time.monotonic()
+        last = self._fresh.get(root)
+        if not force and last is not None and now - last < ICD_INDEX_REFRESH_INTERVAL:
+            return True
+
+        complete = True
+
+        stack = [(root, os.path.dirname(root), 0, "")]
+        while stack:
+            dir_path, parent, pos, walk_key = stack.pop()
+            try:
+                mtime = os.stat(dir_path).st_mtime
+            except OSError:
+                with self._lock:
+                    self._drop_tree(self._connect(), dir_path)
+                continue
+
+            with self._lock:
+                conn = self._connect()
+                row = conn.execute("SELECT mtime, pos, walk_key FROM dirs WHERE path = ?", (dir_path,)).fetchone()
+                if row and row[0] == mtime:
+                    if row[1:] != (pos, walk_key):  # 親フォルダの一覧で位置が変わった
+                        conn.execute("UPDATE dirs SET pos = ?, walk_key = ? WHERE path = ?", (pos, walk_key, dir_path))
+                    children = conn.execute("SELECT path, pos FROM dirs WHERE parent = ?", (dir_path,)).fetchall()
+                    stack.extend((child, dir_path, child_pos, _child_key(walk_key, child_pos))
+                                 for child, child_pos in children)
+                    continue
+
+            complete = self._rescan_dir(dir_path, parent, mtime, pos, walk_key, stack) and complete
+
+        with self._lock:
+            self._connect().commit()
+        if complete:
+            self._fresh[root] = now
+        return complete
+
+    def _rescan_dir(self, dir_path, parent, mtime, pos, walk_key, stack):
+        subdirs = []  # (パス, 一覧での位置)
+        icd_rows = []
+        try:
+            with os.scandir(dir_path) as it:
+                for entry_pos, entry in enumerate(it):
+                    # glob の '*' と同様に隠しファイル・フォルダは除外
+                    if entry.name.startswith("."):
+                        continue
+                    try:
+                        if entry.is_dir():
+                            subdirs.append((os.path.join(dir_path, entry.name), entry_pos))
+                        elif entry.name.lower().endswith(".icd"):
+                            icd_rows.append(self._file_row(dir_path, entry.name, entry_pos))
+                    except OSError:
+                        continue
+        except OSError as e:
+            print(f"⚠ インデックス作成中にフォルダを読めません: {dir_path} | {e}")
+            return False
+
+        with self._lock:
+            conn = self._connect()
+            # 消えたサブフォルダを削除
+            known = {p for (p,) in conn.execute("SELECT path FROM dirs WHERE parent = ?", (dir_path,))}
+            for gone in known.difference(sub for sub, _ in subdirs):
+                self._drop_tree(conn, gone)
+
+            conn.execute("DELETE FROM icd_files WHERE dir = ?", (dir_path,))
+            conn.executemany(
+                "INSERT OR REPLACE INTO icd_files (path, dir, name, zuban, seiban, hinban, pos) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                icd_rows,
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO dirs (path, parent, mtime, pos, walk_key) VALUES (?, ?, ?, ?, ?)",
+                (dir_path, parent, mtime, pos, walk_key),
+            )
+        stack.extend((sub, dir_path, sub_pos, _child_key(walk_key, sub_pos)) for sub, sub_pos in subdirs)
+        return True
+
+    @staticmethod
+    def _file_row(dir_path, file_name, pos):
+        path = os.path.join(dir_path, file_name)
+        name = os.path.splitext(file_name)[0]
+        parts = name.split("-")
+        zuban = parts[0]
+        seiban = parts[1] if len(parts) >= 2 else None
+        hinban = parts[2] if len(parts) >= 3 else None
+        return (path, dir_path, name, zuban, seiban, hinban, pos)
+
+    @staticmethod
+    def _drop_tree(conn, dir_path):
+        pattern = _like_prefix(dir_path)
+        conn.execute("DELETE FROM dirs WHERE path = ? OR path LIKE ? ESCAPE '\\'", (dir_path, pattern))
+        conn.execute("DELETE FROM icd_files WHERE dir = ? OR dir LIKE ? ESCAPE '\\'", (dir_path, pattern))
+
+    # ---------------- 検索 ----------------
+    def lookup(self, workpiece, root):
+        """
+        root 以下で workpiece に一致する .icd を返します（search_number と同じ判定）。
+        複数一致した場合は従来の glob と同じ順番（深さ優先・フォルダの一覧順）で最初のもの。見つからない場合は None。
+        """
+        zuban, seiban, _ = split_workpiece(workpiece)
+        root = os.path.normpath(root)
+        with self._lock:
+            rows = self._connect().execute(
+                _WALK_ORDER
+                + "WHERE f.zuban = ? AND f.seiban = ? AND (f.dir = ? OR f.dir LIKE ? ESCAPE '\\') "
+                "ORDER BY d.walk_key, f.pos",
+                (zuban, seiban, root, _like_prefix(root)),
+            ).fetchall()
+        for (path,) in rows:
+            if is_senyouki_match(path, workpiece):
+                return path
+        return None
+
+    def list_icd(self, root):
+        """root 以下の .icd パスを従来の glob と同じ順番（深さ優先・フォルダの一覧順）で返します。"""
+        root = os.path.normpath(root)
+        with self._lock:
+            rows = self._connect().execute(
+                _WALK_ORDER + "WHERE f.dir = ? OR f.dir LIKE ? ESCAPE '\\' "
+                "ORDER BY d.walk_key, f.pos",
+                (root, _like_prefix(root)),
+            ).fetchall()
+        return [path for (path,) in rows]
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_icd_index():
+    """共有の IcdIndex インスタンスを返します（初回呼び出し時に作成）。"""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = IcdIndex()
+        return _index
+
+
+def search_number_indexed(workpiece: str):
+    """
+    search_number（専用機モード）のインデックス版。
+    プロジェクトフォルダを解決 → インデックスを差分更新 → インデックスから検索。
+    インデックスを更新できない（読めないフォルダがある・使えない）場合のみ、従来どおりフォルダを直接検索します。
+    """
+    try:
+        project_root = resolve_project_root(workpiece)
+    except Exception:
+        return None
+    if not project_root:
+        return None
+
+    try:
+        index = get_icd_index()
+        complete = index.refresh(project_root)
+        found = index.lookup(workpiece, project_root)
+        if found or complete:
+            return found  # 更新できたインデックスにない品番は、走査しても見つからない
+    except Exception as e:
+        print(f"⚠ ICDインデックスを使用できません: {e}")
+
+    # インデックスを更新できない場合のみ従来の検索
+    try:
+        return search_in_project(project_root, workpiece)
+    except Exception:
+        return None
+
+
+def search_numbers_indexed(workpieces, workers=1, on_group_done=None):
+    """
+    search_number_indexed の一括版。
+    品番を製番ごとにまとめ、プロジェクトフォルダの解決と .icd 一覧の取得を製番ごとに1回だけ行い、
+    グループ内の全品番をメモリ上で照合します。workers > 1 の場合はグループを並列に検索します。
+    on_group_done: グループの検索が終わるたびに {workpiece: パス or None} で呼び出されます（任意）
+    戻り値: {workpiece: 見つかったパス or None}
+    """
+    results = {wp: None for wp in workpieces}
+
+    groups = {}
+    for wp in results:
+        try:
+            _, seiban, _ = split_workpiece(wp)
+        except IndexError:
+            continue
+        groups.setdefault(seiban, []).append(wp)
+
+    def _done(group, found):
+        group_results = {wp: found.get(wp) for wp in group}
+        results.update(group_results)
+        if on_group_done:
+            on_group_done(group_results)
+
+    if workers > 1 and len(groups) > 1:
+        with ThreadPoolExecutor(max_workers=min(workers, len(groups))) as executor:
+            futures = {executor.submit(_search_seiban_group, group): group for group in groups.values()}
+            for future in as_completed(futures):
+                _done(futures[future], future.result())
+    else:
+        for group in groups.values():
+            _done(group, _search_seiban_group(group))
+    return results
+
+
+def _search_seiban_group(group):
+    """同じ製番の品番をまとめて検索します。"""
+    try:
+        project_root = resolve_project_root(group[0])
+    except Exception:
+        return {}
+    if not project_root:
+        return {}
+
+    # 更新できたインデックスは信頼する（本当に存在しない品番のために毎回フォルダを走査しない）
+    found = {}
+    try:
+        index = get_icd_index()
+        complete = index.refresh(project_root)
+        found = match_parts_in_listing(group, index.list_icd(project_root))
+        if complete:
+            return found
+    except Exception as e:
+        print(f"⚠ ICDインデックスを使用できません: {e}")
+
+    # インデックスを更新できない場合のみ、フォルダを1回だけ直接走査して照合
+    missing = [wp for wp in group if not found.get(wp)]
+    try:
+        found.update(match_parts_in_listing(missing, list_project_icd(project_root)))
+    except Exception:
+        pass
+    return found
@@ -0,0 +1,176 @@
+# utils/icd_mirror.py
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+from config.settings import ICD_MIRROR_DIR, ICD_MIRROR_MAX_BYTES
+from utils.fast_copy import clone_file, fast_copy
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key       TEXT PRIMARY KEY,
+    source    TEXT,
+    size      INTEGER,
+    mtime_ns  INTEGER,
+    last_used REAL,
+    blob_mtime_ns INTEGER
+);
+CREATE INDEX IF NOT EXISTS entries_last_used ON entries(last_used);
+"""
+
+
+class IcdMirror:
+    """
+    ICD ファイルのローカルミラー（共有フォルダからのコピーを減らすためのキャッシュ）。
+    - キー: コピー元パス + サイズ + 更新日時（いずれかが変わると別ファイル扱い）
+    - 容量上限を超えたら、最後に使われた日時が古いものから削除（LRU）
+    - 出力フォルダへは常にコピーします（ハードリンクにすると、出力側の編集でミラーも壊れるため）。
+      ミラーのファイルは、取り込み時のサイズと更新日時が変わっていないものだけを使います
+    """
+
+    def __init__(self, root=ICD_MIRROR_DIR, max_bytes=ICD_MIRROR_MAX_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _connect(self):
+        if self._conn is None:
+            os.makedirs(self.root, exist_ok=True)
+            self._conn = sqlite3.connect(os.path.join(self.root, "mirror.sqlite3"), check_same_thread=False)
+            self._conn.executescript(_SCHEMA)
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(entries)")}
+            if "blob_mtime_ns" not in columns:
+                self._conn.execute("ALTER TABLE entries ADD COLUMN blob_mtime_ns INTEGER")
+        return self._conn
+
+    @staticmethod
+    def _key(src, st):
+        ident = f"{os.path.normcase(os.path.abspath(src))}|{st.st_size}|{st.st_mtime_ns}"
+        return hashlib.sha1(ident.encode("utf-8")).hexdigest()
+
+    def _blob_path(self, key, src):
+        ext = os.path.splitext(src)[1].lower()
+        return os.path.join(self.root, key[:2], key + ext)
+
+    def fetch(self, src, dst, on_bytes=None):
+        """
+        src を dst にコピーします。ミラーにあればローカルから（fast_copy）、
+        なければ共有フォルダからミラーに1回だけ取り込み、dst はミラーからクローン（できない場合はコピー）します。
+        戻り値: fast_copy と同じ dict + "cache": "hit" / "miss"
+        """
+        st = os.stat(src)
+        key = self._key(src, st)
+        blob = self._blob_path(key, src)
+
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT size, blob_mtime_ns FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+        if row and self._blob_ok(blob, *row):
+            result = fast_copy(blob, dst, on_bytes=on_bytes)
+            with self._lock:
+                conn = self._connect()
+                conn.execute("UPDATE entries SET last_used = ? WHERE key = ?", (time.time(), key))
+                conn.commit()
+            result["cache"] = "hit"
+            return result
+
+        # ミス: 共有フォルダからはミラー（一時ファイル経由）に1回だけコピーし、dst はミラーからクローン（またはコピー）
+        os.makedirs(os.path.dirname(blob), exist_ok=True)
+        tmp_blob = f"{blob}.{threading.get_ident()}.tmp"
+        try:
+            result = fast_copy(src, tmp_blob, on_bytes=on_bytes, preserve_metadata=True)
+            os.replace(tmp_blob, blob)
+        except OSError:
+            try:
+                os.remove(tmp_blob)
+            except OSError:
+                pass
+            raise
+        blob_mtime_ns = os.stat(blob).st_mtime_ns
+
+        # dst へのコピーが失敗しても、ミラーのファイルは容量に数える
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO entries (key, source, size, mtime_ns, last_used, blob_mtime_ns) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, src, st.st_size, st.st_mtime_ns, time.time(), blob_mtime_ns),
+            )
+            conn.commit()
+        try:
+            started = time.perf_counter()
+            if not clone_file(blob, dst):
+                fast_copy(blob, dst)
+            result["write_seconds"] += time.perf_counter() - started  # ローカル側の書き込み
+        finally:
+            self._evict()
+        result["cache"] = "miss"
+        return result
+
+    def contains(self, src, st=None):
+        """
+        src の現在の内容がミラーにあるかどうか（最終使用日時は更新しない）。
+        st: src の os.stat 結果（取得済みの場合、共有フォルダへの問い合わせを省略）
+        """
+        if st is None:
+            try:
+                st = os.stat(src)
+            except OSError:
+                return False
+        key = self._key(src, st)
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT size, blob_mtime_ns FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+        return bool(row) and self._blob_ok(self._blob_path(key, src), *row)
+
+    @staticmethod
+    def _blob_ok(blob, size, blob_mtime_ns):
+        """ミラーのファイルが取り込み時のまま（サイズ・更新日時が同じ）かどうか。記録がない古い項目は使わない。"""
+        if blob_mtime_ns is None:
+            return False
+        try:
+            st = os.stat(blob)
+        except OSError:
+            return False
+        return st.st_size == size and st.st_mtime_ns == blob_mtime_ns
+
+    def _evict(self):
+        """容量上限を超えている場合、古いものから削除します。"""
+        with self._lock:
+            conn = self._connect()
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+            if total <= self.max_bytes:
+                return
+            rows = conn.execute("SELECT key, source, size FROM entries ORDER BY last_used").fetchall()
+            for key, source, size in rows:
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(self._blob_path(key, source))
+                except FileNotFoundError:
+                    pass
+                except OSError as e:
+                    # 削除できないファイル（使用中など）は記録を残し、容量に数えたまま次回もう一度削除する
+                    print(f"⚠ ICDミラーのファイルを削除できません: {e}")
+                    continue
+                conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                total -= size
+            conn.commit()
+
+
+_mirror = None
+_mirror_lock = threading.Lock()
+
+
+def get_icd_mirror():
+    """共有の IcdMirror インスタンスを返します（初回呼び出し時に作成）。"""
+    global _mirror
+    with _mirror_lock:
+        if _mirror is None:
+            _mirror = IcdMirror()
+        return _mirror
@@ -0,0 +1,150 @@
+# utils/miss_cache.py
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from config.settings import MISS_CACHE_PATH, MISS_CACHE_TTL
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS misses (
+    part       TEXT PRIMARY KEY,
+    checked_at REAL,
+    watch_set  TEXT
+);
+CREATE TABLE IF NOT EXISTS watch_sets (
+    id   TEXT PRIMARY KEY,
+    dirs TEXT
+);
+"""
+
+
+def _dir_mtime(path):
+    try:
+        return os.stat(path).st_mtime
+    except OSError:
+        return None
+
+
+def format_age(seconds):
+    """経過時間を「N分前」「N時間前」「N日前」の形式にします。"""
+    minutes = int(seconds // 60)
+    if minutes < 60:
+        return f"{minutes}分前"
+    hours = minutes // 60
+    if hours < 24:
+        return f"{hours}時間前"
+    return f"{hours // 24}日前"
+
+
+class MissCache:
+    """
+    見つからなかった品番の永続キャッシュ（SQLite）。
+    - MISS_CACHE_TTL 秒を過ぎた結果は無効
+    - 監視フォルダの mtime が変わった場合も無効
+    - 監視フォルダの一覧（watch set）: 検索で読んだプロジェクトのフォルダと図面のあるフォルダの mtime。
+      多くの品番で共有するため1回だけ保存し、確認も watch set ごとに1回（watch_set_valid）
+    """
+
+    def __init__(self, db_path=MISS_CACHE_PATH, ttl=MISS_CACHE_TTL):
+        self.db_path = db_path
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _connect(self):
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._conn.executescript(_SCHEMA)
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(misses)")}
+            if "watch_set" not in columns:
+                self._conn.execute("ALTER TABLE misses ADD COLUMN watch_set TEXT")
+        return self._conn
+
+    def lookup(self, part):
+        """
+        キャッシュ済みの未検出結果を (経過秒数, watch set の ID or None) で返します。
+        キャッシュがない・期限切れの場合は None。
+        watch set の確認は含みません（watch_set_valid で確認してください）。
+        """
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT checked_at, watch_set FROM misses WHERE part = ?", (part,)
+            ).fetchone()
+        if not row:
+            return None
+
+        checked_at, watch_set = row
+        age = time.time() - checked_at
+        if age < 0 or age > self.ttl:
+            self.discard(part)
+            return None
+        return age, watch_set
+
+    def put(self, part, watch_set=None):
+        """未検出結果を記録します（共有の watch set の ID も保存）。"""
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO misses (part, checked_at, watch_set) VALUES (?, ?, ?)",
+                (part, time.time(), watch_set),
+            )
+            conn.commit()
+
+    def save_watch_set(self, dir_mtimes):
+        """
+        検索で読んだフォルダの {パス: mtime} を保存し、ID を返します。
+        どの品番からも参照されなくなった古い watch set は削除します。
+        """
+        dirs = json.dumps(sorted(dir_mtimes.items()), ensure_ascii=False)
+        set_id = hashlib.blake2b(dirs.encode("utf-8"), digest_size=16).hexdigest()
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "DELETE FROM watch_sets WHERE id NOT IN "
+                "(SELECT watch_set FROM misses WHERE watch_set IS NOT NULL)"
+            )
+            conn.execute("INSERT OR REPLACE INTO watch_sets (id, dirs) VALUES (?, ?)", (set_id, dirs))
+            conn.commit()
+        return set_id
+
+    def watch_set_valid(self, set_id, workers=1):
+        """
+        watch set のフォルダの mtime がすべて記録と同じかどうか（フォルダの一覧は読まず stat だけ、
+        workers > 1 の場合は並列）。図面のあるフォルダへのファイル追加は、深い階層でもそのフォルダの mtime の変化で検出します。
+        """
+        with self._lock:
+            row = self._connect().execute("SELECT dirs FROM watch_sets WHERE id = ?", (set_id,)).fetchone()
+        if not row:
+            return False
+        dirs = json.loads(row[0])
+        paths = [path for path, _ in dirs]
+        if workers > 1 and len(paths) > 1:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                mtimes = list(pool.map(_dir_mtime, paths))
+        else:
+            mtimes = [_dir_mtime(path) for path in paths]
+        return all(current == mtime for current, (_, mtime) in zip(mtimes, dirs))
+
+    def discard(self, part):
+        with self._lock:
+            conn = self._connect()
+            conn.execute("DELETE FROM misses WHERE part = ?", (part,))
+            conn.commit()
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_miss_cache():
+    """共有の MissCache インスタンスを返します（初回呼び出し時に作成）。"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = MissCache()
+        return _cache
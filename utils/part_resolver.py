@@ -0,0 +1,121 @@
+# utils/part_resolver.py
+from config.settings import HYOUJUNKI_DIR, RESOLVE_WORKERS, RESOLVE_MAX_WORKERS
+from utils.searchTools import search_gradually_batch
+from utils.icd_index import search_numbers_indexed
+from utils.miss_cache import get_miss_cache
+
+
+def clamp_workers(workers=None):
+    """並列数を 1〜RESOLVE_MAX_WORKERS に制限します（None の場合は RESOLVE_WORKERS）。"""
+    if workers is None:
+        workers = RESOLVE_WORKERS
+    return max(1, min(int(workers), RESOLVE_MAX_WORKERS))
+
+
+def resolve_parts(part_numbers, workers=None, use_miss_cache=True, on_resolved=None, cancel_event=None):
+    """
+    品番リストの ICD ファイルをまとめて検索します。
+    1. 専用機: 製番ごとのグループを並列に検索（search_numbers_indexed）。
+       インデックスは差分更新されるため、前回見つからなかった品番もここで確認し直します
+    2. 標準機: 1 で見つからなかった品番を1回の走査でまとめて検索（search_gradually_batch）。
+       前回見つからなかった品番（未検出キャッシュ）は、走査が必要な品番がほかになく、
+       前回の走査で監視したフォルダ（watch set: プロジェクトのフォルダと図面のあるフォルダ）の
+       mtime がすべて同じ場合だけ走査を省略します
+    use_miss_cache: False の場合は未検出キャッシュを使わずに検索します（結果はキャッシュに記録）
+    on_resolved: 品番の結果が確定するたびに (品番, パス or None) で呼び出されます（任意、
+                 検索スレッドから呼ばれることがあります）
+    cancel_event: threading.Event（任意）。専用機の検索後にセットされていた場合、標準機の検索と
+                  未検出キャッシュの更新を省略します（結果は不完全になるため、呼び出し側で破棄してください）
+    戻り値: (BOM と同じ順番の [(品番, パス or None), ...], {キャッシュで未検出とした品番: 経過秒数})
+    """
+    workers = clamp_workers(workers)
+    unique_parts = list(dict.fromkeys(part_numbers))
+
+    candidates = {}  # 未検出キャッシュにある品番 → (経過秒数, watch set の ID)
+    miss_cache = None
+    try:
+        miss_cache = get_miss_cache()
+        if use_miss_cache:
+            for part in unique_parts:
+                found = miss_cache.lookup(part)
+                if found is not None:
+                    candidates[part] = found
+    except Exception as e:
+        print(f"⚠ 未検出キャッシュを使用できません: {e}")
+        miss_cache = None
+
+    def _emit(part, path):
+        if on_resolved:
+            on_resolved(part, path)
+
+    # 専用機で見つかった品番はグループごとにすぐ通知する
+    def _group_done(group_results):
+        for part, path in group_results.items():
+            if path:
+                _emit(part, path)
+
+    found_files = search_numbers_indexed(unique_parts, workers=workers, on_group_done=_group_done)  # 専用機
+
+    if cancel_event is not None and cancel_event.is_set():
+        return [(p, found_files.get(p)) for p in part_numbers], {}
+
+    # 専用機で見つかった品番のキャッシュは削除（深い階層に追加された図面）
+    for part in [p for p in candidates if found_files.get(p)]:
+        del candidates[part]
+        _discard_miss(miss_cache, part)
+
+    unresolved = [p for p in unique_parts if not found_files.get(p)]
+    cached_misses = _skippable_misses(miss_cache, candidates, unresolved, workers)
+    to_walk = [p for p in unresolved if p not in cached_misses]
+
+    for part in cached_misses:
+        _emit(part, None)
+
+    visited = {}
+    if to_walk:
+        found_files.update(search_gradually_batch(HYOUJUNKI_DIR, to_walk, workers=workers, visited=visited))  # 標準機
+        for part in to_walk:
+            _emit(part, found_files.get(part))
+
+    # 今回見つからなかった品番を記録（監視フォルダの mtime で無効にする）
+    new_misses = [p for p in to_walk if not found_files.get(p)]
+    if miss_cache is not None:
+        try:
+            if new_misses:
+                watch_set = miss_cache.save_watch_set(visited)
+                for part in new_misses:
+                    miss_cache.put(part, watch_set=watch_set)
+            for part in candidates:
+                if part in to_walk and found_files.get(part):
+                    miss_cache.discard(part)
+        except Exception as e:
+            print(f"⚠ 未検出キャッシュを保存できません: {e}")
+
+    resolved = [(p, found_files.get(p)) for p in part_numbers]
+    return resolved, cached_misses
+
+
+def _discard_miss(miss_cache, part):
+    try:
+        miss_cache.discard(part)
+    except Exception as e:
+        print(f"⚠ 未検出キャッシュを更新できません: {e}")
+
+
+def _skippable_misses(miss_cache, candidates, unresolved, workers):
+    """
+    標準機の走査を省略できる未検出キャッシュの品番 {品番: 経過秒数}。
+    ほかに走査が必要な品番がある場合は、キャッシュの品番も同じ走査で確認します（追加の費用なし）。
+    """
+    if not candidates or any(p not in candidates for p in unresolved):
+        return {}
+    valid = {}
+    try:
+        for set_id in {watch_set for _, watch_set in candidates.values()}:
+            valid[set_id] = bool(set_id) and miss_cache.watch_set_valid(set_id, workers=workers)
+    except Exception as e:
+        print(f"⚠ 未検出キャッシュを確認できません: {e}")
+        return {}
+    if not all(valid.values()):
+        return {}  # フォルダが更新された場合は、まとめて走査し直す
+    return {part: age for part, (age, _) in candidates.items()}
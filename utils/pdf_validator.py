@@ -0,0 +1,158 @@
+# utils/pdf_validator.py
+import mmap
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from config.settings import PDF_VALIDATE_WORKERS
+
+_HEADER_WINDOW = 1024    # %PDF- はファイルの先頭 1024 バイト以内
+_TRAILER_WINDOW = 2048   # %%EOF・startxref は末尾付近
+_STARTXREF = re.compile(rb"startxref\s+(\d+)\s+%%EOF", re.S)
+_XREF_AT = re.compile(rb"\s*(?:xref|\d+\s+\d+\s+obj)")
+_OBJECT_WINDOW = 4096   # オブジェクト・trailer は位置から 4096 バイト以内だけを読む
+_XREF_ENTRY = 20        # xref 表の1行（"nnnnnnnnnn ggggg n \r\n"）
+_XREF_TABLE = re.compile(rb"\s*xref\s*")
+_XREF_SUBSECTION = re.compile(rb"(\d+)[ ]+(\d+)\s*")
+_ROOT = re.compile(rb"/Root\s+(\d+)\s+\d+\s+R")
+_PREV = re.compile(rb"/Prev\s+(\d+)")
+_PAGES_REF = re.compile(rb"/Pages\s+(\d+)\s+\d+\s+R")
+_COUNT = re.compile(rb"/Count\s+(\d+)")
+_MAX_XREF_SECTIONS = 32  # 追記保存（/Prev）をたどる上限
+
+
+def _window(data, offset, end_marker):
+    """offset から _OBJECT_WINDOW バイト（end_marker があればその手前まで）"""
+    chunk = data[offset:offset + _OBJECT_WINDOW]
+    end = chunk.find(end_marker)
+    return chunk if end < 0 else chunk[:end]
+
+
+def _xref_sections(data, offset):
+    """
+    startxref の xref 表から /Prev をたどり、(表の本体の位置, [(最初の番号, 件数, 行の位置), ...], trailer) を返します。
+    xref ストリーム（圧縮された相互参照）の場合は何も返しません。
+    """
+    seen = set()
+    while offset is not None and offset not in seen and len(seen) < _MAX_XREF_SECTIONS:
+        seen.add(offset)
+        m = _XREF_TABLE.match(data, offset)
+        if not m:
+            return
+        pos, subsections = m.end(), []
+        while True:
+            sub = _XREF_SUBSECTION.match(data, pos)
+            if not sub:
+                break
+            first, count = int(sub.group(1)), int(sub.group(2))
+            subsections.append((first, count, sub.end()))
+            pos = sub.end() + count * _XREF_ENTRY
+        trailer = _window(data, pos, b"startxref")
+        yield subsections, trailer
+        prev = _PREV.search(trailer)
+        offset = int(prev.group(1)) if prev else None
+
+
+def _object_offset(data, sections, number):
+    """xref 表からオブジェクト number の位置（見つからない場合は None）"""
+    for subsections, _ in sections:
+        for first, count, entries in subsections:
+            if first <= number < first + count:
+                entry = data[entries + (number - first) * _XREF_ENTRY:][:_XREF_ENTRY].split()
+                if len(entry) >= 3 and entry[2] == b"n" and entry[0].isdigit():
+                    return int(entry[0])
+                return None
+    return None
+
+
+def _page_count(data, xref_offset):
+    """
+    ページ数（文書全体は読まない）。trailer の /Root → カタログの /Pages → ページツリーの /Count を、
+    xref 表の位置から直接読みます。xref ストリームなどで数えられない場合は None。
+    """
+    sections = list(_xref_sections(data, xref_offset))
+    root = next((m for m in (_ROOT.search(t) for _, t in sections) if m), None)
+    if root is None:
+        return None
+    catalog_at = _object_offset(data, sections, int(root.group(1)))
+    if catalog_at is None:
+        return None
+    pages_ref = _PAGES_REF.search(_window(data, catalog_at, b"endobj"))
+    if pages_ref is None:
+        return None
+    pages_at = _object_offset(data, sections, int(pages_ref.group(1)))
+    if pages_at is None:
+        return None
+    count = _COUNT.search(_window(data, pages_at, b"endobj"))
+    return int(count.group(1)) if count else None
+
+
+def validate_pdf(path):
+    """
+    PDF を memory-map して、途中で切れた・空のファイルを検出します。
+    - 先頭: %PDF- ヘッダー
+    - 末尾: %%EOF と startxref、startxref の位置に xref（表 / ストリーム）があること
+    - ページ数: 0 ページの場合はエラー（xref 表からページツリーだけを読む。数えられない場合は None）
+    戻り値: {"name", "size", "pages", "error"}（問題がない場合 error は None）
+    """
+    result = {"name": os.path.basename(path), "size": 0, "pages": None, "error": None}
+    try:
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            result["size"] = size
+            if size == 0:
+                result["error"] = "0 バイト"
+                return result
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                if data.find(b"%PDF-", 0, _HEADER_WINDOW) < 0:
+                    result["error"] = "PDFヘッダーがありません"
+                    return result
+                tail_start = max(0, size - _TRAILER_WINDOW)
+                tail = data[tail_start:]
+                if b"%%EOF" not in tail:
+                    result["error"] = "%%EOF がありません（途中で切れている可能性）"
+                    return result
+                matches = list(_STARTXREF.finditer(tail))
+                if not matches:
+                    result["error"] = "startxref がありません"
+                    return result
+                offset = int(matches[-1].group(1))
+                if offset >= size or not _XREF_AT.match(data, offset):
+                    result["error"] = f"startxref の位置が不正です（{offset}）"
+                    return result
+                result["pages"] = _page_count(data, offset)
+                if result["pages"] == 0:
+                    result["error"] = "ページがありません"
+    except (OSError, ValueError) as e:
+        result["error"] = f"読み込めません: {e}"
+    return result
+
+
+def validate_pdfs(folder, names=None, workers=PDF_VALIDATE_WORKERS):
+    """
+    フォルダ内の PDF をまとめて検証します（workers 個のスレッドで並列）。
+    names: 検証するファイル名（省略時はフォルダ内のすべての .pdf）
+    戻り値: {"checked": 件数, "invalid": [validate_pdf の結果（エラーのみ）], "pages": ページ数の合計, "seconds": 秒}
+    """
+    started = time.perf_counter()
+    if names is None:
+        with os.scandir(folder) as it:
+            names = [e.name for e in it if e.is_file() and e.name.lower().endswith(".pdf")]
+    paths = [os.path.join(folder, name) for name in names]
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        results = list(pool.map(validate_pdf, paths))
+
+    invalid = [r for r in results if r["error"]]
+    for r in invalid:
+        print(f"❌ PDF検証エラー: {r['name']} - {r['error']}")
+    summary = {
+        "checked": len(results),
+        "invalid": invalid,
+        "pages": sum(r["pages"] or 0 for r in results),
+        "seconds": time.perf_counter() - started,
+    }
+    print(f"📊 PDF検証: {summary['checked']} 件, エラー {len(invalid)} 件, "
+          f"{summary['pages']} ページ ({summary['seconds']:.2f} 秒)")
+    return summary
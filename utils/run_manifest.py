@@ -0,0 +1,272 @@
+# utils/run_manifest.py
+import hashlib
+import json
+import os
+import threading
+import time
+
+from config.settings import MANIFEST_DIR
+from utils.checksum import file_digest
+
+_VERSION = 1
+
+# ステップ（処理の段階）
+STAGE_COPY = "copy"          # ステップ1: ICDコピー
+STAGE_PRINT = "print"        # ステップ2: 印刷
+STAGE_CONVERT = "convert"    # ステップ3: PDF / XDW 変換
+STAGE_EXCHANGE = "exchange"  # ステップ4: 貼り付け（交換）
+STAGE_CLEANUP = "cleanup"    # ステップ5: クリーンアップ
+STAGE_COMPARE = "compare"    # ステップ6: ICD と PDF / XDW の比較
+STAGE_VALIDATE = "validate"  # ステップ8: PDF の検証（途中で切れた・空のファイル）
+
+# 途中から再開できるステップ（この順番で進む）
+RESUMABLE_STAGES = (STAGE_COPY, STAGE_PRINT, STAGE_CONVERT, STAGE_EXCHANGE)
+
+
+def manifest_path(folder):
+    """出力フォルダの処理記録のパス（MANIFEST_DIR 内、出力フォルダのパスのハッシュで識別）"""
+    key = os.path.normcase(os.path.abspath(folder))
+    return os.path.join(MANIFEST_DIR, hashlib.sha1(key.encode("utf-8")).hexdigest() + ".json")
+
+
+def discard_manifest(folder):
+    """出力フォルダの処理記録を削除します（フォルダを削除した場合など）。"""
+    try:
+        os.remove(manifest_path(folder))
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        print(f"⚠ 処理記録を削除できません: {e}")
+
+
+def source_stamp(source):
+    """入力ファイル（部品表）のサイズ・更新日時・内容のハッシュ。フォルダ・読めない場合は None。"""
+    try:
+        if not os.path.isfile(source):
+            return None
+        st = os.stat(source)
+        return {"size": st.st_size, "mtime": st.st_mtime, "digest": file_digest(source)}
+    except OSError:
+        return None
+
+
+class RunManifest:
+    """
+    出力フォルダの処理記録（JSON）。config.txt の代わりに、出力フォルダではなく MANIFEST_DIR に保存します。
+    - parts: 品番ごとのコピー元・コピー先ファイル名・サイズ・更新日時・コピー時間・チェックサム・ステップごとの状態
+    - stages: ステップごとの状態と完了日時
+    保存は一時ファイル → 置き換えで行うため、途中で異常終了しても前回の内容が残ります。
+    """
+
+    def __init__(self, folder, data):
+        self.folder = folder
+        self.data = data
+        self._lock = threading.Lock()
+
+    @property
+    def path(self):
+        return manifest_path(self.folder)
+
+    # ---------------- 作成・読み込み・保存 ----------------
+    @classmethod
+    def create(cls, folder, source, mode, name):
+        data = {
+            "version": _VERSION,
+            "created_at": time.time(),
+            "folder": folder,
+            "source": source,
+            "source_stamp": source_stamp(source),  # 部品表が同じ内容かどうかの確認用（再開時）
+            "mode": mode,
+            "name": name,
+            "stages": {},
+            "parts": [],
+            "copies": {},  # コピー完了の記録（コピー元パス → ファイル名・サイズ・チェックサム）。ステップ1の途中再開用
+            "skipped_due_to_hold": [],
+            "added_due_to_addition": [],
+        }
+        return cls(folder, data)
+
+    @classmethod
+    def load(cls, folder):
+        """出力フォルダの記録を読み込みます。ない・読めない場合、出力フォルダがない場合は None。"""
+        if not os.path.isdir(folder):
+            return None
+        try:
+            with open(manifest_path(folder), "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if data.get("version") != _VERSION:
+            return None
+        return cls(folder, data)
+
+    def same_source(self, source):
+        """
+        同じ入力（部品表 / ICDフォルダ）の記録かどうか。
+        部品表はパスに加えて内容も確認します（サイズ・更新日時が違う場合はハッシュを比較）。
+        同じパスで保存し直した部品表、内容の記録がない部品表は別の入力とします。
+        """
+        recorded = self.data.get("source") or ""
+        if os.path.normcase(os.path.normpath(recorded)) != os.path.normcase(os.path.normpath(source)):
+            return False
+        if os.path.isdir(source):
+            return True
+        stamp = self.data.get("source_stamp")
+        if not stamp:
+            return False
+        try:
+            st = os.stat(source)
+            if st.st_size != stamp["size"]:
+                return False
+            if st.st_mtime == stamp["mtime"]:
+                return True
+            return file_digest(source) == stamp["digest"]
+        except OSError:
+            return False
+
+    def save(self):
+        with self._lock:
+            os.makedirs(MANIFEST_DIR, exist_ok=True)
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self.data, f, ensure_ascii=False, indent=1)
+            os.replace(tmp_path, self.path)
+
+    # ---------------- 品番 ----------------
+    def record_copy(self, record):
+        """
+        コピー1件の完了を記録します（ステップ1の途中でも呼び出し可、別スレッドからも可）。
+        チェックサムがある成功したコピーだけを記録します。
+        """
+        if record.get("error") or not record.get("checksum"):
+            return
+        with self._lock:
+            self.data.setdefault("copies", {})[record["source"]] = {
+                "file": os.path.basename(record["dest"]),
+                "size": record.get("size"),
+                "mtime": record.get("mtime"),
+                "copy_seconds": round(record.get("seconds", 0.0), 4),
+                "checksum": record["checksum"],
+            }
+
+    def verified_copies(self):
+        """
+        前回コピーしたファイルのうち、出力フォルダにあり、サイズとチェックサムが記録と一致するもの。
+        戻り値: {コピー元パス: CopyEngine と同じ形式のコピー結果}
+        """
+        copies = dict(self.data.get("copies", {}))
+        for part in self.copied_parts():
+            copies.setdefault(part["source"], {k: part[k] for k in ("file", "size", "mtime", "copy_seconds", "checksum")})
+
+        verified = {}
+        for source, info in copies.items():
+            dest = os.path.join(self.folder, info["file"])
+            try:
+                if not info.get("checksum") or os.path.getsize(dest) != info["size"]:
+                    continue
+                if file_digest(dest) != info["checksum"]:
+                    continue
+            except OSError:
+                continue
+            verified[source] = {
+                "source": source, "dest": dest, "bytes": 0, "method": "resume", "cache": None,
+                "read_seconds": 0.0, "write_seconds": 0.0, "seconds": info.get("copy_seconds") or 0.0,
+                "error": None, "size": info["size"], "mtime": info.get("mtime"), "checksum": info["checksum"],
+            }
+        return verified
+
+    def add_copied(self, part, record):
+        """コピー結果（CopyEngine の1件分）を記録します。"""
+        self.record_copy(record)
+        self.data["parts"].append({
+            "part": part,
+            "source": record["source"],
+            "file": os.path.basename(record["dest"]),
+            "size": record.get("size"),
+            "mtime": record.get("mtime"),
+            "copy_seconds": round(record.get("seconds", 0.0), 4),
+            "checksum": record.get("checksum"),
+            "status": {STAGE_COPY: "failed" if record.get("error") else "done"},
+            "error": record.get("error"),
+        })
+
+    def add_missing(self, part):
+        """ICDファイルが見つからなかった品番を記録します。"""
+        self.data["parts"].append({
+            "part": part, "source": None, "file": None, "size": None, "mtime": None,
+            "copy_seconds": None, "checksum": None, "status": {STAGE_COPY: "missing"}, "error": None,
+        })
+
+    def copied_parts(self):
+        """コピーできた品番の記録（BOM の順番）"""
+        return [p for p in self.data["parts"] if p["status"].get(STAGE_COPY) == "done"]
+
+    def icd_list(self):
+        """コピー元の ICD パス一覧（step1 の icd_list と同じ）"""
+        return [p["source"] for p in self.copied_parts()]
+
+    def icd_files(self):
+        """出力フォルダにコピーした ICD ファイル名の一覧（重複なし）"""
+        return list(dict.fromkeys(p["file"] for p in self.copied_parts()))
+
+    def mark_outputs(self, stage, present_stems):
+        """
+        出力ファイル（PDF / XDW）の有無を品番ごとに記録します。
+        present_stems: 出力フォルダにあるファイル名（拡張子なし）の集合
+        """
+        for part in self.copied_parts():
+            stem = os.path.splitext(part["file"])[0]
+            part["status"][stage] = "done" if stem in present_stems else "missing"
+
+    # ---------------- ステップ ----------------
+    def set_stage(self, stage, status="done", **extra):
+        with self._lock:
+            self.data["stages"][stage] = dict(status=status, at=time.time(), **extra)
+
+    def stage_done(self, stage):
+        return self.data["stages"].get(stage, {}).get("status") == "done"
+
+    def stage_info(self, stage):
+        return self.data["stages"].get(stage, {})
+
+    def delivered(self):
+        """交換（ステップ4）が完了済み＝ICD は削除され、PDF を納品済みのフォルダかどうか"""
+        return self.stage_done(STAGE_EXCHANGE)
+
+    def last_completed_stage(self):
+        """ステップ1〜4（コピー → 印刷 → 変換 → 交換）のうち、最後に完了したもの。ない場合は None。"""
+        last = None
+        for stage in RESUMABLE_STAGES:
+            if not self.stage_done(stage):
+                break
+            last = stage
+        return last
+
+    def step1_info(self):
+        """記録から step1_create_and_copy と同じ形式の結果を作ります（再開用）。"""
+        return {
+            "output_folder": self.folder,
+            "excel_name_clean": self.data["name"],
+            "copied_count": len(self.copied_parts()),
+            "not_found": [p["part"] for p in self.data["parts"] if p["status"].get(STAGE_COPY) != "done"],
+            "cached_misses": {},
+            "icd_list": self.icd_list(),
+            "skipped_due_to_hold": self.data.get("skipped_due_to_hold", []),
+            "added_due_to_addition": self.data.get("added_due_to_addition", []),
+            "copy_timings": [],
+            "copy_stats": None,
+            "resumed_stage": STAGE_EXCHANGE if self.delivered() else self.last_completed_stage(),
+        }
+
+
+def mark_stage(folder, stage, status="done", **extra):
+    """出力フォルダの記録にステップの状態を保存します（記録がない・保存できない場合は何もしない）。"""
+    manifest = RunManifest.load(folder) if folder else None
+    if manifest is None:
+        return
+    try:
+        manifest.set_stage(stage, status, **extra)
+        manifest.save()
+    except OSError as e:
+        print(f"⚠ 処理記録を保存できません: {e}")
+
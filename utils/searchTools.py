@@ -1,15 +1,10 @@
 
-import tkinter as tk
-from tkinter import filedialog, messagebox
-from tkinterdnd2 import DND_FILES, TkinterDnD
 import os
-import shutil
-import pandas as pd
 import re
 import glob
-import sys
-import win32com.client
-import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from config.settings import SENYOUKI_DIR, HYOUJUNKI_DIR
+from utils.shortcut import read_lnk_target
 
 # ===================== Logic tìm kiếm =====================
 def search_gradually(base_path, workpiece):
@@ -22,7 +17,7 @@ def search_gradually(base_path, workpiece):
         workpiece = workpiece[1:-1]
 
     for depth in range(1, max_depth + 1):
-        pattern = base_path + ('*\\' * depth) + f'*{workpiece}*.icd'
+        pattern = os.path.join(base_path, *(['*'] * depth), f'*{workpiece}*.icd')
         for f in glob.iglob(pattern, recursive=True):
             if any(keyword in os.path.basename(f) for keyword in black_keywords):
                 continue
@@ -42,80 +37,276 @@ def search_gradually(base_path, workpiece):
             break
     return found_file
 
-def search_number(workpiece: str, mode: str = "0"):
-    if mode == "0":
-        # 専用機モード（従来の検索方法）
-        try:
-            split_workpiece = workpiece.split('-')
-            zuban = split_workpiece[0]
-            seiban = split_workpiece[1]
-            try:
-                hinban = split_workpiece[2]
-            except IndexError:
-                hinban = None
-
-            seiban_alp = seiban[:3]
-            seiban_num = seiban[3:7]
-            num_front = seiban_num[:2]
-            num_back = seiban_num[2:]
-
-            # TSZ\12*
-            path_1 = f'Y:\\専用機\\{seiban_alp}\\{num_front}*'
-            file_1 = next(glob.iglob(path_1), None)
+def _gradual_candidates(filename):
+    r"""
+    ファイル名（拡張子なし）に一致し得る workpiece を (key, is_exact) で返します。
+    接尾辞は -\w+ のみ許可（\w に - は含まれない）なので、候補は
+    「ファイル名そのもの」と「最後の - より前」の2つだけです。
+    """
+    yield filename, True
+    head, sep, suffix = filename.rpartition('-')
+    if sep and head and re.fullmatch(r'\w+', suffix):
+        yield head, False
 
-            if not file_1:
-                raise Exception('ファイルが見つかりません (path_1)')
 
-            # 1234*
-            path_2 = f'{file_1}\\{seiban_num}*'
-            file_2 = next(glob.iglob(path_2), None)
+def _scandir_list(dir_path):
+    """フォルダのエントリ一覧を返します（読めない場合は空リスト）。"""
+    try:
+        with os.scandir(dir_path) as it:
+            return list(it)
+    except OSError:
+        return []
 
-            if not file_2:
-                raise Exception('ファイルが見つかりません (path_2)')
 
-            # .lnk 処理
-            path_3 = f'{file_2}\\*.lnk'
-            file_3 = next(glob.iglob(path_3), None)
+def _stat_and_scandir_list(dir_path):
+    """(フォルダの mtime, エントリ一覧) を返します。mtime は一覧を読む前に取得（読めない場合は None）。"""
+    try:
+        mtime = os.stat(dir_path).st_mtime
+    except OSError:
+        mtime = None
+    return mtime, _scandir_list(dir_path)
 
-            if file_3:
-                wshell = win32com.client.Dispatch("WScript.Shell")
-                shortcut = wshell.CreateShortcut(file_3)
-                file_2 = shortcut.TargetPath
 
-            # 実ファイル検索
-            path_4 = f'{file_2}\\**\\*{workpiece}*'
-            file_4 = None
-            for file in glob.iglob(path_4, recursive=True):
-                if '-OLD' in file:
+def search_gradually_batch(base_path, workpieces, max_depth=4, workers=1, visited=None):
+    r"""
+    search_gradually の一括版。base_path を os.scandir で1回だけ（max_depth 階層まで）走査し、
+    すべての workpiece を同時に照合します。workers > 1 の場合は各階層のフォルダを並列に読み取ります。
+    判定ルールは search_gradually と同じ:
+    - 浅い階層を優先し、その階層で完全一致があれば完全一致、なければ最初の -\w+ 接尾辞一致
+    - black_keywords を含むファイルは除外
+    visited: dict（任意）。読んだフォルダのうち、階層1までのフォルダと .icd があるフォルダの
+             {パス: 読む前の mtime} を追加します（未検出キャッシュの監視用）
+    戻り値: {workpiece: 見つかったパス or None}（入力と同じキー）
+    """
+    results = {wp: None for wp in workpieces}
+
+    # 括弧を除去（[ABC123D] → ABC123D）した名前 → 元の workpiece 一覧
+    pending = {}
+    for wp in results:
+        key = wp[1:-1] if wp.startswith('[') and wp.endswith(']') else wp
+        if key:
+            pending.setdefault(key, []).append(wp)
+
+    executor = ThreadPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        return _walk_gradually(base_path, pending, results, max_depth, executor, visited)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+
+def _walk_gradually(base_path, pending, results, max_depth, executor, visited=None):
+    """search_gradually_batch の走査本体（階層ごとの幅優先）。"""
+    black_keywords = ['.pdf', '-OLD', '.xls', '-old', '-E']
+
+    # 各フォルダは1回だけ scandir し、ファイル照合とサブフォルダ列挙を同時に行う
+    # （base_path 直下 = 階層0 のファイルは search_gradually と同様に対象外）
+    level_dirs = [base_path]
+    for depth in range(0, max_depth + 1):
+        if not pending or not level_dirs:
+            break
+
+        next_dirs = []
+        exact = {}
+        partial = {}
+        list_dir = _scandir_list if visited is None else _stat_and_scandir_list
+        if executor is not None and len(level_dirs) > 1:
+            listings = executor.map(list_dir, level_dirs)
+        else:
+            listings = map(list_dir, level_dirs)
+        for dir_path, entries in zip(level_dirs, listings):
+            if visited is not None:
+                mtime, entries = entries
+                # 監視するのはプロジェクトのフォルダ（階層1まで）と図面（.icd）があるフォルダだけ
+                if depth <= 1 or any(e.name.lower().endswith('.icd') for e in entries):
+                    visited[dir_path] = mtime
+            for entry in entries:
+                name = entry.name
+                # glob の '*' と同様に隠しファイル・フォルダは除外
+                if name.startswith('.'):
                     continue
-                if not file.lower().endswith('.icd'):
+                try:
+                    is_dir = entry.is_dir()
+                except OSError:
                     continue
+                if is_dir:
+                    if depth < max_depth:
+                        next_dirs.append(entry.path)
+                    continue
+                if depth == 0 or not name.lower().endswith('.icd'):
+                    continue
+                if any(keyword in name for keyword in black_keywords):
+                    continue
+                filename = os.path.splitext(name)[0]
+                for key, is_exact in _gradual_candidates(filename):
+                    if key not in pending:
+                        continue
+                    if is_exact:
+                        exact.setdefault(key, entry.path)
+                    else:
+                        partial.setdefault(key, entry.path)
 
-                filename = os.path.splitext(os.path.basename(file))[0]
-                parts = filename.split('-')
+        # この階層で見つかったものを確定（完全一致を優先）
+        for key in set(exact) | set(partial):
+            found = exact.get(key) or partial.get(key)
+            for wp in pending.pop(key):
+                results[wp] = found
 
-                # aaaa-aaa1234 以上は一致しているか
-                if len(parts) < 2:
-                    continue
+        level_dirs = next_dirs
 
-                if parts[0] != zuban or parts[1] != seiban:
-                    continue
+    return results
+
+
+def split_workpiece(workpiece: str):
+    """
+    専用機の品番を (zuban, seiban, hinban) に分解します。
+    例: A123-TSZ1234-01 → ("A123", "TSZ1234", "01")
+    hinban がない場合は None。
+    """
+    split_workpiece = workpiece.split('-')
+    zuban = split_workpiece[0]
+    seiban = split_workpiece[1]
+    try:
+        hinban = split_workpiece[2]
+    except IndexError:
+        hinban = None
+    return zuban, seiban, hinban
+
+
+def resolve_project_root(workpiece: str):
+    """
+    品番の製番から専用機のプロジェクトフォルダを解決します。
+    フォルダ内に .lnk がある場合はショートカットのリンク先を返します。
+    見つからない場合は None。
+    """
+    _, seiban, _ = split_workpiece(workpiece)
+
+    seiban_alp = seiban[:3]
+    seiban_num = seiban[3:7]
+    num_front = seiban_num[:2]
+
+    # TSZ\12*
+    path_1 = f'{SENYOUKI_DIR}\\{seiban_alp}\\{num_front}*'
+    file_1 = next(glob.iglob(path_1), None)
+
+    if not file_1:
+        return None
+
+    # 1234*
+    path_2 = f'{file_1}\\{seiban_num}*'
+    file_2 = next(glob.iglob(path_2), None)
+
+    if not file_2:
+        return None
 
-                # hinban 判定
-                if hinban is None:
-                    # 完全に2要素のみ許可、または 3要素で3番目が "3D" の場合も許可
-                    # 例: A-B または A-B-3D
-                    if len(parts) == 2:
-                        file_4 = file
-                        break
-                    elif len(parts) == 3 and parts[2].upper() == "3D":
-                        file_4 = file
-                        break
-                else:
-                    # hinban が指定されているなら3要素目以降OK
-                    if len(parts) >= 3:
-                        file_4 = file
-                        break
+    # .lnk 処理
+    path_3 = f'{file_2}\\*.lnk'
+    file_3 = next(glob.iglob(path_3), None)
+
+    if file_3:
+        file_2 = read_lnk_target(file_3) or file_2
+
+    return file_2
+
+
+def is_senyouki_match(file: str, workpiece: str) -> bool:
+    """
+    専用機モードの一致判定（search_number と同じルール）。
+    - パスに -OLD を含まない .icd ファイル
+    - ファイル名に workpiece を含み、図番・製番が一致する
+    - hinban なし: A-B または A-B-3D のみ / hinban あり: 3要素以上
+    """
+    if '-OLD' in file:
+        return False
+    if not file.lower().endswith('.icd'):
+        return False
+
+    filename = os.path.splitext(os.path.basename(file))[0]
+    # glob (Windows) と同様に大文字小文字を区別しない部分一致
+    if workpiece.lower() not in filename.lower():
+        return False
+
+    zuban, seiban, hinban = split_workpiece(workpiece)
+    parts = filename.split('-')
+
+    # aaaa-aaa1234 以上は一致しているか
+    if len(parts) < 2:
+        return False
+
+    if parts[0] != zuban or parts[1] != seiban:
+        return False
+
+    # hinban 判定
+    if hinban is None:
+        # 完全に2要素のみ許可、または 3要素で3番目が "3D" の場合も許可
+        # 例: A-B または A-B-3D
+        return len(parts) == 2 or (len(parts) == 3 and parts[2].upper() == "3D")
+    # hinban が指定されているなら3要素目以降OK
+    return len(parts) >= 3
+
+
+def search_in_project(project_root: str, workpiece: str):
+    """
+    プロジェクトフォルダ以下を再帰的に検索し、最初に一致した .icd を返します。
+    """
+    path_4 = os.path.join(project_root, '**', f'*{workpiece}*')
+    for file in glob.iglob(path_4, recursive=True):
+        if is_senyouki_match(file, workpiece):
+            return file
+    return None
+
+
+def list_project_icd(project_root: str):
+    """
+    プロジェクトフォルダ以下の .icd ファイルを1回の走査ですべて列挙します。
+    順番は search_in_project（glob）と同じ: 深さ優先・フォルダの一覧順、隠しファイル・フォルダは除外。
+    """
+    icd_paths = []
+    for root, dirs, files in os.walk(project_root):
+        dirs[:] = [d for d in dirs if not d.startswith('.')]
+        for name in files:
+            if name.lower().endswith('.icd') and not name.startswith('.'):
+                icd_paths.append(os.path.join(root, name))
+    return icd_paths
+
+
+def match_parts_in_listing(workpieces, icd_paths):
+    """
+    .icd の一覧に対して複数の品番をメモリ上で照合します（is_senyouki_match と同じ判定）。
+    各品番について、一覧の順番で最初に一致したパスを返します。
+    戻り値: {workpiece: パス or None}
+    """
+    # (図番, 製番) ごとに候補を分ける
+    buckets = {}
+    for path in icd_paths:
+        parts = os.path.splitext(os.path.basename(path))[0].split('-')
+        if len(parts) >= 2:
+            buckets.setdefault((parts[0], parts[1]), []).append(path)
+
+    results = {}
+    for wp in workpieces:
+        results[wp] = None
+        try:
+            zuban, seiban, _ = split_workpiece(wp)
+        except IndexError:
+            continue
+        for path in buckets.get((zuban, seiban), ()):
+            if is_senyouki_match(path, wp):
+                results[wp] = path
+                break
+    return results
+
+
+def search_number(workpiece: str, mode: str = "0"):
+    if mode == "0":
+        # 専用機モード（従来の検索方法）
+        try:
+            file_2 = resolve_project_root(workpiece)
+            if not file_2:
+                raise Exception('ファイルが見つかりません (path_1/path_2)')
+
+            # 実ファイル検索
+            file_4 = search_in_project(file_2, workpiece)
 
             if not file_4:
                 raise Exception('検索図番が見つかりません\n例：\n・ショートカットがない\n・現行の明和品番でない。')
@@ -126,7 +317,7 @@ def search_number(workpiece: str, mode: str = "0"):
     else:
         # 標準機モード（search_gradually使用）
         try:
-            default_path = 'Y:\\標準機\\'
+            default_path = HYOUJUNKI_DIR
             file_1 = search_gradually(default_path, workpiece)
 
             if not file_1:
@@ -135,4 +326,3 @@ def search_number(workpiece: str, mode: str = "0"):
             return file_1
         except Exception as err:
             return None
-
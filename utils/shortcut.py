@@ -0,0 +1,175 @@
+# utils/shortcut.py
+import os
+import struct
+import sys
+import threading
+
+# [MS-SHLLINK] LinkFlags
+_HAS_LINK_TARGET_ID_LIST = 0x00000001
+_HAS_LINK_INFO = 0x00000002
+_HAS_NAME = 0x00000004
+_HAS_RELATIVE_PATH = 0x00000008
+_IS_UNICODE = 0x00000080
+
+# LinkInfoFlags
+_VOLUME_ID_AND_LOCAL_BASE_PATH = 0x00000001
+_COMMON_NETWORK_RELATIVE_LINK_AND_PATH_SUFFIX = 0x00000002
+
+_HEADER_SIZE = 0x4C
+_LINK_CLSID = bytes.fromhex("0114020000000000c000000000000046")
+
+# ANSI 文字列のコードページ（日本語 Windows では cp932）
+_ANSI_ENCODING = "mbcs" if sys.platform == "win32" else "cp932"
+
+_cache = {}  # lnk_path -> (mtime, target)
+_cache_lock = threading.Lock()
+
+
+def _read_c_string(data, offset, unicode=False):
+    """NULL 終端文字列を読み取ります。"""
+    if unicode:
+        end = offset
+        while end + 1 < len(data) and data[end:end + 2] != b"\x00\x00":
+            end += 2
+        return data[offset:end].decode("utf-16-le", errors="replace")
+    end = data.find(b"\x00", offset)
+    if end < 0:
+        end = len(data)
+    return data[offset:end].decode(_ANSI_ENCODING, errors="replace")
+
+
+def _join_path(base, suffix):
+    if not suffix:
+        return base
+    if base.endswith("\\"):
+        return base + suffix
+    return base + "\\" + suffix
+
+
+def _parse_link_info(data, start):
+    """LinkInfo 構造体からリンク先パスを取得します。取得できない場合は None。"""
+    (size, header_size, flags, _volume_id_offset, local_base_path_offset,
+     network_offset, suffix_offset) = struct.unpack_from("<7I", data, start)
+
+    local_base_path_offset_u = suffix_offset_u = None
+    if header_size >= 0x24:
+        local_base_path_offset_u, suffix_offset_u = struct.unpack_from("<2I", data, start + 0x1C)
+
+    if suffix_offset_u:
+        suffix = _read_c_string(data, start + suffix_offset_u, unicode=True)
+    else:
+        suffix = _read_c_string(data, start + suffix_offset)
+
+    # ローカルパス（C:\... / マップされたドライブ）
+    if flags & _VOLUME_ID_AND_LOCAL_BASE_PATH:
+        if local_base_path_offset_u:
+            base = _read_c_string(data, start + local_base_path_offset_u, unicode=True)
+        else:
+            base = _read_c_string(data, start + local_base_path_offset)
+        if base:
+            return _join_path(base, suffix)
+
+    # ネットワークパス（\\server\share\...）
+    if flags & _COMMON_NETWORK_RELATIVE_LINK_AND_PATH_SUFFIX:
+        net = start + network_offset
+        _net_size, _net_flags, net_name_offset = struct.unpack_from("<3I", data, net)
+        if net_name_offset > 0x14:
+            net_name_offset_u, = struct.unpack_from("<I", data, net + 0x14)
+            net_name = _read_c_string(data, net + net_name_offset_u, unicode=True)
+        else:
+            net_name = _read_c_string(data, net + net_name_offset)
+        if net_name:
+            return _join_path(net_name, suffix)
+
+    return None
+
+
+def _read_string_data(data, offset, unicode):
+    """StringData（文字数 + 文字列）を読み取り、(文字列, 次のオフセット) を返します。"""
+    count, = struct.unpack_from("<H", data, offset)
+    offset += 2
+    if unicode:
+        raw = data[offset:offset + count * 2]
+        return raw.decode("utf-16-le", errors="replace"), offset + count * 2
+    raw = data[offset:offset + count]
+    return raw.decode(_ANSI_ENCODING, errors="replace"), offset + count
+
+
+def parse_lnk_target(data: bytes, lnk_path: str = None):
+    """
+    .lnk（Shell Link バイナリ）の内容からリンク先パスを取得します。
+    - LinkInfo のローカルパス / ネットワークパスを優先
+    - LinkInfo がない場合は RELATIVE_PATH を lnk_path のフォルダ基準で解決
+    取得できない場合は None。
+    """
+    try:
+        if len(data) < _HEADER_SIZE:
+            return None
+        header_size, = struct.unpack_from("<I", data, 0)
+        if header_size != _HEADER_SIZE or data[4:20] != _LINK_CLSID:
+            return None
+        link_flags, = struct.unpack_from("<I", data, 0x14)
+
+        offset = _HEADER_SIZE
+        if link_flags & _HAS_LINK_TARGET_ID_LIST:
+            id_list_size, = struct.unpack_from("<H", data, offset)
+            offset += 2 + id_list_size
+
+        if link_flags & _HAS_LINK_INFO:
+            link_info_size, = struct.unpack_from("<I", data, offset)
+            target = _parse_link_info(data, offset)
+            if target:
+                return target
+            offset += link_info_size
+
+        # LinkInfo から取得できない場合は相対パスを使う
+        unicode = bool(link_flags & _IS_UNICODE)
+        if link_flags & _HAS_NAME:
+            _, offset = _read_string_data(data, offset, unicode)
+        if link_flags & _HAS_RELATIVE_PATH:
+            relative, _ = _read_string_data(data, offset, unicode)
+            if relative and lnk_path:
+                base_dir = os.path.dirname(lnk_path)
+                # .lnk の区切り文字は常に "\\"
+                return os.path.normpath(os.path.join(base_dir, relative.replace("\\", os.sep)))
+    except (struct.error, IndexError):
+        return None
+    return None
+
+
+def _target_via_wscript(lnk_path):
+    """パースできない .lnk のみ、従来どおり WScript.Shell で解決します。"""
+    try:
+        import win32com.client
+        wshell = win32com.client.Dispatch("WScript.Shell")
+        return wshell.CreateShortcut(lnk_path).TargetPath or None
+    except Exception:
+        return None
+
+
+def read_lnk_target(lnk_path: str):
+    """
+    .lnk ファイルのリンク先を返します（パス + mtime でキャッシュ）。
+    取得できない場合は None。
+    """
+    try:
+        mtime = os.stat(lnk_path).st_mtime
+    except OSError:
+        return None
+
+    with _cache_lock:
+        cached = _cache.get(lnk_path)
+    if cached and cached[0] == mtime:
+        return cached[1]
+
+    try:
+        with open(lnk_path, "rb") as f:
+            target = parse_lnk_target(f.read(), lnk_path)
+    except OSError:
+        target = None
+    if not target:
+        target = _target_via_wscript(lnk_path)
+
+    with _cache_lock:
+        _cache[lnk_path] = (mtime, target)
+    return target
@@ -0,0 +1,172 @@
+# utils/stable_files.py
+import os
+import sys
+import time
+
+from config.settings import PASTE_WAIT_TIMEOUT, PASTE_POLL_INTERVAL, PASTE_SETTLE_SECONDS, PASTE_IDLE_TIMEOUT
+from utils.file_compare import expected_keys, output_key
+
+_ERROR_SHARING_VIOLATION = 32
+_GENERIC_READ = 0x80000000
+_OPEN_EXISTING = 3
+_FILE_ATTRIBUTE_NORMAL = 0x80
+
+
+def _listing(folder, ext):
+    """{名前: (サイズ, 更新日時)}（ext のファイルだけ）"""
+    files = {}
+    with os.scandir(folder) as it:
+        for entry in it:
+            if entry.name.lower().endswith(ext) and not entry.name.startswith("~$"):
+                try:
+                    st = entry.stat()
+                except OSError:
+                    continue
+                files[entry.name] = (st.st_size, st.st_mtime_ns)
+    return files
+
+
+def _open_exclusive_error(path):
+    """
+    ファイルを共有なし（dwShareMode=0）で読み取り用に開き、開けない場合は Windows のエラーコードを返します（開けた場合は 0）。
+    os.open は共有違反を EACCES（errno）に変換し winerror を持たないため、CreateFileW を直接呼び出します。
+    """
+    import ctypes
+    from ctypes import wintypes
+
+    kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+    create_file = kernel32.CreateFileW
+    create_file.argtypes = [
+        wintypes.LPCWSTR, wintypes.DWORD, wintypes.DWORD, wintypes.LPVOID,
+        wintypes.DWORD, wintypes.DWORD, wintypes.HANDLE,
+    ]
+    create_file.restype = wintypes.HANDLE
+    handle = create_file(os.fspath(path), _GENERIC_READ, 0, None, _OPEN_EXISTING, _FILE_ATTRIBUTE_NORMAL, None)
+    if handle is None or handle == ctypes.c_void_p(-1).value:  # INVALID_HANDLE_VALUE
+        return ctypes.get_last_error()
+    kernel32.CloseHandle(handle)
+    return 0
+
+
+def _in_use(path):
+    """
+    ほかのプロセス（Explorer のコピーなど）が書き込み中かどうか（Windows のみ判定）。
+    書き込み中のファイルは共有なしで開けず、共有違反（ERROR_SHARING_VIOLATION）になります（開くだけで内容・更新日時は変わりません）。
+    読み取り専用のファイル（アクセス拒否）など、ほかの理由で開けない場合は書き込み中としません。
+    """
+    if not sys.platform.startswith("win"):
+        return False
+    try:
+        return _open_exclusive_error(path) == _ERROR_SHARING_VIOLATION
+    except (OSError, AttributeError) as e:
+        print(f"⚠ ファイルの使用状況を確認できません: {path} ({e})")
+        return False
+
+
+class ArrivalTracker:
+    """
+    期待するファイル（拡張子なしの名前）のうち、届いたものを数えます。
+    update() にはフォルダの現在の一覧を渡し、前回との差分（追加・削除されたファイル）だけを処理します。
+    名前は compare_names と同じキーで比較します（-3D・大文字小文字・全角半角の違いは一致。
+    A-B と A-B-3D の両方を期待する場合は -3D を区別）。
+    """
+
+    def __init__(self, expected):
+        self.expected = {}
+        for name, key in expected_keys(list(expected)).items():
+            self.expected.setdefault(key, name)
+        self.total = len(self.expected)
+        self.arrived = 0
+        self._names = set()
+        self._counts = {}  # キー → そのキーのファイル数
+
+    def update(self, names):
+        """一覧を反映し、届いた数が変わった場合は True。"""
+        names = set(names)
+        before = self.arrived
+        for name in names - self._names:
+            key = output_key(os.path.splitext(name)[0], self.expected)
+            self._counts[key] = self._counts.get(key, 0) + 1
+            if self._counts[key] == 1 and key in self.expected:
+                self.arrived += 1
+        for name in self._names - names:
+            key = output_key(os.path.splitext(name)[0], self.expected)
+            self._counts[key] -= 1
+            if not self._counts[key]:
+                del self._counts[key]
+                if key in self.expected:
+                    self.arrived -= 1
+        self._names = names
+        return self.arrived != before
+
+    def missing(self):
+        """まだ届いていない期待ファイル名（期待した順番）"""
+        return [name for key, name in self.expected.items() if key not in self._counts]
+
+
+def wait_for_stable_files(folder, ext, expected=None, timeout=PASTE_WAIT_TIMEOUT, poll_interval=PASTE_POLL_INTERVAL,
+                          settle=PASTE_SETTLE_SECONDS, idle_timeout=PASTE_IDLE_TIMEOUT, should_stop=None,
+                          on_progress=None):
+    """
+    貼り付け後、folder の ext ファイルがそろい、書き込みが終わるまで待ちます（固定の sleep の代わり）。
+    - expected: 期待するファイル名（拡張子なし）の一覧。compare_names と同じキーで比較（-3D・大文字小文字の違いは一致）。
+                None の場合は ext のファイルが1つ以上あれば対象
+    - 完了条件: 期待するファイルがすべてあり、サイズ・更新日時が settle 秒変わらず、書き込み中のファイルがない
+    - 期待するファイルがそろわないまま idle_timeout 秒変化がない場合（貼り付けが終わったが不足あり）、
+      timeout 秒を超えた場合、should_stop() が True の場合は待つのをやめます
+    - on_progress(届いた数, 期待する数): 届いた数が変わるたびに呼ばれます（任意、expected がある場合のみ）
+    戻り値: {"stable": bool, "idle": bool, "timed_out": bool, "stopped": bool, "files": ファイル数,
+             "arrived": 届いた期待ファイル数, "total": 期待ファイル数,
+             "missing": まだない期待ファイル名, "seconds": 待った秒数}
+    """
+    started = time.monotonic()
+    tracker = ArrivalTracker(expected) if expected is not None else None
+    previous = None
+    unchanged_since = started
+    checked = {}  # 書き込み中でないことを確認済み: 名前 → (サイズ, 更新日時)
+    result = {"stable": False, "idle": False, "timed_out": False, "stopped": False, "files": 0,
+              "arrived": 0, "total": tracker.total if tracker else 0, "missing": [], "seconds": 0.0}
+    if tracker and on_progress:
+        on_progress(0, tracker.total)
+
+    while True:
+        now = time.monotonic()
+        try:
+            files = _listing(folder, ext)
+        except OSError as e:
+            print(f"⚠ フォルダを確認できません: {folder} ({e})")
+            files = {}
+
+        if files != previous:
+            previous = files
+            unchanged_since = now
+            if tracker and tracker.update(files) and on_progress:
+                on_progress(tracker.arrived, tracker.total)
+
+        if tracker is None:
+            missing = [] if files else ["*" + ext]
+        else:
+            missing = tracker.missing() if tracker.arrived < tracker.total else []
+        result.update(files=len(files), missing=missing, seconds=now - started,
+                      arrived=tracker.arrived if tracker else len(files))
+
+        if not missing and now - unchanged_since >= settle:
+            busy = [name for name, stat in files.items()
+                    if checked.get(name) != stat and _in_use(os.path.join(folder, name))]
+            if not busy:
+                result["stable"] = True
+                return result
+            checked.update((name, stat) for name, stat in files.items() if name not in busy)
+            unchanged_since = now  # 書き込み中のファイルがある場合は、もう一度 settle 秒待つ
+
+        if missing and now - unchanged_since >= idle_timeout:
+            result["idle"] = True
+            return result
+        if should_stop and should_stop():
+            result["stopped"] = True
+            return result
+        if now - started >= timeout:
+            result["timed_out"] = True
+            print(f"⚠ 貼り付けの完了を確認できませんでした（{timeout:.0f} 秒、不足 {len(missing)} 件）")
+            return result
+        time.sleep(poll_interval)
@@ -0,0 +1,35 @@
+# utils/warmup.py
+import importlib
+import threading
+import time
+
+# 起動時には読み込まず、ウィンドウ表示後にバックグラウンドで読み込むモジュール（印刷・PDF変換・貼り付け用）
+WARMUP_MODULES = (
+    "process.printing",
+    "process.pdf_collection",
+    "utils.cleanup_pdf",
+)
+
+_started = threading.Event()
+
+
+def start_warmup(modules=WARMUP_MODULES):
+    """
+    重いモジュール（pyautogui / pynput / mss / cv2 / numpy など）を別スレッドで読み込みます。
+    使用時に読み込む処理（関数内の import）はそのまま動くため、読み込み完了を待つ必要はありません。
+    2回目以降の呼び出しは何もしません。
+    """
+    if _started.is_set():
+        return
+    _started.set()
+    threading.Thread(target=_warm, args=(modules,), daemon=True).start()
+
+
+def _warm(modules):
+    started = time.perf_counter()
+    for name in modules:
+        try:
+            importlib.import_module(name)
+        except Exception as e:
+            print(f"⚠ モジュールを事前に読み込めません（使用時に再試行します）: {name} - {e}")
+    print(f"ℹ バックグラウンド読み込み完了: {time.perf_counter() - started:.2f} 秒")